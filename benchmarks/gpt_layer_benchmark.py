@@ -0,0 +1,245 @@
+"""
+Benchmark: GPT layer throughput and latency against the local OpenAI stand-in.
+
+Builds the GPT managers the way DependencyInjector does (one pooled AsyncOpenAI client, the shared
+run watcher, arbiter and call governor), but pointed at benchmarks.openai_standin_server, and measures two
+workloads at each --concurrency level:
+    execute_thread:         add_message_to_thread() + execute_thread() with --assistant
+    execute_function_call:  add_message_to_thread() + execute_function_call() with the conversationdirector schema
+Each concurrent lane owns one thread (as the bot's TaskManager lanes do) and runs --requests / lanes
+requests back to back. Reports requests/s and p50/p95/p99 latency per workload and level.
+
+Run from the repo root with the bot's environment (CHATZILLA_CONFIG_YAML_FILEPATH and the other
+CHATZILLA_* variables), since the managers read the ConfigManager:
+    python -m benchmarks.gpt_layer_benchmark --concurrency 1 4 16 --requests 64 --latency 0.05 --run-seconds 0.5
+Pass --base-url to use a stand-in started separately (or another OpenAI-compatible server) instead
+of the in-process one. With --hedge, execute_thread goes through GPTBackendRouter with a second
+in-process stand-in as the secondary backend; combine it with --slow-run-rate to see the tail cut:
+    python -m benchmarks.gpt_layer_benchmark --slow-run-rate 0.05 --slow-run-seconds 10 --hedge
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+import httpx
+import openai
+
+from classes.ConfigManagerClass import ConfigManager
+from classes.GPTAssistantManagerClass import GPTThreadManager, GPTResponseManager, GPTAssistantManager, GPTFunctionCallManager
+from classes.GPTRunWatcherClass import GPTRunWatcher
+from classes.GPTRunArbiterClass import GPTRunArbiter
+from classes.GPTCallGovernorClass import GPTCallGovernor
+from classes.GPTBackendRouterClass import GPTBackendRouter
+from benchmarks.openai_standin_server import StandInOptions, start_standin_server
+
+def _percentile(sorted_values: list, percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float('nan')
+    rank = max(1, int(round(percent / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+def _build_gpt_layer(config, base_url: str, secondary_base_url: str = None) -> dict:
+    transport = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=config.openai_http_max_connections,
+            max_keepalive_connections=config.openai_http_max_keepalive_connections,
+            keepalive_expiry=config.openai_http_keepalive_expiry_seconds
+            )
+        )
+    if config.openai_governor_enabled:
+        transport = GPTCallGovernor(
+            transport=transport,
+            requests_per_minute=config.openai_governor_requests_per_minute,
+            tokens_per_minute=config.openai_governor_tokens_per_minute,
+            max_attempts=config.openai_governor_max_attempts,
+            backoff_base_seconds=config.openai_governor_backoff_base_seconds,
+            backoff_max_seconds=config.openai_governor_backoff_max_seconds,
+            retry_budget_ratio=config.openai_governor_retry_budget_ratio,
+            retry_budget_max=config.openai_governor_retry_budget_max,
+            circuit_failure_threshold=config.openai_governor_circuit_failure_threshold,
+            circuit_open_seconds=config.openai_governor_circuit_open_seconds
+            )
+    http_client = httpx.AsyncClient(transport=transport, timeout=httpx.Timeout(config.openai_http_timeout_seconds, connect=10.0))
+    gpt_client = openai.AsyncOpenAI(
+        api_key='benchmark',
+        base_url=base_url,
+        http_client=http_client,
+        max_retries=0 if config.openai_governor_enabled else openai.DEFAULT_MAX_RETRIES
+        )
+    assistant_manager = GPTAssistantManager(gpt_client)
+    thread_manager = GPTThreadManager(gpt_client)
+    run_watcher = GPTRunWatcher(
+        gpt_client,
+        max_waittime_for_gpt_response=config.magic_max_waittime_for_gpt_response,
+        initial_poll_seconds=config.openai_run_watcher_initial_poll_seconds,
+        max_poll_seconds=config.openai_run_watcher_max_poll_seconds,
+        backoff_factor=config.openai_run_watcher_backoff_factor
+        )
+    run_arbiter = GPTRunArbiter()
+    backend_router = None
+    if secondary_base_url:
+        backend_router = GPTBackendRouter(
+            secondary_backends=[{
+                'name': 'secondary',
+                'client': openai.AsyncOpenAI(api_key='benchmark', base_url=secondary_base_url, max_retries=0),
+                'model': None
+                }],
+            hedge_percentile=config.openai_backend_router_hedge_percentile,
+            initial_hedge_seconds=config.openai_backend_router_initial_hedge_seconds,
+            min_hedge_seconds=config.openai_backend_router_min_hedge_seconds,
+            max_hedge_seconds=config.openai_backend_router_max_hedge_seconds,
+            min_samples=config.openai_backend_router_min_samples,
+            context_message_limit=config.openai_backend_router_context_message_limit,
+            response_max_completion_tokens=config.assistant_response_max_completion_tokens
+            )
+    response_manager = GPTResponseManager(
+        gpt_client,
+        thread_manager,
+        assistant_manager,
+        run_watcher,
+        run_arbiter,
+        max_waittime_for_gpt_response=config.magic_max_waittime_for_gpt_response,
+        response_max_completion_tokens=config.assistant_response_max_completion_tokens,
+        backend_router=backend_router
+        )
+    function_call_manager = GPTFunctionCallManager(gpt_client, thread_manager, response_manager, assistant_manager, run_watcher, run_arbiter)
+    return {
+        'http_client': http_client,
+        'assistant_manager': assistant_manager,
+        'thread_manager': thread_manager,
+        'response_manager': response_manager,
+        'function_call_manager': function_call_manager,
+        'backend_router': backend_router
+        }
+
+async def _execute_thread_request(gpt_layer, config, args, thread_name, request_index):
+    await gpt_layer['response_manager'].add_message_to_thread(
+        message_content=f"benchmark message {request_index}: what do you think about this game?",
+        thread_name=thread_name,
+        role='user'
+        )
+    return await gpt_layer['response_manager'].execute_thread(
+        assistant_name=args.assistant,
+        thread_name=thread_name,
+        thread_instructions="Reply to the latest message in the chat."
+        )
+
+async def _execute_function_call_request(gpt_layer, config, args, thread_name, request_index):
+    await gpt_layer['response_manager'].add_message_to_thread(
+        message_content=f"benchmark message {request_index}: hey bot, are you there?",
+        thread_name=thread_name,
+        role='user'
+        )
+    output_data, _ = await gpt_layer['function_call_manager'].execute_function_call(
+        thread_name=thread_name,
+        assistant_name='conversationdirector',
+        function_schema=config.function_schemas['conversationdirector']
+        )
+    return output_data
+
+async def _run_level(gpt_layer, config, args, request_func, concurrency: int) -> dict:
+    thread_names = [f"benchmark_{request_func.__name__}_{concurrency}_{lane}" for lane in range(concurrency)]
+    await gpt_layer['thread_manager'].create_threads(thread_names)
+
+    latencies = []
+    errors = 0
+    async def lane(thread_name, n_requests):
+        nonlocal errors
+        for request_index in range(n_requests):
+            start = time.perf_counter()
+            try:
+                result = await request_func(gpt_layer, config, args, thread_name, request_index)
+            except Exception:
+                result = None
+            if result is None:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    requests_per_lane = max(1, args.requests // concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(lane(thread_name, requests_per_lane) for thread_name in thread_names))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'ok': len(latencies),
+        'errors': errors,
+        'throughput': len(latencies) / elapsed,
+        'p50_ms': _percentile(latencies, 50) * 1000,
+        'p95_ms': _percentile(latencies, 95) * 1000,
+        'p99_ms': _percentile(latencies, 99) * 1000
+        }
+
+async def _run(config, args, base_url: str, secondary_base_url: str = None):
+    gpt_layer = _build_gpt_layer(config, base_url, secondary_base_url)
+    await gpt_layer['assistant_manager'].create_assistants(config.gpt_assistants_config)
+    await gpt_layer['assistant_manager'].create_assistants_with_functions(config.gpt_assistants_with_functions_config)
+
+    try:
+        for request_func, workload_name in (
+                (_execute_thread_request, 'execute_thread'),
+                (_execute_function_call_request, 'execute_function_call')):
+            for concurrency in args.concurrency:
+                result = await _run_level(gpt_layer, config, args, request_func, concurrency)
+                print(
+                    f"{workload_name:22} concurrency {concurrency:3}   {result['ok']:4} ok {result['errors']:3} errors   "
+                    f"{result['throughput']:7.2f} req/s   p50: {result['p50_ms']:7.1f}ms  "
+                    f"p95: {result['p95_ms']:7.1f}ms  p99: {result['p99_ms']:7.1f}ms"
+                )
+        if gpt_layer['backend_router']:
+            print(f"backend router: {gpt_layer['backend_router'].get_metrics()}")
+    finally:
+        await gpt_layer['http_client'].aclose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--yaml', default=os.getenv('CHATZILLA_CONFIG_YAML_FILEPATH'), help="the bot's yaml config")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--requests', type=int, default=64, help='requests per workload and concurrency level')
+    parser.add_argument('--assistant', default='chatforme', help='assistant used for execute_thread')
+    parser.add_argument('--base-url', default=None, help='use this server instead of starting the stand-in')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds the stand-in adds to every request')
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='share of stand-in requests that fail')
+    parser.add_argument('--failure-status', type=int, default=500, help='429 is retried for every request, 5xx only for GETs and DELETEs')
+    parser.add_argument('--run-seconds', type=float, default=0.5, help='how long stand-in runs stay in progress')
+    parser.add_argument('--run-failure-rate', type=float, default=0.0)
+    parser.add_argument('--slow-run-rate', type=float, default=0.0, help='share of stand-in runs that take --slow-run-seconds')
+    parser.add_argument('--slow-run-seconds', type=float, default=10.0)
+    parser.add_argument('--hedge', action='store_true', help='hedge execute_thread runs with a second stand-in')
+    args = parser.parse_args()
+
+    ConfigManager.initialize(args.yaml)
+    config = ConfigManager.get_instance()
+    logging.disable(logging.INFO) # measure the GPT layer, not its INFO log output
+
+    servers = []
+    base_url = args.base_url
+    if base_url is None:
+        servers.append(start_standin_server(StandInOptions(
+            latency_seconds=args.latency,
+            jitter_seconds=args.jitter,
+            failure_rate=args.failure_rate,
+            failure_status=args.failure_status,
+            run_seconds=args.run_seconds,
+            run_failure_rate=args.run_failure_rate,
+            slow_run_rate=args.slow_run_rate,
+            slow_run_seconds=args.slow_run_seconds
+            )))
+        base_url = f"http://127.0.0.1:{servers[-1].server_port}/v1"
+    secondary_base_url = None
+    if args.hedge:
+        servers.append(start_standin_server(StandInOptions(latency_seconds=args.latency, jitter_seconds=args.jitter)))
+        secondary_base_url = f"http://127.0.0.1:{servers[-1].server_port}/v1"
+    try:
+        asyncio.run(_run(config, args, base_url, secondary_base_url))
+    finally:
+        for server in servers:
+            server.shutdown()
+
+if __name__ == '__main__':
+    main()
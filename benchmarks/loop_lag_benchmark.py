@@ -0,0 +1,114 @@
+"""
+Benchmark: event loop lag while the GPT layer polls runs.
+
+Starts a local stand-in for the OpenAI API (every request answers after --latency seconds)
+and has --lanes concurrent coroutines poll runs.retrieve() --polls times each, the way
+GPTResponseManager does. It's run twice:
+    sync:  openai.OpenAI called inside async code (the old setup), each call blocks the loop
+    async: openai.AsyncOpenAI on a shared pooled httpx.AsyncClient (the current setup)
+Meanwhile a ticker measures how late a 10ms asyncio.sleep() wakes up, which is the delay
+IRC reads, the TwitchIO keepalive and the other lanes would see.
+
+Run from the repo root (needs the openai and httpx packages):
+    python -m benchmarks.loop_lag_benchmark --lanes 4 --polls 5 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import openai
+
+TICK_SECONDS = 0.01
+
+def start_stub_server(latency_seconds: float) -> ThreadingHTTPServer:
+    """Serves GET /v1/threads/{thread_id}/runs/{run_id} with an in-progress run after latency_seconds."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency_seconds)
+            run_id = self.path.rstrip('/').split('/')[-1]
+            body = json.dumps({"id": run_id, "object": "thread.run", "status": "in_progress"}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+async def _measure_loop_lag(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(time.perf_counter() - start - TICK_SECONDS)
+
+async def _poll_sync(client, lane, polls):
+    for i in range(polls):
+        client.beta.threads.runs.retrieve(thread_id=f"thread_{lane}", run_id=f"run_{i}")
+
+async def _poll_async(client, lane, polls):
+    for i in range(polls):
+        await client.beta.threads.runs.retrieve(thread_id=f"thread_{lane}", run_id=f"run_{i}")
+
+async def _run(mode, base_url, lanes, polls):
+    if mode == 'sync':
+        client = openai.OpenAI(api_key='benchmark', base_url=base_url, max_retries=0)
+        poll = _poll_sync
+    else:
+        http_client = httpx.AsyncClient(limits=httpx.Limits(max_connections=20, max_keepalive_connections=10))
+        client = openai.AsyncOpenAI(api_key='benchmark', base_url=base_url, max_retries=0, http_client=http_client)
+        poll = _poll_async
+
+    lags = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_measure_loop_lag(lags, stop))
+    await asyncio.sleep(TICK_SECONDS * 5)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(poll(client, lane, polls) for lane in range(lanes)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker
+    if mode != 'sync':
+        await http_client.aclose()
+
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    return {
+        'elapsed_s': elapsed,
+        'lag_p50_ms': statistics.median(lags_ms),
+        'lag_p95_ms': lags_ms[int(len(lags_ms) * 0.95) - 1],
+        'lag_max_ms': lags_ms[-1],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lanes', type=int, default=4)
+    parser.add_argument('--polls', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds the stub API takes to answer')
+    args = parser.parse_args()
+
+    server = start_stub_server(args.latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    try:
+        for mode in ('sync', 'async'):
+            result = asyncio.run(_run(mode, base_url, args.lanes, args.polls))
+            print(
+                f"{mode:5}  {args.lanes * args.polls} calls in {result['elapsed_s']:.2f}s   "
+                f"loop lag p50: {result['lag_p50_ms']:.1f}ms  p95: {result['lag_p95_ms']:.1f}ms  max: {result['lag_max_ms']:.1f}ms"
+            )
+    finally:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,586 @@
+"""
+Local stand-in for the OpenAI endpoints the GPT layer uses, for load tests that don't burn quota.
+
+Serves (under /v1):
+    assistants:       create, retrieve, update, delete
+    threads:          create (with seed messages), retrieve, delete
+    messages:         create, list (order/limit/after/before paging)
+    runs:             create, retrieve, list, cancel, submit_tool_outputs (polled or streamed as SSE)
+    chat completions: plain replies and forced function calls (the fast path and summaries)
+    audio speech:     a fixed-size fake mp3
+
+Runs stay in progress for --run-seconds (--slow-run-rate of them for --slow-run-seconds, for a long
+tail). Like the real API, a thread takes one active run at a
+time: creating a run or adding a message while one is active fails with a 400. A run with function tools (its own or its assistant's)
+stops at requires_action with a tool call whose arguments are made up from the function's JSON
+schema (first enum value, otherwise a placeholder), and completes once the outputs are submitted.
+
+Latency and failures are injected per request: every request waits --latency seconds (plus up to
+--jitter), --failure-rate of the requests fail with --failure-status (the OpenAI client retries
+these like real ones; with the GPTCallGovernor, POSTs are only retried on 429), and --run-failure-rate
+of the runs end 'failed'.
+
+Point the bot at it with openai-api.base_url in the bot's yaml, e.g.:
+    python -m benchmarks.openai_standin_server --port 8089 --latency 0.05 --run-seconds 1
+    openai-api:
+      base_url: "http://127.0.0.1:8089/v1"
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+class StandInOptions:
+    def __init__(
+            self,
+            latency_seconds=0.0,
+            jitter_seconds=0.0,
+            failure_rate=0.0,
+            failure_status=500,
+            run_seconds=0.5,
+            run_failure_rate=0.0,
+            slow_run_rate=0.0,
+            slow_run_seconds=10.0,
+            reply_text="This is a stand-in reply",
+            stream_chunks=8,
+            speech_bytes=32000
+            ):
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.run_seconds = run_seconds
+        self.run_failure_rate = run_failure_rate
+        self.slow_run_rate = slow_run_rate
+        self.slow_run_seconds = slow_run_seconds
+        self.reply_text = reply_text
+        self.stream_chunks = stream_chunks
+        self.speech_bytes = speech_bytes
+
+def _new_id(prefix: str) -> str:
+    return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+def _text_content(value: str) -> list:
+    return [{'type': 'text', 'text': {'value': value, 'annotations': []}}]
+
+def _content_text(content) -> str:
+    """Message content as sent by the client: a string or a list of content parts."""
+    if isinstance(content, str):
+        return content
+    return ''.join(part.get('text', '') for part in content or [] if part.get('type') == 'text')
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+def _fake_arguments(function_schema: dict) -> str:
+    """Arguments for a function call, made up from its JSON schema."""
+    parameters = function_schema.get('parameters', {})
+    arguments = {}
+    for name, prop in parameters.get('properties', {}).items():
+        if prop.get('enum'):
+            arguments[name] = prop['enum'][0]
+        elif prop.get('type') in ('integer', 'number'):
+            arguments[name] = 0
+        elif prop.get('type') == 'boolean':
+            arguments[name] = False
+        elif prop.get('type') == 'array':
+            arguments[name] = []
+        else:
+            arguments[name] = f"stand-in {name}"
+    return json.dumps(arguments)
+
+class StandInState:
+    """The assistants, threads, messages and runs the stand-in knows about (shared by the handler threads)."""
+    def __init__(self, options: StandInOptions):
+        self.options = options
+        self.lock = threading.Lock()
+        self.assistants = {}
+        self.threads = {}
+        self.messages = {}
+        self.runs = {}
+        self.request_counts = {}
+
+    def add_message(self, thread_id: str, role: str, text: str, assistant_id=None, run_id=None) -> dict:
+        message = {
+            'id': _new_id('msg'),
+            'object': 'thread.message',
+            'created_at': int(time.time()),
+            'thread_id': thread_id,
+            'role': role,
+            'content': _text_content(text),
+            'assistant_id': assistant_id,
+            'run_id': run_id,
+            'attachments': [],
+            'metadata': {},
+            'status': 'completed',
+            'completed_at': int(time.time()),
+            'incomplete_at': None,
+            'incomplete_details': None
+            }
+        self.messages[thread_id].append(message)
+        return message
+
+    def create_run(self, thread_id: str, body: dict) -> dict:
+        assistant = self.assistants.get(body.get('assistant_id'), {})
+        run = {
+            'id': _new_id('run'),
+            'object': 'thread.run',
+            'created_at': int(time.time()),
+            'thread_id': thread_id,
+            'assistant_id': body.get('assistant_id'),
+            'status': 'queued',
+            'required_action': None,
+            'last_error': None,
+            'expires_at': int(time.time()) + 600,
+            'started_at': None,
+            'cancelled_at': None,
+            'failed_at': None,
+            'completed_at': None,
+            'incomplete_details': None,
+            'model': body.get('model') or assistant.get('model', 'gpt-4o-mini'),
+            'instructions': body.get('instructions') or assistant.get('instructions', ''),
+            'tools': body.get('tools') or assistant.get('tools', []),
+            'metadata': {},
+            'usage': None,
+            'temperature': 1.0,
+            'top_p': 1.0,
+            'max_prompt_tokens': None,
+            'max_completion_tokens': body.get('max_completion_tokens'),
+            'truncation_strategy': {'type': 'auto', 'last_messages': None},
+            'response_format': 'auto',
+            'tool_choice': 'auto',
+            'parallel_tool_calls': True
+            }
+        run_seconds = self.options.slow_run_seconds if random.random() < self.options.slow_run_rate else self.options.run_seconds
+        self.runs[run['id']] = {'run': run, 'ready_at': time.monotonic() + run_seconds, 'tool_outputs': None}
+        return run
+
+    def active_run_id(self, thread_id: str) -> str:
+        """The thread's run that's still queued, in progress or waiting on tool outputs (the API allows one)."""
+        for run_id, entry in self.runs.items():
+            if entry['run']['thread_id'] == thread_id:
+                run, _ = self.advance_run(run_id)
+                if run['status'] in ('queued', 'in_progress', 'requires_action', 'cancelling'):
+                    return run_id
+        return None
+
+    def advance_run(self, run_id: str) -> tuple:
+        """
+        Moves a run whose time is up to its next status.
+
+        Returns:
+            tuple: The run and the assistant message it added (or None).
+        """
+        entry = self.runs[run_id]
+        run = entry['run']
+        if run['status'] not in ('queued', 'in_progress') or time.monotonic() < entry['ready_at']:
+            if run['status'] == 'queued':
+                run['status'] = 'in_progress'
+                run['started_at'] = int(time.time())
+            return run, None
+
+        function_tools = [tool['function'] for tool in run['tools'] if tool.get('type') == 'function']
+        if random.random() < self.options.run_failure_rate:
+            run['status'] = 'failed'
+            run['failed_at'] = int(time.time())
+            run['last_error'] = {'code': 'server_error', 'message': 'Injected run failure'}
+            return run, None
+        if function_tools and entry['tool_outputs'] is None:
+            run['status'] = 'requires_action'
+            run['required_action'] = {
+                'type': 'submit_tool_outputs',
+                'submit_tool_outputs': {'tool_calls': [{
+                    'id': _new_id('call'),
+                    'type': 'function',
+                    'function': {'name': function_tools[0]['name'], 'arguments': _fake_arguments(function_tools[0])}
+                    }]}
+                }
+            return run, None
+
+        # Replies to the latest user message, cut at max_completion_tokens like the real API
+        user_messages = [message for message in self.messages[run['thread_id']] if message['role'] == 'user']
+        latest_user_text = user_messages[-1]['content'][0]['text']['value'] if user_messages else ''
+        reply_text = f"{self.options.reply_text} to: {latest_user_text[:60]}"
+        max_completion_tokens = run['max_completion_tokens']
+        if max_completion_tokens and _estimate_tokens(reply_text) > max_completion_tokens:
+            reply_text = reply_text[:max_completion_tokens * 4]
+            run['status'] = 'incomplete'
+            run['incomplete_details'] = {'reason': 'max_completion_tokens'}
+        else:
+            run['status'] = 'completed'
+        run['completed_at'] = int(time.time())
+        run['required_action'] = None
+        run['usage'] = {
+            'prompt_tokens': sum(_estimate_tokens(message['content'][0]['text']['value']) for message in self.messages[run['thread_id']]),
+            'completion_tokens': _estimate_tokens(reply_text),
+            'total_tokens': 0
+            }
+        run['usage']['total_tokens'] = run['usage']['prompt_tokens'] + run['usage']['completion_tokens']
+        message = self.add_message(run['thread_id'], 'assistant', reply_text, assistant_id=run['assistant_id'], run_id=run_id)
+        return run, message
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # keep-alive, like the real API (streams close their connection)
+    state: StandInState = None
+
+    routes = [
+        ('POST', r'/v1/assistants', 'create_assistant'),
+        ('GET', r'/v1/assistants/(?P<assistant_id>[^/]+)', 'retrieve_assistant'),
+        ('POST', r'/v1/assistants/(?P<assistant_id>[^/]+)', 'update_assistant'),
+        ('DELETE', r'/v1/assistants/(?P<assistant_id>[^/]+)', 'delete_assistant'),
+        ('POST', r'/v1/threads', 'create_thread'),
+        ('GET', r'/v1/threads/(?P<thread_id>[^/]+)', 'retrieve_thread'),
+        ('DELETE', r'/v1/threads/(?P<thread_id>[^/]+)', 'delete_thread'),
+        ('POST', r'/v1/threads/(?P<thread_id>[^/]+)/messages', 'create_message'),
+        ('GET', r'/v1/threads/(?P<thread_id>[^/]+)/messages', 'list_messages'),
+        ('POST', r'/v1/threads/(?P<thread_id>[^/]+)/runs', 'create_run'),
+        ('GET', r'/v1/threads/(?P<thread_id>[^/]+)/runs', 'list_runs'),
+        ('GET', r'/v1/threads/(?P<thread_id>[^/]+)/runs/(?P<run_id>[^/]+)', 'retrieve_run'),
+        ('POST', r'/v1/threads/(?P<thread_id>[^/]+)/runs/(?P<run_id>[^/]+)/cancel', 'cancel_run'),
+        ('POST', r'/v1/threads/(?P<thread_id>[^/]+)/runs/(?P<run_id>[^/]+)/submit_tool_outputs', 'submit_tool_outputs'),
+        ('POST', r'/v1/chat/completions', 'chat_completion'),
+        ('POST', r'/v1/audio/speech', 'create_speech'),
+    ]
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def log_message(self, *args):
+        pass
+
+    def _dispatch(self, method: str):
+        url = urlparse(self.path)
+        content_length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(content_length) or b'{}') if content_length else {}
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        options = self.state.options
+        time.sleep(options.latency_seconds + random.uniform(0, options.jitter_seconds))
+
+        for route_method, pattern, handler_name in self.routes:
+            match = re.fullmatch(pattern, url.path.rstrip('/'))
+            if route_method == method and match:
+                with self.state.lock:
+                    self.state.request_counts[handler_name] = self.state.request_counts.get(handler_name, 0) + 1
+                if random.random() < options.failure_rate:
+                    return self._send_error(options.failure_status, 'Injected failure')
+                try:
+                    return getattr(self, handler_name)(body=body, query=query, **match.groupdict())
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stopped reading, e.g. a streamed run it cancelled
+                    return
+        self._send_error(404, f"No stand-in route for {method} {url.path}")
+
+    def _send_json(self, payload: dict, status=200):
+        response_body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response_body)))
+        self.end_headers()
+        self.wfile.write(response_body)
+
+    def _send_error(self, status: int, message: str):
+        error_type = 'rate_limit_exceeded' if status == 429 else 'invalid_request_error' if status < 500 else 'server_error'
+        self._send_json({'error': {'message': message, 'type': error_type, 'param': None, 'code': None}}, status=status)
+
+    def _start_event_stream(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+    def _send_event(self, event: str, data):
+        payload = data if isinstance(data, str) else json.dumps(data)
+        self.wfile.write(f"event: {event}\ndata: {payload}\n\n".encode())
+        self.wfile.flush()
+
+    def _not_found(self, kind: str, object_id: str):
+        self._send_error(404, f"No {kind} found with id '{object_id}'.")
+
+    # Assistants
+    def create_assistant(self, body, query):
+        assistant = {
+            'id': _new_id('asst'),
+            'object': 'assistant',
+            'created_at': int(time.time()),
+            'name': body.get('name'),
+            'description': body.get('description'),
+            'model': body.get('model', 'gpt-4o-mini'),
+            'instructions': body.get('instructions'),
+            'tools': body.get('tools', []),
+            'metadata': body.get('metadata', {}),
+            'top_p': 1.0,
+            'temperature': 1.0,
+            'response_format': 'auto'
+            }
+        with self.state.lock:
+            self.state.assistants[assistant['id']] = assistant
+        self._send_json(assistant)
+
+    def retrieve_assistant(self, body, query, assistant_id):
+        assistant = self.state.assistants.get(assistant_id)
+        if assistant is None:
+            return self._not_found('assistant', assistant_id)
+        self._send_json(assistant)
+
+    def update_assistant(self, body, query, assistant_id):
+        with self.state.lock:
+            assistant = self.state.assistants.get(assistant_id)
+            if assistant is not None:
+                assistant.update({key: value for key, value in body.items() if key in assistant})
+        if assistant is None:
+            return self._not_found('assistant', assistant_id)
+        self._send_json(assistant)
+
+    def delete_assistant(self, body, query, assistant_id):
+        with self.state.lock:
+            deleted = self.state.assistants.pop(assistant_id, None) is not None
+        self._send_json({'id': assistant_id, 'object': 'assistant.deleted', 'deleted': deleted})
+
+    # Threads and messages
+    def create_thread(self, body, query):
+        thread = {'id': _new_id('thread'), 'object': 'thread', 'created_at': int(time.time()), 'metadata': {}, 'tool_resources': None}
+        with self.state.lock:
+            self.state.threads[thread['id']] = thread
+            self.state.messages[thread['id']] = []
+            for message in body.get('messages', []):
+                self.state.add_message(thread['id'], message.get('role', 'user'), _content_text(message.get('content')))
+        self._send_json(thread)
+
+    def retrieve_thread(self, body, query, thread_id):
+        thread = self.state.threads.get(thread_id)
+        if thread is None:
+            return self._not_found('thread', thread_id)
+        self._send_json(thread)
+
+    def delete_thread(self, body, query, thread_id):
+        with self.state.lock:
+            deleted = self.state.threads.pop(thread_id, None) is not None
+            self.state.messages.pop(thread_id, None)
+        self._send_json({'id': thread_id, 'object': 'thread.deleted', 'deleted': deleted})
+
+    def create_message(self, body, query, thread_id):
+        with self.state.lock:
+            active_run_id = self.state.active_run_id(thread_id)
+            if thread_id not in self.state.threads or active_run_id:
+                message = None
+            else:
+                message = self.state.add_message(thread_id, body.get('role', 'user'), _content_text(body.get('content')))
+        if active_run_id:
+            return self._send_error(400, f"Can't add messages to {thread_id} while a run {active_run_id} is active.")
+        if message is None:
+            return self._not_found('thread', thread_id)
+        self._send_json(message)
+
+    def list_messages(self, body, query, thread_id):
+        with self.state.lock:
+            messages = list(self.state.messages.get(thread_id, []))
+        if query.get('order', 'desc') == 'desc':
+            messages.reverse()
+        message_ids = [message['id'] for message in messages]
+        if query.get('after') in message_ids:
+            messages = messages[message_ids.index(query['after']) + 1:]
+        elif query.get('before') in message_ids:
+            messages = messages[:message_ids.index(query['before'])]
+
+        limit = int(query.get('limit', 20))
+        page = messages[:limit]
+        self._send_json({
+            'object': 'list',
+            'data': page,
+            'first_id': page[0]['id'] if page else None,
+            'last_id': page[-1]['id'] if page else None,
+            'has_more': len(messages) > limit
+            })
+
+    # Runs
+    def create_run(self, body, query, thread_id):
+        with self.state.lock:
+            active_run_id = self.state.active_run_id(thread_id)
+            if thread_id not in self.state.threads or active_run_id:
+                run = None
+            else:
+                run = self.state.create_run(thread_id, body)
+        if active_run_id:
+            return self._send_error(400, f"Thread {thread_id} already has an active run {active_run_id}.")
+        if run is None:
+            return self._not_found('thread', thread_id)
+        if body.get('stream'):
+            return self._stream_run(run['id'], created=True)
+        self._send_json(run)
+
+    def retrieve_run(self, body, query, thread_id, run_id):
+        with self.state.lock:
+            if run_id not in self.state.runs:
+                run = None
+            else:
+                run, _ = self.state.advance_run(run_id)
+                run = dict(run)
+        if run is None:
+            return self._not_found('run', run_id)
+        self._send_json(run)
+
+    def list_runs(self, body, query, thread_id):
+        with self.state.lock:
+            runs = [dict(self.state.advance_run(run_id)[0]) for run_id, entry in self.state.runs.items() if entry['run']['thread_id'] == thread_id]
+        runs.reverse()
+        limit = int(query.get('limit', 20))
+        self._send_json({
+            'object': 'list',
+            'data': runs[:limit],
+            'first_id': runs[0]['id'] if runs else None,
+            'last_id': runs[:limit][-1]['id'] if runs else None,
+            'has_more': len(runs) > limit
+            })
+
+    def cancel_run(self, body, query, thread_id, run_id):
+        with self.state.lock:
+            entry = self.state.runs.get(run_id)
+            if entry is not None and entry['run']['status'] in ('queued', 'in_progress', 'requires_action'):
+                entry['run']['status'] = 'cancelled'
+                entry['run']['cancelled_at'] = int(time.time())
+        if entry is None:
+            return self._not_found('run', run_id)
+        self._send_json(entry['run'])
+
+    def submit_tool_outputs(self, body, query, thread_id, run_id):
+        with self.state.lock:
+            entry = self.state.runs.get(run_id)
+            if entry is not None and entry['run']['status'] == 'requires_action':
+                entry['tool_outputs'] = body.get('tool_outputs', [])
+                entry['run']['status'] = 'queued'
+                entry['run']['required_action'] = None
+                entry['ready_at'] = time.monotonic() + self.state.options.run_seconds
+        if entry is None:
+            return self._not_found('run', run_id)
+        if body.get('stream'):
+            return self._stream_run(run_id, created=False)
+        self._send_json(entry['run'])
+
+    def _stream_run(self, run_id: str, created: bool):
+        """Streams a run's events until it's finished or requires action, like runs.create(stream=True)."""
+        options = self.state.options
+        self._start_event_stream()
+        with self.state.lock:
+            run = dict(self.state.runs[run_id]['run'])
+            ready_at = self.state.runs[run_id]['ready_at']
+        if created:
+            self._send_event('thread.run.created', run)
+            self._send_event('thread.run.queued', run)
+        self._send_event('thread.run.in_progress', {**run, 'status': 'in_progress'})
+
+        time.sleep(max(0.0, ready_at - time.monotonic()))
+        with self.state.lock:
+            run, message = self.state.advance_run(run_id)
+            run = dict(run)
+
+        if message is not None:
+            text = message['content'][0]['text']['value']
+            self._send_event('thread.message.created', {**message, 'status': 'in_progress', 'content': []})
+            chunk_length = max(1, len(text) // max(1, options.stream_chunks))
+            for start in range(0, len(text), chunk_length):
+                self._send_event('thread.message.delta', {
+                    'id': message['id'],
+                    'object': 'thread.message.delta',
+                    'delta': {'content': [{'index': 0, 'type': 'text', 'text': {'value': text[start:start + chunk_length], 'annotations': []}}]}
+                    })
+            self._send_event('thread.message.completed', message)
+        self._send_event(f"thread.run.{run['status']}", run)
+        self._send_event('done', '[DONE]')
+
+    # Chat completions and audio
+    def chat_completion(self, body, query):
+        messages = body.get('messages', [])
+        prompt_text = ''.join(_content_text(message.get('content')) for message in messages)
+        tool_choice = body.get('tool_choice')
+        forced_function = tool_choice.get('function', {}).get('name') if isinstance(tool_choice, dict) else None
+        function_tools = {tool['function']['name']: tool['function'] for tool in body.get('tools', []) if tool.get('type') == 'function'}
+
+        message = {'role': 'assistant', 'content': None, 'refusal': None, 'tool_calls': None}
+        if forced_function in function_tools:
+            message['tool_calls'] = [{
+                'id': _new_id('call'),
+                'type': 'function',
+                'function': {'name': forced_function, 'arguments': _fake_arguments(function_tools[forced_function])}
+                }]
+            finish_reason = 'tool_calls'
+        else:
+            last_text = _content_text(messages[-1].get('content')) if messages else ''
+            message['content'] = f"{self.state.options.reply_text} to: {last_text[:60]}"
+            finish_reason = 'stop'
+
+        completion_text = message['content'] or ''
+        self._send_json({
+            'id': _new_id('chatcmpl'),
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'gpt-4o-mini'),
+            'choices': [{'index': 0, 'message': message, 'finish_reason': finish_reason, 'logprobs': None}],
+            'usage': {
+                'prompt_tokens': _estimate_tokens(prompt_text),
+                'completion_tokens': _estimate_tokens(completion_text),
+                'total_tokens': _estimate_tokens(prompt_text) + _estimate_tokens(completion_text)
+                }
+            })
+
+    def create_speech(self, body, query):
+        audio = b'\xff\xfb' + bytes(self.state.options.speech_bytes - 2)
+        self.send_response(200)
+        self.send_header('Content-Type', 'audio/mpeg')
+        self.send_header('Content-Length', str(len(audio)))
+        self.end_headers()
+        self.wfile.write(audio)
+
+def start_standin_server(options: StandInOptions, host='127.0.0.1', port=0) -> ThreadingHTTPServer:
+    """Starts the stand-in on a daemon thread. Its base_url is f"http://{host}:{server.server_port}/v1"."""
+    handler = type('BoundStandInHandler', (StandInHandler,), {'state': StandInState(options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds added to every request')
+    parser.add_argument('--jitter', type=float, default=0.02, help='up to this many extra seconds per request')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='share of requests answered with --failure-status')
+    parser.add_argument('--failure-status', type=int, default=500)
+    parser.add_argument('--run-seconds', type=float, default=1.0, help='how long a run stays in progress')
+    parser.add_argument('--run-failure-rate', type=float, default=0.0, help="share of runs that end 'failed'")
+    parser.add_argument('--slow-run-rate', type=float, default=0.0, help='share of runs that take --slow-run-seconds')
+    parser.add_argument('--slow-run-seconds', type=float, default=10.0)
+    args = parser.parse_args()
+
+    options = StandInOptions(
+        latency_seconds=args.latency,
+        jitter_seconds=args.jitter,
+        failure_rate=args.failure_rate,
+        failure_status=args.failure_status,
+        run_seconds=args.run_seconds,
+        run_failure_rate=args.run_failure_rate,
+        slow_run_rate=args.slow_run_rate,
+        slow_run_seconds=args.slow_run_seconds
+        )
+    server = start_standin_server(options, host=args.host, port=args.port)
+    print(f"OpenAI stand-in listening on http://{args.host}:{server.server_port}/v1 (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
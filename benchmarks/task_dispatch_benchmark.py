@@ -0,0 +1,97 @@
+"""
+Microbenchmark: tasks created and dispatched per second.
+
+Compares the old task objects (a create_logger() call and an eager task_dict per task,
+handled through an if/elif chain) with the current __slots__ records dispatched through
+the type -> handler registry. Both variants go through the real TaskManager.
+
+Run from the repo root:
+    python -m benchmarks.task_dispatch_benchmark --tasks 5000
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from my_modules.my_logging import create_logger
+from classes.TaskManagerClass import TaskManager
+from models.task import AddMessageTask, CreateSendChannelMessageTask
+
+class LegacyAddMessageTask(AddMessageTask):
+    """AddMessageTask as it was: a logger (re)created and task_dict built in every constructor."""
+    task_dict = None # plain attribute, as before, instead of the on-demand property
+
+    def __init__(self, thread_name, content, message_role='user'):
+        super().__init__(thread_name, content, message_role)
+        self.logger = create_logger(
+            dirname='log',
+            logger_name='TaskLogger',
+            debug_level='INFO',
+            mode='w',
+            stream_logs=False,
+            encoding='UTF-8'
+            )
+        self.task_dict = self.to_dict()
+
+async def _legacy_handler(task):
+    task_type = task.task_dict.get("type")
+    if task_type == "execute_thread":
+        pass
+    elif task_type == "send_channel_message":
+        pass
+    elif task_type == "add_message":
+        task.future.set_result(task.task_dict.get("content"))
+
+def _registry_handler():
+    async def add_message(task):
+        task.future.set_result(task.content)
+    async def noop(task):
+        task.future.set_result(None)
+    handlers = {
+        AddMessageTask.task_type: add_message,
+        CreateSendChannelMessageTask.task_type: noop,
+    }
+    async def handle_tasks(task):
+        await handlers[task.task_type](task)
+    return handle_tasks
+
+async def _run(task_class, handler, n_tasks, n_threads):
+    # Unbounded queues: every task is enqueued before any is awaited, so a bounded queue would shed them
+    task_manager = TaskManager(max_concurrent_tasks=n_threads, max_queue_size=0)
+    task_manager.logger.setLevel(logging.WARNING) # measure dispatch, not TaskManager log output
+    task_manager.on_task_ready = handler
+
+    start = time.perf_counter()
+    tasks = []
+    for i in range(n_tasks):
+        thread_name = f"thread_{i % n_threads}"
+        task = task_class(thread_name, f"message {i}")
+        tasks.append(task)
+        await task_manager.add_task_to_queue(thread_name, task)
+    created = time.perf_counter() - start
+    await asyncio.gather(*(task.future for task in tasks))
+    total = time.perf_counter() - start
+
+    for worker in task_manager.task_workers.values():
+        worker.cancel()
+    return created, total
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    variants = {
+        'legacy (logger per task, if/elif)': (LegacyAddMessageTask, _legacy_handler),
+        'current (__slots__, registry)': (AddMessageTask, _registry_handler()),
+    }
+    for name, (task_class, handler) in variants.items():
+        created, total = asyncio.run(_run(task_class, handler, args.tasks, args.threads))
+        print(
+            f"{name:36} created+queued: {args.tasks / created:10.0f} tasks/s   "
+            f"created+dispatched: {args.tasks / total:10.0f} tasks/s"
+        )
+
+if __name__ == '__main__':
+    main()
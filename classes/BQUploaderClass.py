@@ -84,7 +84,8 @@ class BQUploader:
         users_table_id: str, 
         limit: int = 750,
         user_login: str = None, 
-        content_filter: str = None
+        content_filter: str = None,
+        since_timestamp: str = None
         ) -> list[dict]:
     
         if not content_filter:
@@ -96,6 +97,12 @@ class BQUploader:
             user_filter = '1=1'
         else:
             user_filter = f"lower(u.user_login) = lower('{user_login}')"
+
+        # Only messages from since_timestamp ('YYYY-MM-DD HH:MM:SS') on, e.g. newer than a saved index
+        if not since_timestamp:
+            since_filter = '1=1'
+        else:
+            since_filter = f"CAST(ui.timestamp as string) >= '{since_timestamp}'"
             
         str_results = []
         query = f"""
@@ -109,6 +116,7 @@ class BQUploader:
             WHERE 1=1
                 AND {user_filter}
                 AND {content_filter}
+                AND {since_filter}
             ORDER BY ui.timestamp DESC
             LIMIT {limit}
             """ 
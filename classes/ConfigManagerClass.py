@@ -204,6 +204,30 @@ class ConfigManager:
             self.logger.error(f"Error in yaml_randomfact_json(): {e}")
             raise
 
+        try:
+            self.yaml_task_manager_config(self.yaml_data)
+        except Exception as e:
+            self.logger.error(f"Error in yaml_task_manager_config(): {e}")
+            raise
+
+        try:
+            self.yaml_degraded_mode_config(self.yaml_data)
+        except Exception as e:
+            self.logger.error(f"Error in yaml_degraded_mode_config(): {e}")
+            raise
+
+        try:
+            self.yaml_response_cache_config(self.yaml_data)
+        except Exception as e:
+            self.logger.error(f"Error in yaml_response_cache_config(): {e}")
+            raise
+
+        try:
+            self.yaml_conversation_intent_config(self.yaml_data)
+        except Exception as e:
+            self.logger.error(f"Error in yaml_conversation_intent_config(): {e}")
+            raise
+
     def set_env_file_variables(self):
         '''Loads environment variables from a .env file.'''
 
@@ -317,6 +341,58 @@ class ConfigManager:
             self.wordcount_medium = str(yaml_data['chatbot_config']['wordcounts']['medium'])
             self.wordcount_long = str(yaml_data['chatbot_config']['wordcounts']['long'])
             self.magic_max_waittime_for_gpt_response = int(yaml_data['openai-api']['magic_max_waittime_for_gpt_response'])
+            self.openai_stream_runs = bool(yaml_data['openai-api'].get('stream_runs', True))
+            self.openai_base_url = yaml_data['openai-api'].get('base_url') # None: the real API
+
+            http_client_config = yaml_data['openai-api'].get('http_client', {})
+            self.openai_http_max_connections = int(http_client_config.get('max_connections', 20))
+            self.openai_http_max_keepalive_connections = int(http_client_config.get('max_keepalive_connections', 10))
+            self.openai_http_keepalive_expiry_seconds = float(http_client_config.get('keepalive_expiry_seconds', 30))
+            self.openai_http_timeout_seconds = float(http_client_config.get('timeout_seconds', 60))
+
+            governor_config = yaml_data['openai-api'].get('governor', {})
+            self.openai_governor_enabled = bool(governor_config.get('enabled', True))
+            self.openai_governor_requests_per_minute = float(governor_config.get('requests_per_minute', 500))
+            self.openai_governor_tokens_per_minute = float(governor_config.get('tokens_per_minute', 200000))
+            self.openai_governor_max_attempts = int(governor_config.get('max_attempts', 4))
+            self.openai_governor_backoff_base_seconds = float(governor_config.get('backoff_base_seconds', 0.5))
+            self.openai_governor_backoff_max_seconds = float(governor_config.get('backoff_max_seconds', 20))
+            self.openai_governor_retry_budget_ratio = float(governor_config.get('retry_budget_ratio', 0.2))
+            self.openai_governor_retry_budget_max = float(governor_config.get('retry_budget_max', 10))
+            self.openai_governor_circuit_failure_threshold = int(governor_config.get('circuit_failure_threshold', 5))
+            self.openai_governor_circuit_open_seconds = float(governor_config.get('circuit_open_seconds', 30))
+
+            backend_router_config = yaml_data['openai-api'].get('backend_router', {})
+            self.openai_backend_router_enabled = bool(backend_router_config.get('enabled', False))
+            self.openai_backend_router_hedge_percentile = float(backend_router_config.get('hedge_percentile', 95))
+            self.openai_backend_router_initial_hedge_seconds = float(backend_router_config.get('initial_hedge_seconds', 8))
+            self.openai_backend_router_min_hedge_seconds = float(backend_router_config.get('min_hedge_seconds', 2))
+            self.openai_backend_router_max_hedge_seconds = float(backend_router_config.get('max_hedge_seconds', 30))
+            self.openai_backend_router_min_samples = int(backend_router_config.get('min_samples', 20))
+            self.openai_backend_router_context_message_limit = int(backend_router_config.get('context_message_limit', 20))
+            self.openai_backend_router_secondary_backends = [
+                {
+                    'name': backend.get('name', backend['base_url']),
+                    'base_url': backend['base_url'],
+                    'api_key': os.getenv(backend.get('api_key_env', 'OPENAI_API_KEY')) or 'none', # local servers usually don't check it
+                    'model': backend.get('model') # None: the assistant's model
+                }
+                for backend in backend_router_config.get('secondary_backends') or []
+            ]
+
+            run_watcher_config = yaml_data['openai-api'].get('run_watcher', {})
+            self.openai_run_watcher_initial_poll_seconds = float(run_watcher_config.get('initial_poll_seconds', 0.5))
+            self.openai_run_watcher_max_poll_seconds = float(run_watcher_config.get('max_poll_seconds', 5))
+            self.openai_run_watcher_backoff_factor = float(run_watcher_config.get('backoff_factor', 1.5))
+
+            thread_context_config = yaml_data['openai-api'].get('thread_context', {})
+            self.thread_context_enabled = bool(thread_context_config.get('enabled', True))
+            self.thread_context_token_budget = int(thread_context_config.get('token_budget', 8000))
+            self.thread_context_seed_last_n_messages = int(thread_context_config.get('seed_last_n_messages', 10))
+            self.thread_context_summary_max_tokens = int(thread_context_config.get('summary_max_tokens', 300))
+            self.thread_context_summary_chunk_tokens = int(thread_context_config.get('summary_chunk_tokens', 1500))
+            self.thread_context_summary_model = thread_context_config.get('summary_model', 'gpt-4o-mini')
+            self.thread_context_delete_grace_seconds = int(thread_context_config.get('delete_grace_seconds', 120))
         except Exception as e:
             self.logger.error(f"Error in yaml_gpt_config(): {e}")
 
@@ -330,6 +406,11 @@ class ConfigManager:
         #assistants
         self.gpt_assistants_config = yaml_data['gpt_assistants_config']
         self.assistant_response_max_length = yaml_data['openai-api']['assistant_response_max_length']
+        self.assistant_response_max_completion_tokens = yaml_data['openai-api'].get('assistant_response_max_completion_tokens', 300)
+
+        gpt_fast_path_config = yaml_data.get('gpt_fast_path', {})
+        self.gpt_fast_path_assistants = gpt_fast_path_config.get('assistants', []) or []
+        self.gpt_fast_path_context_message_limit = int(gpt_fast_path_config.get('context_message_limit', 20))
         self.gpt_assistants_suffix = yaml_data['gpt_assistants_suffix']
 
     def yaml_gpt_assistants_with_functions_config(self, yaml_data):
@@ -375,6 +456,11 @@ class ConfigManager:
     def yaml_gpt_thread_config(self, yaml_data):
         self.gpt_thread_names = yaml_data['gpt_thread_names']
 
+        gpt_registry_config = yaml_data.get('gpt_registry', {})
+        self.gpt_registry_enabled = bool(gpt_registry_config.get('enabled', True))
+        self.gpt_registry_file_path = gpt_registry_config.get('registry_file_path', './data/gpt_registry.json')
+        self.gpt_registry_reuse_threads = bool(gpt_registry_config.get('reuse_threads', False))
+
     def yaml_gpt_explain_config(self, yaml_data):
         self.gpt_explain_prompts = yaml_data['gpt_explain_prompts']
         self.explanation_suffix = yaml_data['gpt_explain_prompts']['explanation_suffix']
@@ -423,8 +509,19 @@ class ConfigManager:
             self.twitch_bot_faiss_general_index_service = yaml_data['twitch-app']['twitch_bot_faiss_general_index_service']
             self.twitch_bot_faiss_testing_active = yaml_data['twitch-app']['twitch_bot_faiss_testing_active']
 
+            faiss_session_index_config = yaml_data.get('faiss_session_index', {})
+            self.faiss_session_index_snapshot_dirpath = faiss_session_index_config.get('snapshot_dirpath', './data/faiss_session_index') # None: not saved
+            self.faiss_session_index_checkpoint_interval_seconds = float(faiss_session_index_config.get('checkpoint_interval_seconds', 600))
+            self.faiss_session_index_initial_load_limit = int(faiss_session_index_config.get('initial_load_limit', 30000))
+
+            embedding_store_config = yaml_data.get('embedding_store', {})
+            self.embedding_store_dirpath = embedding_store_config.get('store_dirpath', './data/embedding_store') # None: kept in memory
+
             self.num_bot_responses = yaml_data['chatforme_randomfacts']['num_bot_responses']
             self.msg_history_limit = yaml_data['chatbot_config']['msg_history_limit']
+            thread_message_buffer_config = yaml_data['chatbot_config'].get('thread_message_buffer', {})
+            self.thread_message_buffer_max_messages = int(thread_message_buffer_config.get('max_messages', 20))
+            self.thread_message_buffer_max_age_seconds = float(thread_message_buffer_config.get('max_age_seconds', 60))
 
         except Exception as e:
             self.logger.error(f"Error in yaml_twitchbot_config(): {e}")
@@ -541,6 +638,57 @@ class ConfigManager:
         except Exception as e:
             self.logger.error(f"Error in yaml_factchecker_config(): {e}")
 
+    def yaml_task_manager_config(self, yaml_data):
+        try:
+            task_manager_config = yaml_data.get('task_manager', {})
+            self.task_manager_max_concurrent_tasks = int(task_manager_config.get('max_concurrent_tasks', 3))
+            self.task_manager_priority_aging_seconds = float(task_manager_config.get('priority_aging_seconds', 30))
+            self.task_manager_max_queue_size = int(task_manager_config.get('max_queue_size', 50))
+            self.task_manager_task_ttl_seconds = task_manager_config.get('task_ttl_seconds', {'interactive': 60, 'moderator': 180, 'background': 120})
+        except Exception as e:
+            self.logger.error(f"Error in yaml_task_manager_config(): {e}")
+
+    def yaml_degraded_mode_config(self, yaml_data):
+        try:
+            degraded_mode_config = yaml_data.get('degraded_mode', {})
+            self.degraded_mode_enabled = bool(degraded_mode_config.get('enabled', True))
+            self.degraded_mode_enter_backlog = int(degraded_mode_config.get('enter_backlog', 15))
+            self.degraded_mode_enter_oldest_task_age_seconds = float(degraded_mode_config.get('enter_oldest_task_age_seconds', 30))
+            self.degraded_mode_exit_backlog = int(degraded_mode_config.get('exit_backlog', 3))
+            self.degraded_mode_exit_oldest_task_age_seconds = float(degraded_mode_config.get('exit_oldest_task_age_seconds', 5))
+            self.degraded_mode_exit_hold_seconds = float(degraded_mode_config.get('exit_hold_seconds', 30))
+            self.degraded_mode_check_interval_seconds = float(degraded_mode_config.get('check_interval_seconds', 5))
+
+            # Live state, set by the DegradedModeService: the flag, and the configured values of the
+            # settings it has swapped out (read them from here while degraded, e.g. for assistant instructions)
+            self.degraded_mode_active = False
+            self.degraded_mode_saved_settings = {}
+        except Exception as e:
+            self.logger.error(f"Error in yaml_degraded_mode_config(): {e}")
+
+    def yaml_response_cache_config(self, yaml_data):
+        try:
+            response_cache_config = yaml_data.get('response_cache', {})
+            self.response_cache_enabled = bool(response_cache_config.get('enabled', True))
+            self.response_cache_similarity_threshold = float(response_cache_config.get('similarity_threshold', 0.92))
+            self.response_cache_ttl_seconds = float(response_cache_config.get('ttl_seconds', 600))
+            self.response_cache_max_entries = int(response_cache_config.get('max_entries', 200))
+            # chatforme answers from the live thread, so a reply to one viewer's conversation rarely fits another's
+            self.response_cache_excluded_assistants = response_cache_config.get('excluded_assistants', ['chatforme']) or []
+        except Exception as e:
+            self.logger.error(f"Error in yaml_response_cache_config(): {e}")
+
+    def yaml_conversation_intent_config(self, yaml_data):
+        try:
+            conversation_intent_config = yaml_data.get('conversation_intent', {})
+            self.conversation_intent_enabled = bool(conversation_intent_config.get('enabled', True))
+            self.conversation_intent_window_seconds = float(conversation_intent_config.get('window_seconds', 180))
+            self.conversation_intent_max_messages = int(conversation_intent_config.get('max_messages', 10))
+            self.conversation_intent_min_confidence = float(conversation_intent_config.get('min_confidence', 0.65))
+            self.conversation_intent_fallback_to_function_call = bool(conversation_intent_config.get('fallback_to_function_call', True))
+        except Exception as e:
+            self.logger.error(f"Error in yaml_conversation_intent_config(): {e}")
+
     def update_spellcheck_config(self, yaml_data):
         self.command_spellcheck_terms_filepath = yaml_data['spellcheck_commands_filename']
         self.command_spellcheck_terms = utils.load_json(path_or_dir=self.command_spellcheck_terms_filepath)
@@ -608,7 +756,42 @@ class ConfigManager:
         self.logger.debug(f"wordcount_medium: {self.wordcount_medium}")
         self.logger.debug(f"wordcount_long: {self.wordcount_long}")
         self.logger.debug(f"assistant_response_max_length: {self.assistant_response_max_length}")
+        self.logger.debug(f"assistant_response_max_completion_tokens: {self.assistant_response_max_completion_tokens}")
         self.logger.debug(f"magic_max_waittime_for_gpt_response: {self.magic_max_waittime_for_gpt_response}")
+        self.logger.debug(f"openai_stream_runs: {self.openai_stream_runs}")
+        self.logger.debug(f"openai_base_url: {self.openai_base_url}")
+        self.logger.debug(f"openai_http_max_connections: {self.openai_http_max_connections}")
+        self.logger.debug(f"openai_http_max_keepalive_connections: {self.openai_http_max_keepalive_connections}")
+        self.logger.debug(f"openai_http_keepalive_expiry_seconds: {self.openai_http_keepalive_expiry_seconds}")
+        self.logger.debug(f"openai_http_timeout_seconds: {self.openai_http_timeout_seconds}")
+        self.logger.debug(f"openai_run_watcher_initial_poll_seconds: {self.openai_run_watcher_initial_poll_seconds}")
+        self.logger.debug(f"openai_run_watcher_max_poll_seconds: {self.openai_run_watcher_max_poll_seconds}")
+        self.logger.debug(f"openai_run_watcher_backoff_factor: {self.openai_run_watcher_backoff_factor}")
+        self.logger.debug(f"openai_governor_enabled: {self.openai_governor_enabled}")
+        self.logger.debug(f"openai_governor_requests_per_minute: {self.openai_governor_requests_per_minute}")
+        self.logger.debug(f"openai_governor_tokens_per_minute: {self.openai_governor_tokens_per_minute}")
+        self.logger.debug(f"openai_governor_max_attempts: {self.openai_governor_max_attempts}")
+        self.logger.debug(f"openai_governor_backoff_base_seconds: {self.openai_governor_backoff_base_seconds}")
+        self.logger.debug(f"openai_governor_backoff_max_seconds: {self.openai_governor_backoff_max_seconds}")
+        self.logger.debug(f"openai_governor_retry_budget_ratio: {self.openai_governor_retry_budget_ratio}")
+        self.logger.debug(f"openai_governor_retry_budget_max: {self.openai_governor_retry_budget_max}")
+        self.logger.debug(f"openai_governor_circuit_failure_threshold: {self.openai_governor_circuit_failure_threshold}")
+        self.logger.debug(f"openai_governor_circuit_open_seconds: {self.openai_governor_circuit_open_seconds}")
+        self.logger.debug(f"openai_backend_router_enabled: {self.openai_backend_router_enabled}")
+        self.logger.debug(f"openai_backend_router_hedge_percentile: {self.openai_backend_router_hedge_percentile}")
+        self.logger.debug(f"openai_backend_router_initial_hedge_seconds: {self.openai_backend_router_initial_hedge_seconds}")
+        self.logger.debug(f"openai_backend_router_min_hedge_seconds: {self.openai_backend_router_min_hedge_seconds}")
+        self.logger.debug(f"openai_backend_router_max_hedge_seconds: {self.openai_backend_router_max_hedge_seconds}")
+        self.logger.debug(f"openai_backend_router_min_samples: {self.openai_backend_router_min_samples}")
+        self.logger.debug(f"openai_backend_router_context_message_limit: {self.openai_backend_router_context_message_limit}")
+        self.logger.debug(f"openai_backend_router_secondary_backends: {[(backend['name'], backend['base_url'], backend['model']) for backend in self.openai_backend_router_secondary_backends]}")
+        self.logger.debug(f"thread_context_enabled: {self.thread_context_enabled}")
+        self.logger.debug(f"thread_context_token_budget: {self.thread_context_token_budget}")
+        self.logger.debug(f"thread_context_seed_last_n_messages: {self.thread_context_seed_last_n_messages}")
+        self.logger.debug(f"thread_context_summary_max_tokens: {self.thread_context_summary_max_tokens}")
+        self.logger.debug(f"thread_context_summary_chunk_tokens: {self.thread_context_summary_chunk_tokens}")
+        self.logger.debug(f"thread_context_summary_model: {self.thread_context_summary_model}")
+        self.logger.debug(f"thread_context_delete_grace_seconds: {self.thread_context_delete_grace_seconds}")
 
         # 5) TTS VOICES / AUDIO CONFIG
         self.logger.debug("")
@@ -677,6 +860,10 @@ class ConfigManager:
         self.logger.debug(f"vibechecker_listener_sleep_time: {self.vibechecker_listener_sleep_time}")
         self.logger.debug(f"formatted_gpt_vibecheck_alert: {self.formatted_gpt_vibecheck_alert}")
         self.logger.debug(f"flag_returning_users_service: {self.flag_returning_users_service}")
+        self.logger.debug(f"faiss_session_index_snapshot_dirpath: {self.faiss_session_index_snapshot_dirpath}")
+        self.logger.debug(f"faiss_session_index_checkpoint_interval_seconds: {self.faiss_session_index_checkpoint_interval_seconds}")
+        self.logger.debug(f"faiss_session_index_initial_load_limit: {self.faiss_session_index_initial_load_limit}")
+        self.logger.debug(f"embedding_store_dirpath: {self.embedding_store_dirpath}")
 
         # 10) CHATFORME
         self.logger.debug("")
@@ -716,6 +903,9 @@ class ConfigManager:
         self.logger.debug("=               13) GPT THREADS                  =")
         self.logger.debug("==================================================")
         self.logger.debug(f"gpt_thread_names: {self.gpt_thread_names}")
+        self.logger.debug(f"gpt_registry_enabled: {self.gpt_registry_enabled}")
+        self.logger.debug(f"gpt_registry_file_path: {self.gpt_registry_file_path}")
+        self.logger.debug(f"gpt_registry_reuse_threads: {self.gpt_registry_reuse_threads}")
 
         # 14) GPT ASSISTANTS & FUNCTION SCHEMAS
         self.logger.debug("")
@@ -724,6 +914,8 @@ class ConfigManager:
         self.logger.debug("==================================================")
         self.logger.debug(f"gpt_assistants_config: {self.gpt_assistants_config}")
         self.logger.debug(f"gpt_assistants_suffix: {self.gpt_assistants_suffix}")
+        self.logger.debug(f"gpt_fast_path_assistants: {self.gpt_fast_path_assistants}")
+        self.logger.debug(f"gpt_fast_path_context_message_limit: {self.gpt_fast_path_context_message_limit}")
         self.logger.debug(f"function_schemas_path: {self.function_schemas_path}")
         self.logger.debug(f"function_schemas: {self.function_schemas}")
         self.logger.debug(f"gpt_assistants_with_functions_config: {self.gpt_assistants_with_functions_config}")
@@ -769,8 +961,55 @@ class ConfigManager:
         self.logger.debug("==================================================")
         self.logger.debug(f"num_bot_responses: {self.num_bot_responses}")
         self.logger.debug(f"msg_history_limit: {self.msg_history_limit}")
+        self.logger.debug(f"thread_message_buffer_max_messages: {self.thread_message_buffer_max_messages}")
+        self.logger.debug(f"thread_message_buffer_max_age_seconds: {self.thread_message_buffer_max_age_seconds}")
+
+        # 18) TASK MANAGER
+        self.logger.debug("")
+        self.logger.debug("==================================================")
+        self.logger.debug("=              18) TASK MANAGER                  =")
+        self.logger.debug("==================================================")
+        self.logger.debug(f"task_manager_max_concurrent_tasks: {self.task_manager_max_concurrent_tasks}")
+        self.logger.debug(f"task_manager_priority_aging_seconds: {self.task_manager_priority_aging_seconds}")
+        self.logger.debug(f"task_manager_max_queue_size: {self.task_manager_max_queue_size}")
+        self.logger.debug(f"task_manager_task_ttl_seconds: {self.task_manager_task_ttl_seconds}")
+
+        # 19) DEGRADED MODE
+        self.logger.debug("")
+        self.logger.debug("==================================================")
+        self.logger.debug("=              19) DEGRADED MODE                 =")
+        self.logger.debug("==================================================")
+        self.logger.debug(f"degraded_mode_enabled: {self.degraded_mode_enabled}")
+        self.logger.debug(f"degraded_mode_enter_backlog: {self.degraded_mode_enter_backlog}")
+        self.logger.debug(f"degraded_mode_enter_oldest_task_age_seconds: {self.degraded_mode_enter_oldest_task_age_seconds}")
+        self.logger.debug(f"degraded_mode_exit_backlog: {self.degraded_mode_exit_backlog}")
+        self.logger.debug(f"degraded_mode_exit_oldest_task_age_seconds: {self.degraded_mode_exit_oldest_task_age_seconds}")
+        self.logger.debug(f"degraded_mode_exit_hold_seconds: {self.degraded_mode_exit_hold_seconds}")
+        self.logger.debug(f"degraded_mode_check_interval_seconds: {self.degraded_mode_check_interval_seconds}")
+
+        # 20) RESPONSE CACHE
+        self.logger.debug("")
+        self.logger.debug("==================================================")
+        self.logger.debug("=              20) RESPONSE CACHE                =")
+        self.logger.debug("==================================================")
+        self.logger.debug(f"response_cache_enabled: {self.response_cache_enabled}")
+        self.logger.debug(f"response_cache_similarity_threshold: {self.response_cache_similarity_threshold}")
+        self.logger.debug(f"response_cache_ttl_seconds: {self.response_cache_ttl_seconds}")
+        self.logger.debug(f"response_cache_max_entries: {self.response_cache_max_entries}")
+        self.logger.debug(f"response_cache_excluded_assistants: {self.response_cache_excluded_assistants}")
+
+        # 21) CONVERSATION INTENT
+        self.logger.debug("")
+        self.logger.debug("==================================================")
+        self.logger.debug("=            21) CONVERSATION INTENT             =")
+        self.logger.debug("==================================================")
+        self.logger.debug(f"conversation_intent_enabled: {self.conversation_intent_enabled}")
+        self.logger.debug(f"conversation_intent_window_seconds: {self.conversation_intent_window_seconds}")
+        self.logger.debug(f"conversation_intent_max_messages: {self.conversation_intent_max_messages}")
+        self.logger.debug(f"conversation_intent_min_confidence: {self.conversation_intent_min_confidence}")
+        self.logger.debug(f"conversation_intent_fallback_to_function_call: {self.conversation_intent_fallback_to_function_call}")
 
-        # 18) LOG COMPLETE
+        # 22) LOG COMPLETE
         self.logger.debug("")
         self.logger.debug("==================================================")
         self.logger.debug("=                LOG COMPLETE                    =")
@@ -6,4 +6,25 @@ class SomeOtherCustomException(Exception):
     pass
 
 class YetAnotherCustomException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class TaskDroppedException(Exception):
+    """Raised on a task's future when the TaskManager drops it without running it to completion."""
+    pass
+
+class TaskExpiredException(TaskDroppedException):
+    pass
+
+class TaskSupersededException(TaskDroppedException):
+    pass
+
+class TaskCancelledException(TaskDroppedException):
+    pass
+
+class TaskShedException(TaskDroppedException):
+    """Raised on a task's future when it is shed from a full queue."""
+    pass
+
+class TaskRejectedException(TaskShedException):
+    """Raised on a task's future when it is turned away because its queue is full."""
+    pass
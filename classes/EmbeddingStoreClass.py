@@ -0,0 +1,155 @@
+import json
+import os
+
+import numpy as np
+
+from my_modules.my_logging import create_logger
+
+runtime_logger_level = 'INFO'
+
+class EmbeddingStore:
+    """
+    Chat message embeddings keyed by message_id, so each message is encoded once for its lifetime and
+    every consumer (the session index, user history indexes) gets its vectors by id.
+
+    With store_dirpath, the store is kept on disk and reused across restarts:
+        embeddings.f32:        float32 rows, append-only (row n is the nth stored message)
+        embedding_ids.txt:     the message_id of each row, one per line (the offset index)
+        embedding_store.json:  {"embedding_model", "embedding_dim"}, a store made with another model is cleared
+    Rows are memory-mapped for lookups. New rows are written (and flushed to the OS) as they're added;
+    after a crash, only the rows present in both files are kept. Without store_dirpath the rows are kept
+    in memory for the session.
+    """
+    vectors_filename = 'embeddings.f32'
+    ids_filename = 'embedding_ids.txt'
+    metadata_filename = 'embedding_store.json'
+
+    def __init__(self, transformer_model, embedding_model: str, store_dirpath: str = None):
+        self.logger = create_logger(
+            dirname='log',
+            logger_name='logger_EmbeddingStore',
+            debug_level=runtime_logger_level,
+            mode='w',
+            stream_logs=True
+            )
+        self.transformer_model = transformer_model
+        self.embedding_model = embedding_model
+        self.embedding_dim = transformer_model.get_sentence_embedding_dimension()
+        self.store_dirpath = store_dirpath
+
+        # message_id -> row
+        self.offsets = {}
+        self.count = 0
+        # Rows readable by offset: the memory-mapped file (remapped once it has grown), or the in-memory matrix
+        self.rows = np.empty((0, self.embedding_dim), dtype='float32')
+        self.vectors_file = None
+        self.ids_file = None
+
+        self.encoded = 0
+        self.hits = 0
+
+        if store_dirpath:
+            self._open()
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.store_dirpath, filename)
+
+    def _open(self):
+        os.makedirs(self.store_dirpath, exist_ok=True)
+        vectors_file_path = self._path(self.vectors_filename)
+        ids_file_path = self._path(self.ids_filename)
+        metadata = {'embedding_model': self.embedding_model, 'embedding_dim': self.embedding_dim}
+
+        message_ids = []
+        try:
+            with open(self._path(self.metadata_filename), 'r', encoding='utf-8') as file:
+                stored_metadata = json.load(file)
+            if stored_metadata != metadata:
+                self.logger.warning(f"Embedding store was made with {stored_metadata}, clearing it for {metadata}")
+            elif os.path.exists(ids_file_path):
+                with open(ids_file_path, 'r', encoding='utf-8') as file:
+                    # A line without its newline was cut short by a crash
+                    message_ids = [line[:-1] for line in file if line.endswith('\n')]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            # A bad store only costs re-encoding, never a failed startup
+            self.logger.error(f"Error reading embedding store {self.store_dirpath}, clearing it: {e}")
+
+        row_bytes = self.embedding_dim * 4
+        stored_rows = os.path.getsize(vectors_file_path) // row_bytes if message_ids and os.path.exists(vectors_file_path) else 0
+        self.count = min(len(message_ids), stored_rows)
+        message_ids = message_ids[:self.count]
+        self.offsets = {message_id: row for row, message_id in enumerate(message_ids)}
+
+        # Drops anything past the rows both files agree on, then appends from there
+        with open(vectors_file_path, 'ab') as file:
+            file.truncate(self.count * row_bytes)
+        with open(ids_file_path, 'w', encoding='utf-8') as file:
+            file.writelines(f"{message_id}\n" for message_id in message_ids)
+        with open(self._path(self.metadata_filename), 'w', encoding='utf-8') as file:
+            json.dump(metadata, file)
+        self.vectors_file = open(vectors_file_path, 'ab')
+        self.ids_file = open(ids_file_path, 'a', encoding='utf-8')
+
+        self._remap()
+        self.logger.info(f"Opened embedding store {self.store_dirpath} with {self.count} messages")
+
+    def _remap(self):
+        if self.count:
+            self.rows = np.memmap(self._path(self.vectors_filename), dtype='float32', mode='r', shape=(self.count, self.embedding_dim))
+
+    def _append(self, message_ids: list, vectors: np.ndarray):
+        if self.vectors_file:
+            self.vectors_file.write(vectors.tobytes())
+            self.vectors_file.flush()
+            self.ids_file.writelines(f"{message_id}\n" for message_id in message_ids)
+            self.ids_file.flush()
+        else:
+            if self.count + len(vectors) > self.rows.shape[0]:
+                grown_rows = np.empty((max(2 * self.rows.shape[0], self.count + len(vectors), 256), self.embedding_dim), dtype='float32')
+                grown_rows[:self.count] = self.rows[:self.count]
+                self.rows = grown_rows
+            self.rows[self.count:self.count + len(vectors)] = vectors
+        for message_id in message_ids:
+            self.offsets[message_id] = self.count
+            self.count += 1
+
+    def _read_rows(self, offsets: list) -> np.ndarray:
+        if self.vectors_file and offsets and max(offsets) >= self.rows.shape[0]:
+            self._remap()
+        return np.array(self.rows[offsets], dtype='float32').reshape(len(offsets), self.embedding_dim)
+
+    def get_vectors(self, message_ids: list, texts: list) -> np.ndarray:
+        """
+        Returns the embeddings of the messages (one row per message, in order), encoding and storing
+        only the messages that aren't stored yet.
+        """
+        missing = {}
+        for message_id, text in zip(message_ids, texts):
+            if message_id not in self.offsets and message_id not in missing:
+                missing[message_id] = text
+        if missing:
+            embeddings = self.transformer_model.encode(list(missing.values()), convert_to_tensor=False)
+            self._append(list(missing), np.array(embeddings).astype('float32').reshape(len(missing), self.embedding_dim))
+            self.encoded += len(missing)
+        self.hits += len(message_ids) - len(missing)
+        return self._read_rows([self.offsets[message_id] for message_id in message_ids])
+
+    def lookup(self, message_ids: list) -> tuple:
+        """
+        Returns:
+            tuple: The ids that are stored, and their embeddings (nothing is encoded).
+        """
+        found_ids = [message_id for message_id in message_ids if message_id in self.offsets]
+        return found_ids, self._read_rows([self.offsets[message_id] for message_id in found_ids])
+
+    def flush(self):
+        """Syncs the store to disk (rows are already handed to the OS as they're added)."""
+        for file in (self.vectors_file, self.ids_file):
+            if file:
+                file.flush()
+                os.fsync(file.fileno())
+
+    def get_metrics(self) -> dict:
+        return {'messages': self.count, 'encoded': self.encoded, 'hits': self.hits}
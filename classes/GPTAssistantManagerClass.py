@@ -1,14 +1,16 @@
 import asyncio
 import json
 
-from tenacity import AsyncRetrying, stop_after_attempt, wait_fixed
-from collections import defaultdict
+from collections import defaultdict, deque
 from typing import Dict, List, Callable
+import openai
 import requests
 
 from my_modules.my_logging import create_logger
 
 from classes.ConfigManagerClass import ConfigManager
+from classes.GPTRegistryClass import GPTRegistry
+from classes.GPTResponseCleaner import GPTResponseCleaner
 
 from my_modules import utils
 
@@ -16,13 +18,14 @@ gpt_base_debug_level = 'INFO'
 gpt_thread_mgr_debug_level = 'INFO'
 gpt_assistant_mgr_debug_level = 'INFO'
 gpt_response_mgr_debug_level = 'INFO'
+gpt_fast_path_mgr_debug_level = 'INFO'
 
 class GPTBaseClass:
     """
     Initializes the GPT Base Class.
 
     Args:
-        gpt_client: An instance of the OpenAI client.
+        gpt_client: An instance of the AsyncOpenAI client.
 
     Attributes:
         logger (Logger): A logger for this class.
@@ -38,11 +41,60 @@ class GPTBaseClass:
         self.gpt_client = gpt_client
         self.yaml_data = ConfigManager.get_instance()
 
+        # Stream runs (events as they happen) instead of polling their status
+        self.stream_runs = self.yaml_data.openai_stream_runs
+
         def create():
             print("did a create")
         def delete():
             print("did a delete")
 
+    # Streamed run events after which the run is finished, or waiting on us (requires_action)
+    run_stream_final_events = {
+        'thread.run.completed',
+        'thread.run.requires_action',
+        'thread.run.failed',
+        'thread.run.cancelled',
+        'thread.run.expired',
+        'thread.run.incomplete'
+    }
+
+    async def _consume_run_stream(self, stream, on_delta: Callable = None, on_run_created: Callable = None) -> tuple:
+        """
+        Reads a streamed run's events until the run is finished or requires action.
+
+        Args:
+            stream: The AsyncStream returned by runs.create(stream=True) or submit_tool_outputs(stream=True).
+            on_delta (Callable, optional): Awaited with each chunk of assistant text as it arrives.
+            on_run_created (Callable, optional): Called with the run object once the run exists.
+
+        Returns:
+            tuple: The final run object and the text of the assistant's message.
+        """
+        text_parts = []
+        async with stream:
+            async for event in stream:
+                if event.event == 'thread.run.created':
+                    if on_run_created:
+                        on_run_created(event.data)
+                elif event.event == 'thread.message.created':
+                    text_parts = []
+                elif event.event == 'thread.message.delta':
+                    for content in event.data.delta.content or []:
+                        if content.type == 'text' and content.text and content.text.value:
+                            text_parts.append(content.text.value)
+                            if on_delta:
+                                await on_delta(content.text.value)
+                elif event.event == 'thread.message.completed':
+                    text_parts = [content.text.value for content in event.data.content if content.type == 'text']
+                elif event.event in self.run_stream_final_events:
+                    # Return as soon as the run is done, without waiting for the stream to close
+                    return event.data, ''.join(text_parts)
+                elif event.event == 'error':
+                    raise ValueError(f"Run stream error: {event.data}")
+
+        raise ValueError("Run stream ended before the run finished")
+
     def get_models(self) -> dict:
         url = 'https://api.openai.com/v1/models'
         headers = {'Authorization': f'Bearer {self.yaml_data.openai_api_key}'}
@@ -61,7 +113,7 @@ class GPTFunctionCallManager(GPTBaseClass):
     handling function calls, and submitting tool outputs.
     """
 
-    def __init__(self, gpt_client, gpt_thread_manager, gpt_response_manager, gpt_assistant_manager):
+    def __init__(self, gpt_client, gpt_thread_manager, gpt_response_manager, gpt_assistant_manager, run_watcher, run_arbiter):
         super().__init__(gpt_client)
         self.logger = create_logger(
             dirname='log',
@@ -72,9 +124,10 @@ class GPTFunctionCallManager(GPTBaseClass):
         self.gpt_thread_manager = gpt_thread_manager
         self.gpt_response_manager = gpt_response_manager
         self.gpt_assistant_manager = gpt_assistant_manager
+        self.run_watcher = run_watcher
 
-        # Initialize thread-specific locks
-        self.thread_run_locks = defaultdict(asyncio.Lock)
+        # One active run per thread, shared with GPTResponseManager
+        self.run_arbiter = run_arbiter
 
     async def execute_function_call(
             self,
@@ -114,38 +167,34 @@ class GPTFunctionCallManager(GPTBaseClass):
         if not assistant_id:
             self.logger.error(f"...Assistant ID not found for '{assistant_name}'.")
 
-        async with self.thread_run_locks[thread_name]:
+        async with self.run_arbiter.run_slot(thread_name, caller=f"execute_function_call:{assistant_name}"):
             try:
                 self.logger.info(f"...Starting run for thread '{thread_name}' with assistant '{assistant_id}'")
 
-                # Check if there's an active run for this thread
-                runs = self.gpt_client.beta.threads.runs.list(thread_id=thread_id)
-                active_runs = [run for run in runs.data if run.status in ['queued', 'in_progress']]
-
-                if active_runs:
-                    active_run = active_runs[0]
-                    self.logger.warning(f"...Thread '{thread_name}' already has an active run: {active_run.id}. Waiting for it to complete.")
-                    await self._wait_for_run_completion(thread_id, active_run.id)
-
-                # Start the new run
+                # Start the new run (streamed, run ends up 'requires_action' without polling)
                 wrapped_function_schema = [function_schema]
-                run = self.gpt_client.beta.threads.runs.create(
-                    thread_id=thread_id,
-                    assistant_id=assistant_id,
-                    tools = wrapped_function_schema
-                )
+                if self.stream_runs:
+                    run_stream = await self.gpt_client.beta.threads.runs.create(
+                        thread_id=thread_id,
+                        assistant_id=assistant_id,
+                        tools = wrapped_function_schema,
+                        stream=True
+                    )
+                    run, _ = await self._consume_run_stream(run_stream)
+                else:
+                    run = await self.gpt_client.beta.threads.runs.create(
+                        thread_id=thread_id,
+                        assistant_id=assistant_id,
+                        tools = wrapped_function_schema
+                    )
 
             except Exception as e:
                 self.logger.error(f"...Error starting run for thread '{thread_name}': {e}")
 
             try:
-                # Poll the run status manually until it's complete
-                while run.status in ['queued', 'in_progress']:
-                    await asyncio.sleep(2)
-                    run = self.gpt_client.beta.threads.runs.retrieve(
-                        thread_id=thread_id,
-                        run_id=run.id
-                    )
+                # Wait for the run to finish (streamed runs are already done)
+                if run.status in ['queued', 'in_progress']:
+                    run = await self.run_watcher.wait_for_run(thread_id, run.id)
             except Exception as e:
                 self.logger.error(f"...Error polling run status for thread '{thread_name}': {e}")
 
@@ -159,8 +208,8 @@ class GPTFunctionCallManager(GPTBaseClass):
             try:
                 # Check if the run completed and then handle the response
                 if run.status == 'completed':
-                    messages = self.gpt_client.beta.threads.messages.list(thread_id=thread_id)
-                    final_response = self._extract_latest_response_from_thread_messages(messages)
+                    await self.gpt_thread_manager.sync_thread_messages(thread_id)
+                    final_response = self.gpt_thread_manager.get_latest_assistant_message(thread_id)
                     self.logger.info(f"...Status is completed. Final response: {final_response}")
                     self.logger.info(f"...Final response: {final_response}")
                     self.logger.info(f"...Output data: {run.output_data}")
@@ -183,8 +232,8 @@ class GPTFunctionCallManager(GPTBaseClass):
                         # Submit the tool outputs and wait for the run to complete
                         run = await self._submit_tool_outputs(thread_id, run.id, tool_outputs)
 
-                        messages = self.gpt_client.beta.threads.messages.list(thread_id=thread_id)
-                        final_response = self._extract_latest_response_from_thread_messages(messages)
+                        await self.gpt_thread_manager.sync_thread_messages(thread_id)
+                        final_response = self.gpt_thread_manager.get_latest_assistant_message(thread_id)
                         self.logger.info(f"...Final response (get_response is {get_response}): {final_response}")
 
                     else:
@@ -201,12 +250,8 @@ class GPTFunctionCallManager(GPTBaseClass):
     async def _wait_for_run_completion(self, thread_id, run_id):
         """Waits for a specific run to complete."""
         try:
-            while True:
-                run = self.gpt_client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run_id)
-                if run.status not in ['queued', 'in_progress']:
-                    self.logger.info(f"Run {run_id} completed with status: {run.status}")
-                    break
-                await asyncio.sleep(1)
+            run = await self.run_watcher.wait_for_run(thread_id, run_id)
+            self.logger.info(f"Run {run_id} completed with status: {run.status}")
         except Exception as e:
             self.logger.error(f"Error waiting for run {run_id} to complete: {e}")
             raise
@@ -249,10 +294,13 @@ class GPTFunctionCallManager(GPTBaseClass):
         return tool_outputs, output_data
     
     async def _cancel_run(self, thread_id, run_id):
-        """Cancels a specific run."""
+        """Cancels a specific run, and waits until it's no longer active (the run slot is released after)."""
         try:
-            self.gpt_client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run_id)
+            run = await self.gpt_client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run_id)
+            if run.status == 'cancelling':
+                run = await self.run_watcher.wait_for_run(thread_id, run_id, wait_statuses=('cancelling',))
             self.logger.info(f"Run {run_id} cancelled successfully.")
+            return run
         except Exception as e:
             self.logger.error(f"Error cancelling run {run_id}: {e}")
             raise
@@ -271,20 +319,29 @@ class GPTFunctionCallManager(GPTBaseClass):
         """
         try:
             # Submit the tool outputs
-            run = self.gpt_client.beta.threads.runs.submit_tool_outputs(
-                thread_id=thread_id,
-                run_id=run_id,
-                tool_outputs=tool_outputs
-            )
+            if self.stream_runs:
+                run_stream = await self.gpt_client.beta.threads.runs.submit_tool_outputs(
+                    thread_id=thread_id,
+                    run_id=run_id,
+                    tool_outputs=tool_outputs,
+                    stream=True
+                )
+                run, _ = await self._consume_run_stream(run_stream)
+            else:
+                run = await self.gpt_client.beta.threads.runs.submit_tool_outputs(
+                    thread_id=thread_id,
+                    run_id=run_id,
+                    tool_outputs=tool_outputs
+                )
             self.logger.info("Tool outputs submitted successfully.")
 
-            # Poll the status of the run
-            while run.status in ['queued', 'in_progress', 'requires_action']:
+            # Wait for the run to finish
+            if run.status in ['queued', 'in_progress', 'requires_action']:
                 self.logger.info(f"Run status not completed: {run.status}")
-                await asyncio.sleep(1)
-                run = self.gpt_client.beta.threads.runs.retrieve(
-                    thread_id=thread_id,
-                    run_id=run_id
+                run = await self.run_watcher.wait_for_run(
+                    thread_id,
+                    run_id,
+                    wait_statuses=('queued', 'in_progress', 'requires_action', 'cancelling')
                 )
 
             self.logger.info(f"Run completed with status: {run.status}")
@@ -294,32 +351,6 @@ class GPTFunctionCallManager(GPTBaseClass):
             self.logger.error(f"Failed to submit tool outputs: {e}")
             raise
 
-    def _extract_latest_response_from_thread_messages(self, response_thread_messages):
-        """
-        Extracts the latest response from the thread messages.
-
-        Args:
-            response_thread_messages (list): A list of messages from a thread.
-
-        Returns:
-            The latest response message from the assistant, or None if no response is found.
-        """
-        try:
-            sorted_messages = sorted(response_thread_messages.data, key=lambda msg: msg.created_at, reverse=True)
-
-            for message in sorted_messages:
-                if message.role == 'assistant':
-                    for content in message.content:
-                        if content.type == 'text':
-                            return content.text.value
-
-            self.logger.warning("No response found in thread messages.")
-            return None
-
-        except Exception as e:
-            self.logger.error(f"Error extracting response: {e}")
-            raise
-
     def _is_valid_json(self, data):
         """
         Checks if the provided data is a valid JSON string.
@@ -345,15 +376,16 @@ class GPTAssistantManager(GPTBaseClass):
 
     Args:
         yaml_data: Configuration data loaded from a YAML file.
-        gpt_client: An instance of the OpenAI client.
+        gpt_client: An instance of the AsyncOpenAI client.
 
     Attributes:
         logger (Logger): A logger for this class.
         yaml_data (dict): Configuration data extracted from yaml_data.
         gpt_client: The OpenAI client instance.
         assistants (dict): A dictionary to store assistant objects and their IDs.
+        registry (GPTRegistry): Assistants created on previous runs, reused/updated instead of re-created.
     """
-    def __init__(self, gpt_client):
+    def __init__(self, gpt_client, registry: GPTRegistry = None):
         super().__init__(gpt_client)
         self.logger = create_logger(
             dirname='log', 
@@ -362,8 +394,51 @@ class GPTAssistantManager(GPTBaseClass):
             stream_logs=True
             )
         self.assistants = {}
+        self.registry = registry
+
+    async def _upsert_assistant(self, assistant_name, instructions, tools, model):
+        """
+        Returns the assistant for assistant_name: reused from the registry if its instructions, model and
+        tools are unchanged, updated in place if they changed, and created if it's unknown or gone.
+        """
+        spec_hash = GPTRegistry.spec_hash(instructions, model, tools)
+        registry_entry = self.registry.get_assistant(assistant_name) if self.registry else None
+        if registry_entry is None and assistant_name in self.assistants:
+            # Known from this session (no registry), so it can still be updated in place
+            registry_entry = {'id': self.assistants[assistant_name]['id'], 'spec_hash': None}
+
+        assistant = None
+        if registry_entry:
+            try:
+                if registry_entry['spec_hash'] == spec_hash:
+                    assistant = await self.gpt_client.beta.assistants.retrieve(registry_entry['id'])
+                    action = 'Reused'
+                else:
+                    assistant = await self.gpt_client.beta.assistants.update(
+                        registry_entry['id'],
+                        instructions=instructions,
+                        tools=tools,
+                        model=model
+                    )
+                    action = 'Updated'
+            except openai.NotFoundError:
+                self.logger.warning(f"Registered assistant '{assistant_name}' ({registry_entry['id']}) no longer exists, creating it")
+
+        if assistant is None:
+            assistant = await self.gpt_client.beta.assistants.create(
+                name=assistant_name,
+                instructions=instructions,
+                tools=tools,
+                model=model
+            )
+            action = 'Created'
+
+        if self.registry:
+            self.registry.set_assistant(assistant_name, assistant.id, spec_hash)
+        self.logger.info(f"{action} assistant '{assistant_name}' ({assistant.id})")
+        return assistant
 
-    def _create_assistant(
+    async def _create_assistant(
             self, 
             assistant_name, 
             assistant_instructions="you're a question answering machine", 
@@ -391,65 +466,99 @@ class GPTAssistantManager(GPTBaseClass):
             replacements=replacements_dict
             )
         
-        assistant = self.gpt_client.beta.assistants.create(
-            name=assistant_name,
+        assistant = await self._upsert_assistant(
+            assistant_name=assistant_name,
             instructions=assistant_instructions,
             tools=[{"type": assistant_type}],
             model=assistant_model
         )
-        self.assistants[assistant_name] = {'object':assistant, 'id':assistant.id}
 
-        self.logger.info(f"Assistant object created successfully for '{assistant_name}' with instructions: {assistant_instructions[0:100]}...")
+        self.logger.info(f"Assistant object ready for '{assistant_name}' with instructions: {assistant_instructions[0:100]}...")
         if replacements_dict:
             self.logger.debug(f"Replacements Dict: {replacements_dict}")
         self.logger.debug(assistant)
         return assistant
 
-    def create_assistants(self, assistants_config: dict) -> dict:
-        """
-            assistants_config: A dictionary of assistant names and their prompts.
-        """
-        self.logger.info('Creating GPT Assistants')
-        self.assistants = {}
-        replacements_dict = {
-            "wordcount_short":self.yaml_data.wordcount_short,
-            "wordcount_medium":self.yaml_data.wordcount_medium,
-            "wordcount_long":self.yaml_data.wordcount_long,
+    def _get_assistant_replacements_dict(self) -> dict:
+        # Instructions persist on the assistants, so they always get the configured wordcounts,
+        # never the shortened ones swapped in while degraded mode is active
+        configured_settings = self.yaml_data.degraded_mode_saved_settings
+        return {
+            "wordcount_short":configured_settings.get('wordcount_short', self.yaml_data.wordcount_short),
+            "wordcount_medium":configured_settings.get('wordcount_medium', self.yaml_data.wordcount_medium),
+            "wordcount_long":configured_settings.get('wordcount_long', self.yaml_data.wordcount_long),
             "vibecheckee_username": 'chad',
             "vibecheck_message_wordcount": self.yaml_data.vibechecker_message_wordcount,
             "bot_archetype": self.yaml_data.gpt_bot_archetype_prompt
         }
 
+    async def _create_or_update_assistants(self, assistants_config: dict) -> dict:
+        """
+        Creates/updates the given assistants concurrently, then swaps them into self.assistants in a single
+        assignment, so lookups from in-flight tasks never see a partially rebuilt dictionary.
+        """
+        replacements_dict = self._get_assistant_replacements_dict()
+
         # Get suffix one from assistants_config
         gpt_assistants_suffix = self.yaml_data.gpt_assistants_suffix
 
-        for assistant_name, prompt in assistants_config.items():
-            final_prompt = prompt + gpt_assistants_suffix
+        assistant_names = list(assistants_config.keys())
+        assistants = await asyncio.gather(*(
             self._create_assistant(
                 assistant_name=assistant_name,
-                assistant_instructions=final_prompt,
+                assistant_instructions=assistants_config[assistant_name] + gpt_assistants_suffix,
                 replacements_dict=replacements_dict,
                 assistant_type='code_interpreter',
                 assistant_model=self.yaml_data.gpt_model
-            )        
+            )
+            for assistant_name in assistant_names
+        ))
+        if self.registry:
+            self.registry.save()
+
+        self.assistants = {
+            **self.assistants,
+            **{assistant_name: {'object': assistant, 'id': assistant.id} for assistant_name, assistant in zip(assistant_names, assistants)}
+        }
         return self.assistants
 
-    def _create_assistant_with_function(self, assistant_name, instructions, function_schema):
+    async def create_assistants(self, assistants_config: dict) -> dict:
+        """
+            assistants_config: A dictionary of assistant names and their prompts.
+        """
+        self.logger.info('Creating GPT Assistants')
+        return await self._create_or_update_assistants(assistants_config)
+
+    async def update_assistants_with_placeholder(self, assistants_config: dict, placeholder: str = 'bot_archetype') -> dict:
+        """
+        Updates, in place and concurrently, only the assistants whose instructions use {placeholder}
+        (e.g. after !update_arch changes gpt_bot_archetype_prompt). Assistant IDs stay the same, so
+        runs already in progress aren't affected.
+        """
+        placeholder_token = '{' + placeholder + '}'
+        gpt_assistants_suffix = self.yaml_data.gpt_assistants_suffix
+        dependent_assistants_config = {
+            assistant_name: prompt for assistant_name, prompt in assistants_config.items()
+            if placeholder_token in prompt + gpt_assistants_suffix
+        }
+        self.logger.info(f"Updating {len(dependent_assistants_config)} of {len(assistants_config)} GPT Assistants that use '{placeholder_token}': {list(dependent_assistants_config.keys())}")
+        return await self._create_or_update_assistants(dependent_assistants_config)
+
+    async def _create_assistant_with_function(self, assistant_name, instructions, function_schema):
         """
         Creates an assistant with the get_bot_response function schema.
         """
         tool = [function_schema]
-        assistant = self.gpt_client.beta.assistants.create(
-            name=assistant_name,
+        assistant = await self._upsert_assistant(
+            assistant_name=assistant_name,
             instructions=instructions,
             tools=tool,
             model=self.yaml_data.gpt_model
         )
+        self.assistants = {**self.assistants, assistant_name: {'object': assistant, 'id': assistant.id}}
+        self.logger.info(f"Assistant '{assistant_name}' ready with ID: {assistant.id}")
 
-        self.assistants[assistant_name] = {'object': assistant, 'id': assistant.id}
-        self.logger.info(f"Assistant '{assistant_name}' created with ID: {assistant.id}")
-
-    def create_assistants_with_functions(self, assistants_with_functions: list):
+    async def create_assistants_with_functions(self, assistants_with_functions: list):
         """
         Creates multiple assistants with their respective function schemas.
 
@@ -461,7 +570,7 @@ class GPTAssistantManager(GPTBaseClass):
         """
         self.logger.info('Creating GPT Assistants with functions')
 
-        for assistant_details in assistants_with_functions:
+        async def create_assistant_with_function(assistant_details):
             name = assistant_details["name"]
             instructions = assistant_details["instructions"]
             json_schema = assistant_details["json_schema"]
@@ -471,7 +580,7 @@ class GPTAssistantManager(GPTBaseClass):
             self.logger.debug(f'JSON Schema: {json_schema}')
 
             try:
-                self._create_assistant_with_function(
+                await self._create_assistant_with_function(
                     assistant_name=name,
                     instructions=instructions,
                     function_schema=json_schema
@@ -480,11 +589,15 @@ class GPTAssistantManager(GPTBaseClass):
             except Exception as e:
                 self.logger.error(f"Error creating assistant '{name}': {e}")
 
+        await asyncio.gather(*(create_assistant_with_function(assistant_details) for assistant_details in assistants_with_functions))
+        if self.registry:
+            self.registry.save()
+
         self.logger.info(f"Current assistants: {list(self.assistants.keys())}")
         return self.assistants
 
 class GPTThreadManager(GPTBaseClass):
-    def __init__(self, gpt_client):
+    def __init__(self, gpt_client, registry: GPTRegistry = None, reuse_threads=False, thread_mirror_max_messages=100, thread_mirror_page_size=20):
         super().__init__(gpt_client=gpt_client)
         self.logger = create_logger(
             dirname='log', 
@@ -496,7 +609,20 @@ class GPTThreadManager(GPTBaseClass):
         # Initialize the 'threads' dictionary to store thread objects and their IDs
         self.threads: Dict[str, dict] = {}
 
-    def _create_thread(self, thread_name: str):
+        # Threads from previous runs are either picked up again (reuse_threads) or deleted
+        self.registry = registry
+        self.reuse_threads = reuse_threads
+
+        # Local mirror of each thread's messages (thread_id -> oldest..newest), so only
+        # messages newer than the cursor (the newest mirrored message id) are fetched
+        self.thread_mirror_max_messages = thread_mirror_max_messages
+        self.thread_mirror_page_size = thread_mirror_page_size
+        self.thread_messages: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.thread_mirror_max_messages))
+        self.thread_message_cursors: Dict[str, str] = {}
+        self.latest_assistant_messages: Dict[str, str] = {}
+        self.thread_mirror_locks = defaultdict(asyncio.Lock)
+
+    async def _create_thread(self, thread_name: str):
         """
         Creates a new thread with the given name.
 
@@ -507,38 +633,165 @@ class GPTThreadManager(GPTBaseClass):
             The created thread object.
         """
         # Store the thread object and its ID in the 'threads' dictionary using 'thread_name' as the key
-        thread = self.gpt_client.beta.threads.create()
+        thread = await self.gpt_client.beta.threads.create()
         self.threads[thread_name] = {'id': thread.id}
+        if self.registry:
+            self.registry.set_thread(thread_name, thread.id)
 
         self.logger.info(f"Created thread '{thread_name}' with ID: {thread.id}")
 
-    def create_threads(self, thread_names):
+    def replace_thread(self, thread_name: str, thread_id: str):
+        """Points thread_name at another (already created) thread, e.g. after a context rotation."""
+        self.threads[thread_name] = {'id': thread_id}
+        if self.registry:
+            self.registry.set_thread(thread_name, thread_id)
+            self.registry.save()
+
+    async def _reuse_thread(self, thread_name: str, thread_id: str):
+        try:
+            await self.gpt_client.beta.threads.retrieve(thread_id)
+            self.threads[thread_name] = {'id': thread_id}
+            self.logger.info(f"Reused thread '{thread_name}' with ID: {thread_id}")
+        except openai.NotFoundError:
+            self.logger.warning(f"Registered thread '{thread_name}' ({thread_id}) no longer exists, creating it")
+
+    async def _delete_thread(self, thread_name: str, thread_id: str):
+        try:
+            await self.gpt_client.beta.threads.delete(thread_id)
+            self.logger.info(f"Deleted previous thread '{thread_name}' ({thread_id})")
+        except Exception as e:
+            self.logger.warning(f"Could not delete previous thread '{thread_name}' ({thread_id}): {e}")
+
+    async def create_threads(self, thread_names):
         self.logger.info('Creating GPT Threads')
         for thread_name in thread_names:
-
-            #NOTE: Part of 'reusing threads' logic
-            #If thread does not exist, create it
-            if thread_name not in self.threads:
-                self._create_thread(thread_name)
-            else:
+            if thread_name in self.threads:
                 self.logger.warning(f"Thread '{thread_name}' already exists")
 
+        #NOTE: Part of 'reusing threads' logic
+        if self.registry:
+            previous_threads = {
+                thread_name: registry_entry['id'] for thread_name, registry_entry in self.registry.threads.items()
+                if thread_name not in self.threads
+                }
+            if self.reuse_threads:
+                await asyncio.gather(*(
+                    self._reuse_thread(thread_name, thread_id) for thread_name, thread_id in previous_threads.items()
+                    if thread_name in thread_names
+                ))
+            # Previous threads that aren't reused would otherwise be left orphaned on the account
+            await asyncio.gather(*(
+                self._delete_thread(thread_name, thread_id) for thread_name, thread_id in previous_threads.items()
+                if thread_name not in self.threads
+            ))
+            for thread_name in previous_threads:
+                if thread_name not in self.threads:
+                    self.registry.threads.pop(thread_name, None)
+
+        #If thread does not exist, create it
+        await asyncio.gather(*(
+            self._create_thread(thread_name) for thread_name in thread_names if thread_name not in self.threads
+        ))
+        if self.registry:
+            self.registry.save()
+
         self.logger.info(f"...threads created: {self.threads}")        
         return self.threads
 
+    @staticmethod
+    def _message_text(message) -> str:
+        return ''.join(content.text.value for content in message.content if content.type == 'text')
+
+    async def sync_thread_messages(self, thread_id: str) -> list:
+        """
+        Fetches the messages added to a thread since the last sync (newest first, stopping at the cursor)
+        and appends them to the local mirror.
+
+        Returns:
+            list: The new messages (as dicts with id, role, content and created_at), oldest first.
+        """
+        async with self.thread_mirror_locks[thread_id]:
+            cursor = self.thread_message_cursors.get(thread_id)
+            new_messages = []
+            after = None
+            while True:
+                page_params = {'after': after} if after else {}
+                page = await self.gpt_client.beta.threads.messages.list(
+                    thread_id=thread_id,
+                    order='desc',
+                    limit=self.thread_mirror_page_size,
+                    **page_params
+                    )
+
+                reached_cursor = False
+                for message in page.data:
+                    if message.id == cursor:
+                        reached_cursor = True
+                        break
+                    new_messages.append(message)
+
+                # On the first sync only the newest page is mirrored, there's no need for the whole history
+                if reached_cursor or cursor is None or not page.has_more or not page.data \
+                        or len(new_messages) >= self.thread_mirror_max_messages:
+                    break
+                after = page.data[-1].id
+
+            new_messages.reverse()
+            mirrored_messages = []
+            for message in new_messages:
+                mirrored_message = {
+                    'id': message.id,
+                    'role': message.role,
+                    'content': self._message_text(message),
+                    'created_at': message.created_at
+                    }
+                self.thread_messages[thread_id].append(mirrored_message)
+                mirrored_messages.append(mirrored_message)
+                if message.role == 'assistant':
+                    self.latest_assistant_messages[thread_id] = mirrored_message['content']
+
+            if new_messages:
+                self.thread_message_cursors[thread_id] = new_messages[-1].id
+            self.logger.debug(f"Synced {len(mirrored_messages)} new messages for thread {thread_id}")
+            return mirrored_messages
+
+    def get_latest_assistant_message(self, thread_id: str) -> str:
+        """Returns the newest assistant message in the local mirror of a thread (call sync_thread_messages first)."""
+        return self.latest_assistant_messages.get(thread_id)
+
+    async def get_thread_messages(self, thread_name: str, limit: int = None) -> list:
+        """
+        Returns the newest messages of a thread (oldest first) from the local mirror, syncing it first.
+        """
+        thread_id = self.threads[thread_name]['id']
+        await self.sync_thread_messages(thread_id)
+        messages = list(self.thread_messages[thread_id])
+        return messages[-limit:] if limit else messages
+
 class GPTResponseManager(GPTBaseClass):
     """
     Initializes the GPT Assistant Response Manager.
 
     Args:
-        gpt_client: An instance of the OpenAI client.
+        gpt_client: An instance of the AsyncOpenAI client.
 
     Attributes:
         logger (Logger): A logger for this class.
         gpt_client: The OpenAI client instance.
         yaml_data: Configuration data loaded from a YAML file.
     """
-    def __init__(self, gpt_client, gpt_thread_manager, gpt_assistant_manager, max_waittime_for_gpt_response=120):
+    def __init__(
+            self,
+            gpt_client,
+            gpt_thread_manager,
+            gpt_assistant_manager,
+            run_watcher,
+            run_arbiter,
+            max_waittime_for_gpt_response=120,
+            response_max_completion_tokens=None,
+            context_manager=None,
+            backend_router=None
+            ):
         super().__init__(gpt_client=gpt_client)
         self.logger = create_logger(
             dirname='log', 
@@ -548,29 +801,247 @@ class GPTResponseManager(GPTBaseClass):
             )
         self.gpt_thread_manager = gpt_thread_manager
         self.gpt_assistant_manager = gpt_assistant_manager
+        self.run_watcher = run_watcher
         self.max_waittime_for_gpt_response = max_waittime_for_gpt_response
 
-    async def _get_response(self, thread_id, run_id, polling_seconds=3):
+        # One active run per thread, shared with GPTFunctionCallManager
+        self.run_arbiter = run_arbiter
+
+        # Caps the reply length on the run itself (None: no cap)
+        self.response_max_completion_tokens = response_max_completion_tokens
+
+        # Keeps thread context under a token budget (None: threads grow for the whole session)
+        self.context_manager = context_manager
+
+        # Hedges slow runs with a chat completion on a secondary backend (None: the run is always waited on)
+        self.backend_router = backend_router
+
+        # The run currently in progress on each thread (thread_id -> run_id)
+        self.active_runs = {}
+
+    async def _cancel_run(self, thread_id, run_id):
+        """
+        Cancels a run on the OpenAI side so an abandoned response stops generating (and costing tokens),
+        and waits until it's no longer active, so the thread accepts messages and runs again.
+        """
+        try:
+            run = await self.gpt_client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run_id)
+            if run.status == 'cancelling':
+                await self.run_watcher.wait_for_run(thread_id, run_id, wait_statuses=('cancelling',))
+            self.logger.info(f"...Cancelled run {run_id} on thread {thread_id}")
+        except Exception as e:
+            # The run may have finished in the meantime
+            self.logger.warning(f"...Could not cancel run {run_id} on thread {thread_id}: {e}")
+
+    async def cancel_active_run(self, thread_name: str):
+        """
+        Cancels the run in progress on a thread, if any.
+        """
+        thread_id = self.gpt_thread_manager.threads[thread_name]['id']
+        run_id = self.active_runs.pop(thread_id, None)
+        if run_id is not None:
+            await self._cancel_run(thread_id, run_id)
+
+    async def _get_response(self, thread_id, run_id):
         """
-        Asynchronously retrieves the response for a given thread and run ID.
+        Asynchronously waits (through the shared run watcher) for the run to complete and returns it.
+        """
+        try:
+            response = await self.run_watcher.wait_for_run(thread_id, run_id)
+        except TimeoutError:
+            raise ValueError(f"Response not completed after {self.max_waittime_for_gpt_response} seconds")
+
+        self._check_run_status(response)
+        self.logger.debug("This is the completed 'response' object:")
+        self.logger.debug(response)
+        return response
+
+    def _check_run_status(self, run):
         """
-        counter = 1
-        while counter < self.max_waittime_for_gpt_response:
-            response = self.gpt_client.beta.threads.runs.retrieve(
+        Raises unless the run completed, or stopped at max_completion_tokens (its partial reply is
+        still usable, execute_thread trims it to a sentence boundary).
+        """
+        if run.status == 'completed':
+            return
+        if run.status == 'incomplete' and run.incomplete_details and run.incomplete_details.reason == 'max_completion_tokens':
+            self.logger.warning(f"...Run {run.id} stopped at max_completion_tokens ({self.response_max_completion_tokens}), using the partial reply")
+            return
+        raise ValueError(f"Run {run.id} ended with status '{run.status}': {run.last_error}")
+
+    def _get_run_length_params(self) -> dict:
+        """Length controls added to every response run: a token cap and a hint with the character limit."""
+        run_length_params = {
+            'additional_instructions': f"Keep your reply under {self.yaml_data.assistant_response_max_length} characters."
+        }
+        if self.response_max_completion_tokens:
+            run_length_params['max_completion_tokens'] = self.response_max_completion_tokens
+        return run_length_params
+
+    def _populate_thread_instructions(self, thread_instructions: str, replacements_dict: dict) -> str:
+        try:
+            final_thread_instructions = utils.populate_placeholders(
+                logger=self.logger,
+                prompt_template=thread_instructions,
+                replacements=replacements_dict
+                )
+            self.logger.debug(f"This is the final thread_instructions: {final_thread_instructions}")
+            return final_thread_instructions
+        except Exception as e:
+            self.logger.error(f"Error replacing prompt text with replacements_dict")
+            self.logger.error(e)
+            raise ValueError(f"Error replacing prompt text with replacements_dict")
+
+    async def _stream_assistant_response(
+            self,
+            thread_id: str,
+            assistant_id: str,
+            final_thread_instructions: str,
+            on_delta: Callable = None
+            ) -> str:
+        """
+        Runs the assistant on a thread as a streamed run and returns its reply as soon as the run completes.
+
+        Returns:
+            str: The assistant's reply, or None if the stream could not be started (the caller falls back to polling).
+        """
+        try:
+            run_stream = await self.gpt_client.beta.threads.runs.create(
                 thread_id=thread_id,
-                run_id=run_id
+                assistant_id=assistant_id,
+                instructions=final_thread_instructions,
+                stream=True,
+                **self._get_run_length_params()
             )
-            if response.status == 'completed':
-                self.logger.debug("This is the completed 'response' object:")
-                self.logger.debug(response)
-                return response
-            else:
-                elapsed_time = counter * polling_seconds
-                self.logger.info(f"The 'response' object is not completed yet. Polling time: {elapsed_time} seconds...")
-                counter += 1
-            await asyncio.sleep(polling_seconds)
+        except Exception as e:
+            self.logger.warning(f"...Could not start a streamed run, falling back to polling: {e}")
+            return None
+
+        run_ids = []
+        def on_run_created(run):
+            run_ids.append(run.id)
+            self.active_runs[thread_id] = run.id
+
+        try:
+            run, extracted_message = await asyncio.wait_for(
+                self._consume_run_stream(run_stream, on_delta=on_delta, on_run_created=on_run_created),
+                timeout=self.max_waittime_for_gpt_response
+                )
+        except asyncio.CancelledError:
+            # The task waiting on this run was cancelled (e.g. !stopstory), so stop the run too
+            if run_ids:
+                await self._cancel_run(thread_id, run_ids[0])
+            raise
+        except asyncio.TimeoutError:
+            if run_ids:
+                await self._cancel_run(thread_id, run_ids[0])
+            raise ValueError(f"Response not completed after {self.max_waittime_for_gpt_response} seconds")
+        finally:
+            self.active_runs.pop(thread_id, None)
+
+        self._check_run_status(run)
+        self.logger.debug(f"Streamed run {run.id} completed")
+        return extracted_message
+
+    async def _run_and_get_assistant_response(
+            self,
+            thread_id: str,
+            assistant_id: str,
+            thread_instructions: str,
+            replacements_dict: dict = None,
+            on_delta: Callable = None
+            ) -> str:
+        """
+        Runs the assistant on a thread and returns its reply. Uses a streamed run when enabled,
+        and polling when it isn't or a stream can't be started.
+        """
+        if self.stream_runs:
+            final_thread_instructions = self._populate_thread_instructions(thread_instructions, replacements_dict)
+            extracted_message = await self._stream_assistant_response(
+                thread_id=thread_id,
+                assistant_id=assistant_id,
+                final_thread_instructions=final_thread_instructions,
+                on_delta=on_delta
+                )
+            if extracted_message is not None:
+                return extracted_message
+
+        response_thread_messages = await self._run_and_get_assistant_response_thread_messages(
+            thread_id=thread_id,
+            assistant_id=assistant_id,
+            thread_instructions=thread_instructions,
+            replacements_dict=replacements_dict
+            )
+        if not any(message['role'] == 'assistant' for message in response_thread_messages):
+            raise ValueError("...No response found in thread messages")
+        extracted_message = self._extract_latest_response_from_thread_messages(thread_id)
+        if on_delta and extracted_message:
+            await on_delta(extracted_message)
+        return extracted_message
+
+    async def _build_hedge_messages(self, assistant_name: str, thread_id: str, final_thread_instructions: str) -> tuple:
+        """
+        Returns the assistant's model and the chat messages for a hedged request: the assistant's
+        instructions, the thread's latest messages and the run's instructions.
+        """
+        assistant = self.gpt_assistant_manager.assistants[assistant_name]['object']
+        page = await self.gpt_client.beta.threads.messages.list(
+            thread_id=thread_id,
+            order='desc',
+            limit=self.backend_router.context_message_limit
+            )
+        messages = [{'role': 'system', 'content': assistant.instructions}]
+        messages.extend(
+            {'role': message.role, 'content': self.gpt_thread_manager._message_text(message)}
+            for message in reversed(page.data)
+            # Skips the reply the primary run is still writing
+            if message.status not in ('in_progress', 'incomplete')
+        )
+        messages.append({'role': 'system', 'content': f"{final_thread_instructions}\n{self._get_run_length_params()['additional_instructions']}"})
+        return assistant.model, messages
 
-        raise ValueError(f"Response not completed after {counter * polling_seconds} seconds")
+    async def _run_and_get_hedged_assistant_response(
+            self,
+            assistant_name: str,
+            thread_id: str,
+            assistant_id: str,
+            thread_instructions: str,
+            replacements_dict: dict = None,
+            on_delta: Callable = None
+            ) -> str:
+        """
+        Runs the assistant on a thread through the backend router, which hedges the run with a chat
+        completion on a secondary backend if it's slow. A secondary's reply is written to the thread,
+        after the run has been cancelled, so the thread reads the same whichever backend answered.
+        """
+        primary_first_output = asyncio.Event()
+        async def on_primary_delta(text):
+            primary_first_output.set()
+            if on_delta:
+                await on_delta(text)
+
+        final_thread_instructions = self._populate_thread_instructions(thread_instructions, replacements_dict)
+        extracted_message, backend_name = await self.backend_router.execute_hedged(
+            self._run_and_get_assistant_response(
+                thread_id=thread_id,
+                assistant_id=assistant_id,
+                thread_instructions=thread_instructions,
+                replacements_dict=replacements_dict,
+                on_delta=on_primary_delta
+                ),
+            primary_first_output,
+            lambda: self._build_hedge_messages(assistant_name, thread_id, final_thread_instructions),
+            label=assistant_name
+            )
+        if backend_name == 'primary':
+            return extracted_message
+
+        try:
+            await self.gpt_client.beta.threads.messages.create(thread_id=thread_id, role='assistant', content=extracted_message)
+        except Exception as e:
+            self.logger.warning(f"...Could not add the reply from '{backend_name}' to thread {thread_id}: {e}")
+        if on_delta:
+            await on_delta(extracted_message)
+        return extracted_message
 
     async def _run_and_get_assistant_response_thread_messages(
             self, 
@@ -588,25 +1059,16 @@ class GPTResponseManager(GPTBaseClass):
             thread_instructions (str): Instructions for the assistant. Defaults to a generic instruction.
 
         Returns:
-            A list of response thread messages.
+            The messages added to the thread since the last sync (the run's reply is the newest).
         """
-        try:
-            final_thread_instructions = utils.populate_placeholders(
-                logger=self.logger,
-                prompt_template=thread_instructions,
-                replacements=replacements_dict
-                )
-            self.logger.debug(f"This is the final thread_instructions: {final_thread_instructions}")
-        except Exception as e:
-            self.logger.error(f"Error replacing prompt text with replacements_dict")
-            self.logger.error(e)
-            raise ValueError(f"Error replacing prompt text with replacements_dict")   
+        final_thread_instructions = self._populate_thread_instructions(thread_instructions, replacements_dict)
         
         try:
-            run = self.gpt_client.beta.threads.runs.create(
+            run = await self.gpt_client.beta.threads.runs.create(
                 thread_id=thread_id,
                 assistant_id=assistant_id,
-                instructions=final_thread_instructions
+                instructions=final_thread_instructions,
+                **self._get_run_length_params()
             )
             self.logger.debug("This is the 'run' object:")
             self.logger.debug(run)
@@ -615,50 +1077,45 @@ class GPTResponseManager(GPTBaseClass):
             self.logger.error(e)
             raise ValueError(f"Error running assistant on thread")
         
-        await self._get_response(thread_id, run.id)
-        response_thread_messages = self.gpt_client.beta.threads.messages.list(thread_id=thread_id)
+        self.active_runs[thread_id] = run.id
+        try:
+            await self._get_response(thread_id, run.id)
+        except asyncio.CancelledError:
+            # The task waiting on this run was cancelled (e.g. !stopstory), so stop the run too
+            await self._cancel_run(thread_id, run.id)
+            raise
+        finally:
+            self.active_runs.pop(thread_id, None)
+        response_thread_messages = await self.gpt_thread_manager.sync_thread_messages(thread_id)
 
         self.logger.debug("This is the 'messages' object response_thread_messages:")
         self.logger.debug(response_thread_messages)
         return response_thread_messages
     
-    def _extract_latest_response_from_thread_messages(self, response_thread_messages):
+    def _extract_latest_response_from_thread_messages(self, thread_id):
         """
-        Extracts the latest response from the thread messages.
+        Returns the latest assistant response on a thread from the thread manager's local mirror.
 
         Args:
-            response_thread_messages (list): A list of messages from a thread.
+            thread_id (str): The thread ID (synced by _run_and_get_assistant_response_thread_messages).
 
         Returns:
-            The latest response message from the assistant, or None if no response is found.
+            The latest response message from the assistant.
         """
-        try:
-            sorted_response_thread_messages = sorted(response_thread_messages.data, key=lambda msg: msg.created_at, reverse=True)
-            self.logger.debug("...This is the sorted_response_thread_messages:")
-            self.logger.debug(sorted_response_thread_messages)
+        extracted_message = self.gpt_thread_manager.get_latest_assistant_message(thread_id)
+        if extracted_message is None:
+            self.logger.error("...No response found in thread messages")
+            raise ValueError("...No response found in thread messages")
+        self.logger.info(f"Scheduler-4: This is the gpt response from the 'assistant': {extracted_message}")
+        return extracted_message
 
-            for message in sorted_response_thread_messages:
-                self.logger.debug(f"...This is the message.role: {message.role}")
-                if message.role == 'assistant':
-                    for content in message.content:
-                        if content.type == 'text':
-                            self.logger.info(f"Scheduler-4: This is the gpt response from the '{message.role}': {content.text.value}")
-                            return content.text.value
-                else:
-                    self.logger.error("...No response found in thread messages")
-                    raise ValueError("...No response found in thread messages")    
-            return None
-        except Exception as e:
-            self.logger.error(f"...Error extracting latest response from thread messages")
-            self.logger.error(e)
-            raise ValueError(f"...Error extracting latest response from thread messages")
-        
     async def execute_thread(
         self, 
         assistant_name: str, 
         thread_name: str, 
         thread_instructions: str, 
-        replacements_dict=None
+        replacements_dict=None,
+        on_delta: Callable = None
         ) -> str:
         """
         Executes the workflow to get the GPT assistant's response to a thread.
@@ -667,56 +1124,78 @@ class GPTResponseManager(GPTBaseClass):
             assistant_id (str): The ID of the assistant.
             thread_id (str): The ID of the thread.
             thread_instructions (str): Instructions for the assistant.
+            on_delta (Callable, optional): Awaited with each chunk of the reply as it streams in.
 
         Returns:
             The final response message from the assistant.
         """
-        assistant_id = self.gpt_assistant_manager.assistants[assistant_name]['id']
-        thread_id = self.gpt_thread_manager.threads[thread_name]['id']
-        self.logger.info(f"Scheduler-3: Executing Assistant/Thread: '{assistant_name}' ({assistant_id}, Thread id: {thread_id}")
-        self.logger.info(f"...Thread_instructions: {thread_instructions[0:50]}...")
+        # The slot covers the context rotation, the run and the shorten re-run
+        async with self.run_arbiter.run_slot(thread_name, caller=f"execute_thread:{assistant_name}"):
+            if self.context_manager:
+                await self.context_manager.rotate_if_over_budget(thread_name)
 
-        try:
-            response_thread_messages = await self._run_and_get_assistant_response_thread_messages(
-                assistant_id=assistant_id,
-                thread_id=thread_id,
-                thread_instructions=thread_instructions,
-                replacements_dict=replacements_dict
-            )        
-            extracted_message = self._extract_latest_response_from_thread_messages(response_thread_messages)
-            self.logger.debug(f"...Extracted message and length: ({len(extracted_message)}) Message: {extracted_message}")
-        except Exception as e:
-            self.logger.error(f"...Error running assistant on thread: {e}")
-            raise ValueError(f"...Error running assistant on thread: {e}")
-        
-        #Check length of output
-        if len(extracted_message) > self.yaml_data.assistant_response_max_length:
-            self.logger.warning(f"...Message exceeded character length ({self.yaml_data.assistant_response_max_length}), processing the gpt thread again")
-            self.logger.debug(f"...This is the shorten_response_length_prompt: {self.yaml_data.shorten_response_length_prompt}")
-            
-            # Add {message_to_shorten} to replacements_dict
-            replacements_dict['message_to_shorten'] = extracted_message
-            replacements_dict['original_thread_instructions'] = thread_instructions
+            assistant_id = self.gpt_assistant_manager.assistants[assistant_name]['id']
+            thread_id = self.gpt_thread_manager.threads[thread_name]['id']
+            self.logger.info(f"Scheduler-3: Executing Assistant/Thread: '{assistant_name}' ({assistant_id}, Thread id: {thread_id}")
+            self.logger.info(f"...Thread_instructions: {thread_instructions[0:50]}...")
 
             try:
-                response_thread_messages = await self._run_and_get_assistant_response_thread_messages(
-                    assistant_id=assistant_id,
-                    thread_id=thread_id,
-                    thread_instructions=self.yaml_data.shorten_response_length_prompt,
-                    replacements_dict=replacements_dict
-                )
+                if self.backend_router:
+                    extracted_message = await self._run_and_get_hedged_assistant_response(
+                        assistant_name=assistant_name,
+                        thread_id=thread_id,
+                        assistant_id=assistant_id,
+                        thread_instructions=thread_instructions,
+                        replacements_dict=replacements_dict,
+                        on_delta=on_delta
+                    )
+                else:
+                    extracted_message = await self._run_and_get_assistant_response(
+                        assistant_id=assistant_id,
+                        thread_id=thread_id,
+                        thread_instructions=thread_instructions,
+                        replacements_dict=replacements_dict,
+                        on_delta=on_delta
+                    )
+                self.logger.debug(f"...Extracted message and length: ({len(extracted_message)}) Message: {extracted_message}")
             except Exception as e:
-                self.logger.error(f"...Error running assistant on thread")
-                self.logger.error(e)
-                raise ValueError(f"...Error running assistant on thread")
-                        
-            # Extract the latest response from the messages
-            extracted_message = self._extract_latest_response_from_thread_messages(response_thread_messages)
-
-        self.logger.debug("...This is the response_thread_messages object:")
-        self.logger.debug(response_thread_messages)
-        self.logger.info(f"...This is the final response from execute_thread(): '{extracted_message}'")
-        return extracted_message
+                self.logger.error(f"...Error running assistant on thread: {e}")
+                raise ValueError(f"...Error running assistant on thread: {e}")
+        
+            #Check length of output, trim it locally to whole sentences if possible
+            if len(extracted_message) > self.yaml_data.assistant_response_max_length:
+                compressed_message = GPTResponseCleaner.compress_to_max_length(
+                    extracted_message,
+                    max_length=self.yaml_data.assistant_response_max_length
+                    )
+                if compressed_message is not None:
+                    self.logger.info(f"...Message exceeded character length ({self.yaml_data.assistant_response_max_length}), trimmed locally from {len(extracted_message)} to {len(compressed_message)} characters")
+                    extracted_message = compressed_message
+
+            if len(extracted_message) > self.yaml_data.assistant_response_max_length:
+                self.logger.warning(f"...Message exceeded character length ({self.yaml_data.assistant_response_max_length}) and couldn't be trimmed locally, processing the gpt thread again")
+                self.logger.debug(f"...This is the shorten_response_length_prompt: {self.yaml_data.shorten_response_length_prompt}")
+            
+                # Add {message_to_shorten} to replacements_dict
+                replacements_dict['message_to_shorten'] = extracted_message
+                replacements_dict['original_thread_instructions'] = thread_instructions
+
+                try:
+                    extracted_message = await self._run_and_get_assistant_response(
+                        assistant_id=assistant_id,
+                        thread_id=thread_id,
+                        thread_instructions=self.yaml_data.shorten_response_length_prompt,
+                        replacements_dict=replacements_dict
+                    )
+                except Exception as e:
+                    self.logger.error(f"...Error running assistant on thread")
+                    self.logger.error(e)
+                    raise ValueError(f"...Error running assistant on thread")
+
+            if self.context_manager:
+                self.context_manager.record_message(thread_name, 'assistant', extracted_message)
+            self.logger.info(f"...This is the final response from execute_thread(): '{extracted_message}'")
+            return extracted_message
 
     async def add_message_to_thread(
             self, 
@@ -726,7 +1205,7 @@ class GPTResponseManager(GPTBaseClass):
             ) -> object:
         """
         Asynchronously adds a message to a specified thread identified by its name, using the OpenAI GPT Assistants API.
-        Retries the operation up to 3 times in case of failures, with a 1-second wait between retries.
+        Failed requests are retried by the GPTCallGovernor transport.
 
         Args:
             message_content (str): The textual content of the message to be added to the thread.
@@ -748,25 +1227,153 @@ class GPTResponseManager(GPTBaseClass):
             raise ValueError(f"Invalid role: {role}. Role must be 'user' or 'assistant'.")
 
         if thread_name in self.gpt_thread_manager.threads:
-            thread_id = self.gpt_thread_manager.threads[thread_name]['id']
-
-            async for attempt in AsyncRetrying(stop=stop_after_attempt(3), wait=wait_fixed(1), reraise=True):
-                with attempt:
-                    message_object = self.gpt_client.beta.threads.messages.create(
-                        thread_id=thread_id, 
-                        role=role, 
-                        content=message_content
-                    )
-                    self.logger.info(f"... added message to thread ({thread_name}/{thread_id}): Message content {message_content[0:50]}...")
-                    return message_object
+            # Messages can't be added while a run is active on the thread
+            async with self.run_arbiter.run_slot(thread_name, caller='add_message_to_thread'):
+                # Read inside the slot, the thread may have been rotated while waiting
+                thread_id = self.gpt_thread_manager.threads[thread_name]['id']
+                message_object = await self.gpt_client.beta.threads.messages.create(
+                    thread_id=thread_id, 
+                    role=role, 
+                    content=message_content
+                )
+                self.logger.info(f"... added message to thread ({thread_name}/{thread_id}): Message content {message_content[0:50]}...")
+                if self.context_manager:
+                    self.context_manager.record_message(thread_name, role, message_content)
+                return message_object
         else:
             self.logger.warning(f"Thread '{thread_name}' not found.")
             return None
 
+class GPTFastPathManager(GPTBaseClass):
+    """
+    Stateless alternative to GPTResponseManager for one-shot features (random facts, factchecks,
+    new user shoutouts, the conversation director).
+
+    Instead of writing to an Assistants thread, creating a run and waiting on it, it sends a single
+    chat completions request: the assistant's instructions as the system prompt, the latest chat
+    messages from MessageHandler.all_msg_history_gptdict as context, then the task's instructions.
+    """
+    def __init__(
+            self,
+            gpt_client,
+            gpt_assistant_manager,
+            fast_path_assistants: list = None,
+            context_message_limit=20,
+            response_max_completion_tokens=None
+            ):
+        super().__init__(gpt_client=gpt_client)
+        self.logger = create_logger(
+            dirname='log',
+            debug_level=gpt_fast_path_mgr_debug_level,
+            logger_name='GPTFastPathManager',
+            stream_logs=True
+            )
+        self.gpt_assistant_manager = gpt_assistant_manager
+        self.fast_path_assistants = set(fast_path_assistants or [])
+        self.context_message_limit = context_message_limit
+        self.response_max_completion_tokens = response_max_completion_tokens
+
+    def is_enabled_for(self, assistant_name: str) -> bool:
+        return assistant_name in self.fast_path_assistants
+
+    def _build_messages(self, assistant_name: str, instructions: str, context_messages: list) -> tuple:
+        """Returns the assistant's model and the chat messages for a fast path request."""
+        assistant = self.gpt_assistant_manager.assistants[assistant_name]['object']
+        messages = [{'role': 'system', 'content': assistant.instructions}]
+        if context_messages and self.context_message_limit:
+            messages.extend(
+                {'role': message['role'], 'content': message['content']}
+                for message in context_messages[-self.context_message_limit:]
+            )
+        messages.append({'role': 'system', 'content': instructions})
+        return assistant.model, messages
+
+    async def execute_fast_path(
+            self,
+            assistant_name: str,
+            thread_instructions: str,
+            replacements_dict: dict = None,
+            context_messages: list = None
+            ) -> str:
+        """
+        Gets the assistant's reply to thread_instructions with one chat completions call.
+
+        Args:
+            assistant_name (str): The assistant whose instructions and model are used.
+            thread_instructions (str): The task's prompt template.
+            replacements_dict (dict): Placeholder values for thread_instructions.
+            context_messages (list): Recent chat messages ({'role', 'content'} dicts), the newest last.
+
+        Returns:
+            str: The reply, trimmed to assistant_response_max_length where possible.
+        """
+        max_length = self.yaml_data.assistant_response_max_length
+        instructions = utils.populate_placeholders(
+            logger=self.logger,
+            prompt_template=thread_instructions,
+            replacements=replacements_dict
+            )
+        model, messages = self._build_messages(
+            assistant_name,
+            f"{instructions}\nKeep your reply under {max_length} characters.",
+            context_messages
+            )
+        self.logger.info(f"Fast path: '{assistant_name}' ({model}) with {len(messages) - 2} context messages")
+
+        completion_params = {}
+        if self.response_max_completion_tokens:
+            completion_params['max_completion_tokens'] = self.response_max_completion_tokens
+        completion = await self.gpt_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            **completion_params
+            )
+        extracted_message = completion.choices[0].message.content
+        if not extracted_message:
+            raise ValueError(f"...Fast path returned no content (finish_reason: {completion.choices[0].finish_reason})")
+
+        if len(extracted_message) > max_length:
+            extracted_message = GPTResponseCleaner.compress_to_max_length(extracted_message, max_length=max_length) or extracted_message
+        self.logger.info(f"...This is the final response from execute_fast_path(): '{extracted_message}'")
+        return extracted_message
+
+    async def execute_fast_path_function_call(
+            self,
+            assistant_name: str,
+            function_schema: dict,
+            context_messages: list = None
+            ) -> dict:
+        """
+        Fast path version of GPTFunctionCallManager.execute_function_call: forces the function call in one
+        chat completions request and returns its parsed arguments (the function's output_data).
+        """
+        assistant = self.gpt_assistant_manager.assistants[assistant_name]['object']
+        model, messages = self._build_messages(
+            assistant_name,
+            "Call the function with your decision for the conversation above.",
+            context_messages
+            )
+        self.logger.info(f"Fast path function call: '{assistant_name}' ({model}) with {len(messages) - 2} context messages")
+
+        completion = await self.gpt_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            tools=[function_schema],
+            tool_choice={'type': 'function', 'function': {'name': function_schema['function']['name']}}
+            )
+        tool_calls = completion.choices[0].message.tool_calls
+        if not tool_calls:
+            raise ValueError(f"...Fast path function call for '{assistant.name}' returned no tool call")
+        output_data = json.loads(tool_calls[0].function.arguments)
+        self.logger.info(f"...Output data: {output_data}")
+        return output_data
+
 async def main():
     import dotenv
     import os
     import openai
+    from classes.GPTRunWatcherClass import GPTRunWatcher
+    from classes.GPTRunArbiterClass import GPTRunArbiter
 
     dotenv_load_result = dotenv.load_dotenv(dotenv_path='./config/.env')
     yaml_filepath=os.getenv('CHATZILLA_CONFIG_YAML_FILEPATH')
@@ -774,13 +1381,15 @@ async def main():
     config = ConfigManager.get_instance()
 
     # openai client
-    gpt_client = openai.OpenAI(api_key = config.openai_api_key)
+    gpt_client = openai.AsyncOpenAI(api_key = config.openai_api_key)
 
     # Initialize the thread manager and assistant manager and response manager
     assistant_manager = GPTAssistantManager(gpt_client)
     thread_manager = GPTThreadManager(gpt_client)
-    response_manager = GPTResponseManager(gpt_client, thread_manager, assistant_manager)
-    function_call_manager = GPTFunctionCallManager(gpt_client, thread_manager, response_manager, assistant_manager)
+    run_watcher = GPTRunWatcher(gpt_client)
+    run_arbiter = GPTRunArbiter()
+    response_manager = GPTResponseManager(gpt_client, thread_manager, assistant_manager, run_watcher, run_arbiter)
+    function_call_manager = GPTFunctionCallManager(gpt_client, thread_manager, response_manager, assistant_manager, run_watcher, run_arbiter)
 
     # ######################################
     # # TEST 1: Add messages to the thread
@@ -821,10 +1430,10 @@ async def main():
 
     ######################################
     # TEST 3: Now try to create_assistants and threads
-    assistant_manager.create_assistants(config.gpt_assistants_config)
-    assistant_manager.create_assistants_with_functions(config.gpt_assistants_with_functions_config)
+    await assistant_manager.create_assistants(config.gpt_assistants_config)
+    await assistant_manager.create_assistants_with_functions(config.gpt_assistants_with_functions_config)
 
-    thread_manager.create_threads(config.gpt_thread_names)
+    await thread_manager.create_threads(config.gpt_thread_names)
 
     ######################################
     # TEST 4 (requires TEST#3): Try to use function call manager to execute a function call
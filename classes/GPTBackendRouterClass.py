@@ -0,0 +1,220 @@
+import asyncio
+import bisect
+import math
+import time
+from typing import Awaitable, Callable
+
+from my_modules.my_logging import create_logger
+
+runtime_logger_level = 'INFO'
+
+class LatencyHistogram:
+    """
+    Latency counts in log-spaced buckets (each bucket_growth times wider than the last, from min_seconds
+    to max_seconds). Counts are halved every decay_samples samples, so percentiles follow recent latency.
+    """
+    def __init__(self, min_seconds=0.05, max_seconds=300, bucket_growth=1.25, decay_samples=500):
+        n_buckets = int(math.ceil(math.log(max_seconds / min_seconds, bucket_growth))) + 1
+        self.bucket_bounds = [min_seconds * bucket_growth ** i for i in range(n_buckets)]
+        self.counts = [0.0] * (n_buckets + 1) # the last bucket holds everything over max_seconds
+        self.decay_samples = decay_samples
+        self.samples = 0
+        self.total = 0.0
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(self.bucket_bounds, seconds)] += 1
+        self.total += 1
+        self.samples += 1
+        if self.samples % self.decay_samples == 0:
+            self.counts = [count / 2 for count in self.counts]
+            self.total /= 2
+
+    def percentile(self, percent: float) -> float:
+        """Upper bound of the bucket holding the percentile (None without samples)."""
+        if not self.total:
+            return None
+        target = self.total * percent / 100
+        cumulative = 0.0
+        for bucket_index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target and count:
+                return self.bucket_bounds[min(bucket_index, len(self.bucket_bounds) - 1)]
+        return self.bucket_bounds[-1]
+
+class GPTBackendRouter:
+    """
+    Hedges GPTResponseManager's assistant runs against secondary OpenAI-compatible backends.
+
+    The primary (the Assistants API run) gets until the hedge deadline to answer, i.e. complete or stream
+    its first delta. If it hasn't by then (or fails before it), the same request is sent as a chat
+    completion to the secondary backend with the best recent latency, and whichever answers first is
+    used. The other one is cancelled.
+
+    Time-to-answer is recorded per backend in a LatencyHistogram. The deadline is hedge_percentile of the
+    primary's histogram, clamped to min_hedge_seconds..max_hedge_seconds (initial_hedge_seconds until it
+    has min_samples), so hedges follow the primary's tail instead of a fixed timeout. A cancelled loser
+    records its time so far, which keeps a slow backend's tail from looking shorter than it is.
+
+    Args:
+        secondary_backends (list): dicts with 'name', 'client' (AsyncOpenAI for the backend's base_url)
+            and 'model' (None: the assistant's model).
+    """
+    def __init__(
+            self,
+            secondary_backends: list,
+            hedge_percentile=95,
+            initial_hedge_seconds=8,
+            min_hedge_seconds=2,
+            max_hedge_seconds=30,
+            min_samples=20,
+            context_message_limit=20,
+            response_max_completion_tokens=None
+            ):
+        self.logger = create_logger(
+            dirname='log',
+            logger_name='logger_GPTBackendRouter',
+            debug_level=runtime_logger_level,
+            mode='w',
+            stream_logs=True
+            )
+        self.secondary_backends = secondary_backends
+        self.hedge_percentile = hedge_percentile
+        self.initial_hedge_seconds = initial_hedge_seconds
+        self.min_hedge_seconds = min_hedge_seconds
+        self.max_hedge_seconds = max_hedge_seconds
+        self.min_samples = min_samples
+        self.context_message_limit = context_message_limit
+        self.response_max_completion_tokens = response_max_completion_tokens
+
+        self.latency_histograms = {'primary': LatencyHistogram()}
+        for backend in secondary_backends:
+            self.latency_histograms[backend['name']] = LatencyHistogram()
+
+        self.requests = 0
+        self.hedges = 0
+        self.secondary_wins = 0
+
+    def hedge_deadline(self) -> float:
+        """Seconds the primary gets to answer before a hedged request is sent."""
+        primary_histogram = self.latency_histograms['primary']
+        if primary_histogram.samples < self.min_samples:
+            return self.initial_hedge_seconds
+        return min(self.max_hedge_seconds, max(self.min_hedge_seconds, primary_histogram.percentile(self.hedge_percentile)))
+
+    def _pick_secondary_backend(self) -> dict:
+        """The secondary with the lowest recent median latency (config order for ties and unmeasured ones)."""
+        def median_latency(backend):
+            histogram = self.latency_histograms[backend['name']]
+            return histogram.percentile(50) if histogram.samples >= self.min_samples else 0.0
+        return min(self.secondary_backends, key=median_latency)
+
+    async def _complete_on_backend(self, backend: dict, build_messages: Callable[[], Awaitable[tuple]]) -> str:
+        model, messages = await build_messages()
+        completion_params = {}
+        if self.response_max_completion_tokens:
+            completion_params['max_completion_tokens'] = self.response_max_completion_tokens
+        completion = await backend['client'].chat.completions.create(
+            model=backend['model'] or model,
+            messages=messages,
+            **completion_params
+            )
+        extracted_message = completion.choices[0].message.content
+        if not extracted_message:
+            raise ValueError(f"Backend '{backend['name']}' returned no content (finish_reason: {completion.choices[0].finish_reason})")
+        return extracted_message
+
+    async def execute_hedged(
+            self,
+            primary: Awaitable[str],
+            primary_first_output: asyncio.Event,
+            build_secondary_messages: Callable[[], Awaitable[tuple]],
+            label: str = ''
+            ) -> tuple:
+        """
+        Runs primary, hedged with a secondary backend once the deadline passes.
+
+        Args:
+            primary (Awaitable): The primary request (it's cancelled if the secondary wins).
+            primary_first_output (asyncio.Event): Set by the primary when it streams its first delta; the
+                primary has answered from then on (its text is already on its way to chat).
+            build_secondary_messages (Callable): Awaited when the hedge is sent, returns (model, messages)
+                for the chat completion.
+            label (str): Shown in the logs.
+
+        Returns:
+            tuple: The reply and the name of the backend that gave it ('primary' or a secondary's name).
+        """
+        self.requests += 1
+        deadline = self.hedge_deadline()
+        start = time.monotonic()
+        primary_task = asyncio.create_task(primary)
+        first_output_task = asyncio.create_task(primary_first_output.wait())
+        secondary_task = None
+        secondary_backend = None
+        secondary_start = None
+        secondary_failure_logged = False
+
+        def primary_answered():
+            return primary_first_output.is_set() or (primary_task.done() and not primary_task.cancelled() and primary_task.exception() is None)
+
+        try:
+            while True:
+                if primary_answered():
+                    self.latency_histograms['primary'].record(time.monotonic() - start)
+                    if secondary_task is not None and not secondary_task.done():
+                        self.latency_histograms[secondary_backend['name']].record(time.monotonic() - secondary_start)
+                    return await primary_task, 'primary'
+
+                if secondary_task is not None and secondary_task.done() and secondary_task.exception() is None:
+                    self.secondary_wins += 1
+                    self.latency_histograms[secondary_backend['name']].record(time.monotonic() - secondary_start)
+                    if not primary_task.done():
+                        self.latency_histograms['primary'].record(time.monotonic() - start)
+                    self.logger.info(f"'{label}': secondary '{secondary_backend['name']}' answered first after {time.monotonic() - start:.2f}s, cancelling the primary")
+                    return secondary_task.result(), secondary_backend['name']
+
+                elapsed = time.monotonic() - start
+                if secondary_task is None and (primary_task.done() or elapsed >= deadline):
+                    self.hedges += 1
+                    secondary_backend = self._pick_secondary_backend()
+                    reason = f"primary failed ({primary_task.exception()})" if primary_task.done() else f"no answer from the primary after {deadline:.2f}s"
+                    self.logger.warning(f"'{label}': {reason}, hedging with '{secondary_backend['name']}'")
+                    secondary_start = time.monotonic()
+                    secondary_task = asyncio.create_task(self._complete_on_backend(secondary_backend, build_secondary_messages))
+                elif secondary_task is not None and secondary_task.done() and not secondary_failure_logged:
+                    secondary_failure_logged = True
+                    self.logger.warning(f"'{label}': secondary '{secondary_backend['name']}' failed: {secondary_task.exception()}")
+
+                waiting = {task for task in (primary_task, secondary_task) if task is not None and not task.done()}
+                if not waiting:
+                    break
+                if not primary_task.done():
+                    waiting.add(first_output_task)
+                timeout = max(deadline - elapsed, 0) if secondary_task is None else None
+                await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            # Both failed
+            raise primary_task.exception()
+        finally:
+            unfinished = [task for task in (primary_task, first_output_task, secondary_task) if task is not None and not task.done()]
+            for task in unfinished:
+                task.cancel()
+            # Waits for the loser's clean up (e.g. the primary cancelling its run)
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+    def get_metrics(self) -> dict:
+        return {
+            'requests': self.requests,
+            'hedges': self.hedges,
+            'secondary_wins': self.secondary_wins,
+            'hedge_deadline_seconds': round(self.hedge_deadline(), 2),
+            'backends': {
+                name: {
+                    'samples': histogram.samples,
+                    'p50_seconds': histogram.percentile(50),
+                    'p95_seconds': histogram.percentile(95),
+                    'p99_seconds': histogram.percentile(99)
+                    }
+                for name, histogram in self.latency_histograms.items()
+                }
+            }
@@ -0,0 +1,295 @@
+import asyncio
+import json
+import random
+import re
+import time
+
+import httpx
+
+from my_modules.my_logging import create_logger
+
+runtime_logger_level = 'INFO'
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of sending a request while the circuit is open (the OpenAI client reports it as a connection error)."""
+
+class TokenBucket:
+    """Client-side bucket refilled continuously up to capacity, e.g. requests or tokens per minute."""
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    async def acquire(self, amount: float) -> float:
+        """
+        Takes amount from the bucket, waiting for it to refill if needed (callers are served in order).
+
+        Returns:
+            float: The seconds waited.
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self.lock:
+            while True:
+                self._refill()
+                wait_seconds = max(self.blocked_until - time.monotonic(), 0.0)
+                if not wait_seconds and self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                wait_seconds = wait_seconds or (amount - self.tokens) / self.refill_per_second
+                await asyncio.sleep(wait_seconds)
+                waited += wait_seconds
+
+    def block(self, seconds: float):
+        """Holds every caller for the next seconds."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def sync(self, remaining: float, reset_seconds: float):
+        """Lowers the bucket to what the provider says is left, and blocks it until the reset if nothing is."""
+        self._refill()
+        self.tokens = min(self.tokens, remaining)
+        if remaining <= 0 and reset_seconds:
+            self.block(reset_seconds)
+
+class GPTCallGovernor(httpx.AsyncBaseTransport):
+    """
+    httpx transport shared by every GPT and TTS call (through the pooled client in DependencyInjector),
+    so the bot slows down under rate limits and provider trouble instead of dropping tasks.
+
+    For each request:
+        - Waits on client-side request and token buckets (requests_per_minute/tokens_per_minute), which are
+          lowered to the x-ratelimit-remaining-* headers of every response.
+        - Retries up to max_attempts, with full-jitter exponential backoff (or the provider's retry-after).
+          Requests that are safe to repeat (idempotent methods, or an Idempotency-Key header) are retried on
+          retry_statuses and any connection error. Others, like the POSTs that create runs and messages, only
+          on 429 and on errors before the request was sent, as the server may already have acted on them. A 429 holds the request bucket for the backoff, so every
+          caller slows down, not just the one that got it. Other retries are limited by a global retry
+          budget: every first attempt adds retry_budget_ratio to it (up to retry_budget_max), every retry
+          spends 1, so a degraded provider never sees more than ~retry_budget_ratio extra load.
+        - Trips the circuit after circuit_failure_threshold consecutive 5xx/connection failures. While it's
+          open, requests fail right away with CircuitOpenError; after circuit_open_seconds one probe request
+          is let through, and its outcome closes or re-opens the circuit.
+    The OpenAI client should be created with max_retries=0, so requests aren't retried twice.
+    """
+    retry_statuses = {408, 429, 500, 502, 503, 504}
+    idempotent_methods = {'GET', 'HEAD', 'OPTIONS', 'DELETE'}
+    # Raised before the request reached the server, so even a POST can be sent again
+    unsent_request_errors = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+    def __init__(
+            self,
+            transport: httpx.AsyncBaseTransport,
+            requests_per_minute=500,
+            tokens_per_minute=200000,
+            max_attempts=4,
+            backoff_base_seconds=0.5,
+            backoff_max_seconds=20,
+            retry_budget_ratio=0.2,
+            retry_budget_max=10,
+            circuit_failure_threshold=5,
+            circuit_open_seconds=30
+            ):
+        self.logger = create_logger(
+            dirname='log',
+            logger_name='logger_GPTCallGovernor',
+            debug_level=runtime_logger_level,
+            mode='w',
+            stream_logs=True
+            )
+        self.transport = transport
+        self.request_bucket = TokenBucket(requests_per_minute, requests_per_minute / 60)
+        self.token_bucket = TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.retry_budget_ratio = retry_budget_ratio
+        self.retry_budget_max = retry_budget_max
+        self.retry_budget = retry_budget_max
+        self.circuit_failure_threshold = circuit_failure_threshold
+        self.circuit_open_seconds = circuit_open_seconds
+
+        self.circuit_state = 'closed'
+        self.circuit_opened_at = 0.0
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+
+        self.requests = 0
+        self.retries = 0
+        self.retries_denied = 0
+        self.rejected_by_circuit = 0
+
+    @staticmethod
+    def _estimate_tokens(request: httpx.Request) -> int:
+        """Rough token cost of a request: ~4 characters per prompt token, plus the completion cap if set."""
+        content = request.content or b''
+        estimated_tokens = len(content) // 4 + 1
+        if content[:1] == b'{':
+            try:
+                body = json.loads(content)
+                estimated_tokens += int(body.get('max_completion_tokens') or body.get('max_tokens') or 0)
+            except ValueError:
+                pass
+        return estimated_tokens
+
+    @staticmethod
+    def _parse_duration(value: str) -> float:
+        """Parses rate limit reset durations like '1s', '6m0s', '250ms' or '0.5' into seconds."""
+        if not value:
+            return 0.0
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        units = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+        return sum(float(number) * units[unit] for number, unit in re.findall(r'([\d.]+)(ms|s|m|h)', value))
+
+    def _read_rate_limit_headers(self, response: httpx.Response):
+        headers = response.headers
+        for kind, bucket in (('requests', self.request_bucket), ('tokens', self.token_bucket)):
+            remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+            if remaining is not None:
+                try:
+                    bucket.sync(float(remaining), self._parse_duration(headers.get(f'x-ratelimit-reset-{kind}')))
+                except ValueError:
+                    pass
+
+    def _retry_after_seconds(self, response: httpx.Response) -> float:
+        if response is None:
+            return None
+        retry_after_ms = response.headers.get('retry-after-ms')
+        if retry_after_ms:
+            try:
+                return float(retry_after_ms) / 1000
+            except ValueError:
+                pass
+        retry_after = response.headers.get('retry-after')
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return None
+
+    def _backoff_seconds(self, attempt: int, response: httpx.Response) -> float:
+        retry_after = self._retry_after_seconds(response)
+        if retry_after is not None and retry_after <= self.backoff_max_seconds:
+            return retry_after + random.uniform(0, self.backoff_base_seconds)
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+
+    def _is_retryable(self, request: httpx.Request, status_code: int = None, error: httpx.TransportError = None) -> bool:
+        safe_to_repeat = request.method in self.idempotent_methods or 'idempotency-key' in request.headers
+        if error is not None:
+            return safe_to_repeat or isinstance(error, self.unsent_request_errors)
+        if status_code == 429:
+            return True
+        return safe_to_repeat and status_code in self.retry_statuses
+
+    def _check_circuit(self):
+        """Raises CircuitOpenError if the circuit is open (lets one probe through once it's due)."""
+        if self.circuit_state == 'closed':
+            return False
+        if time.monotonic() - self.circuit_opened_at >= self.circuit_open_seconds and not self.probe_in_flight:
+            self.circuit_state = 'half_open'
+            self.probe_in_flight = True
+            self.logger.info("Circuit half-open, sending a probe request")
+            return True
+        self.rejected_by_circuit += 1
+        raise CircuitOpenError(f"OpenAI circuit is open ({self.consecutive_failures} consecutive failures)")
+
+    def _record_outcome(self, failed: bool, is_probe: bool):
+        if is_probe:
+            self.probe_in_flight = False
+        if not failed:
+            if self.circuit_state != 'closed':
+                self.logger.warning("Circuit closed, OpenAI is answering again")
+            self.circuit_state = 'closed'
+            self.consecutive_failures = 0
+            return
+
+        self.consecutive_failures += 1
+        if self.circuit_state == 'half_open' or self.consecutive_failures >= self.circuit_failure_threshold:
+            if self.circuit_state != 'open':
+                self.logger.warning(f"Circuit opened after {self.consecutive_failures} consecutive failures, pausing OpenAI calls for {self.circuit_open_seconds}s")
+            self.circuit_state = 'open'
+            self.circuit_opened_at = time.monotonic()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.retry_budget = min(self.retry_budget_max, self.retry_budget + self.retry_budget_ratio)
+        estimated_tokens = self._estimate_tokens(request)
+
+        attempt = 0
+        while True:
+            is_probe = self._check_circuit()
+            outcome_recorded = False
+            try:
+                waited = await self.request_bucket.acquire(1)
+                waited += await self.token_bucket.acquire(estimated_tokens)
+                if waited >= 1:
+                    self.logger.info(f"Waited {waited:.1f}s on the rate limit buckets for {request.method} {request.url.path}")
+
+                response = None
+                try:
+                    response = await self.transport.handle_async_request(request)
+                    self._read_rate_limit_headers(response)
+                    failed = response.status_code >= 500
+                    retryable = self._is_retryable(request, status_code=response.status_code)
+                except httpx.TransportError as e:
+                    failed = True
+                    retryable = self._is_retryable(request, error=e)
+                    if not retryable or attempt + 1 >= self.max_attempts or self.retry_budget < 1:
+                        self._record_outcome(failed=True, is_probe=is_probe)
+                        outcome_recorded = True
+                        raise
+                self._record_outcome(failed=failed, is_probe=is_probe)
+                outcome_recorded = True
+
+                if not retryable or attempt + 1 >= self.max_attempts:
+                    return response
+
+                backoff_seconds = self._backoff_seconds(attempt, response)
+                if response is not None and response.status_code == 429:
+                    self.request_bucket.block(backoff_seconds)
+                elif self.retry_budget < 1:
+                    self.retries_denied += 1
+                    self.logger.warning(f"Retry budget spent, not retrying {request.method} {request.url.path} ({response.status_code})")
+                    return response
+                else:
+                    self.retry_budget -= 1
+                self.retries += 1
+                status = response.status_code if response is not None else 'connection error'
+                self.logger.warning(f"{request.method} {request.url.path} failed ({status}), retry {attempt + 1} in {backoff_seconds:.2f}s")
+                if response is not None:
+                    await response.aclose()
+                await asyncio.sleep(backoff_seconds)
+                attempt += 1
+            finally:
+                if is_probe and not outcome_recorded:
+                    # The probe was cancelled or raised before it had an outcome, re-open the circuit so a later probe can go
+                    self.probe_in_flight = False
+                    self.circuit_state = 'open'
+                    self.circuit_opened_at = time.monotonic()
+                    self.logger.warning("Probe request ended without an outcome, circuit re-opened")
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+    def get_metrics(self) -> dict:
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'retries_denied': self.retries_denied,
+            'rejected_by_circuit': self.rejected_by_circuit,
+            'retry_budget': round(self.retry_budget, 2),
+            'circuit_state': self.circuit_state,
+            'request_bucket': round(self.request_bucket.tokens, 1),
+            'token_bucket': round(self.token_bucket.tokens, 1)
+            }
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+
+from my_modules.my_logging import create_logger
+
+runtime_logger_level = 'INFO'
+
+class GPTRegistry:
+    """
+    Remembers the OpenAI assistants and threads the bot created, in a local JSON file, so a restart can
+    reuse them instead of creating new ones (and leaving the old ones orphaned on the account).
+
+    Assistants are stored with a hash of their instructions, model and tools (spec_hash), which tells
+    the assistant manager whether an assistant can be reused as-is or has to be updated in place.
+
+    File layout:
+        {
+            "assistants": {"<assistant_name>": {"id": "asst_...", "spec_hash": "..."}},
+            "threads": {"<thread_name>": {"id": "thread_..."}}
+        }
+    """
+    def __init__(self, registry_file_path):
+        self.logger = create_logger(
+            dirname='log',
+            logger_name='logger_GPTRegistry',
+            debug_level=runtime_logger_level,
+            mode='w',
+            stream_logs=True
+            )
+        self.registry_file_path = registry_file_path
+        self.assistants = {}
+        self.threads = {}
+        self.load()
+
+    @staticmethod
+    def spec_hash(instructions: str, model: str, tools: list) -> str:
+        spec = json.dumps({'instructions': instructions, 'model': model, 'tools': tools}, sort_keys=True)
+        return hashlib.sha256(spec.encode('utf-8')).hexdigest()
+
+    def load(self):
+        if not os.path.exists(self.registry_file_path):
+            self.logger.info(f"No GPT registry at {self.registry_file_path}, starting empty")
+            return
+        try:
+            with open(self.registry_file_path, 'r', encoding='utf-8') as file:
+                registry_data = json.load(file)
+            self.assistants = registry_data.get('assistants', {})
+            self.threads = registry_data.get('threads', {})
+            self.logger.info(f"Loaded GPT registry: {len(self.assistants)} assistants, {len(self.threads)} threads")
+        except Exception as e:
+            # A corrupt registry only costs a slower startup, never a failed one
+            self.logger.error(f"Error loading GPT registry {self.registry_file_path}, starting empty: {e}")
+            self.assistants = {}
+            self.threads = {}
+
+    def save(self):
+        """Writes the registry to a temp file and swaps it in, so a crash never leaves a half-written file."""
+        registry_dirpath = os.path.dirname(self.registry_file_path)
+        if registry_dirpath and not os.path.exists(registry_dirpath):
+            os.makedirs(registry_dirpath)
+
+        temp_file_path = f"{self.registry_file_path}.tmp"
+        try:
+            with open(temp_file_path, 'w', encoding='utf-8') as file:
+                json.dump({'assistants': self.assistants, 'threads': self.threads}, file, indent=2)
+            os.replace(temp_file_path, self.registry_file_path)
+        except Exception as e:
+            self.logger.error(f"Error saving GPT registry {self.registry_file_path}: {e}")
+
+    def get_assistant(self, assistant_name: str) -> dict:
+        return self.assistants.get(assistant_name)
+
+    def set_assistant(self, assistant_name: str, assistant_id: str, spec_hash: str):
+        self.assistants[assistant_name] = {'id': assistant_id, 'spec_hash': spec_hash}
+
+    def get_thread(self, thread_name: str) -> dict:
+        return self.threads.get(thread_name)
+
+    def set_thread(self, thread_name: str, thread_id: str):
+        self.threads[thread_name] = {'id': thread_id}
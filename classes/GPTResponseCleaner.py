@@ -15,6 +15,39 @@ class GPTResponseCleaner:
             return text[1:-1] 
         return text
     
+    @staticmethod
+    def compress_to_max_length(text: str, max_length: int, min_length_ratio: float = 0.4) -> Optional[str]:
+        """
+        Shortens the text to at most max_length characters by dropping whole sentences from the end.
+        A trailing counter like '(3 of 8)' (story/explanation progress) is kept.
+
+        Returns None when the result would be unusable: the first sentence alone is too long, or less
+        than min_length_ratio of max_length would be left (the caller then asks GPT to shorten it).
+        """
+        if len(text) <= max_length:
+            return text
+
+        suffix_match = re.search(r'\s*\(\d+ of \d+\)\s*$', text)
+        suffix = suffix_match.group().strip() if suffix_match else ''
+        body = text[:suffix_match.start()] if suffix_match else text
+        body_max_length = max_length - (len(suffix) + 1 if suffix else 0)
+
+        compressed_body = ''
+        for sentence in re.split(r'(?<=[.!?])\s+', body.strip()):
+            candidate = f"{compressed_body} {sentence}".strip()
+            if len(candidate) > body_max_length:
+                break
+            compressed_body = candidate
+
+        # A cut-off reply (e.g. stopped at max_completion_tokens) ends without punctuation, drop that fragment
+        if compressed_body and compressed_body[-1] not in '.!?"\')':
+            last_sentence_end = max(compressed_body.rfind(punctuation) for punctuation in '.!?')
+            compressed_body = compressed_body[:last_sentence_end + 1] if last_sentence_end >= 0 else ''
+
+        if len(compressed_body) < max_length * min_length_ratio:
+            return None
+        return f"{compressed_body} {suffix}" if suffix else compressed_body
+
     def perform_all_gpt_response_cleanups(text: str) -> str:
         """Performs all the cleanup operations on the text."""
         cleaned_text = GPTResponseCleaner.strip_prefix(text)
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+
+from my_modules.my_logging import create_logger
+
+runtime_logger_level = 'INFO'
+
+class GPTRunArbiter:
+    """
+    Owns "one active run per OpenAI thread" for every caller (GPTResponseManager.execute_thread,
+    add_message_to_thread and GPTFunctionCallManager.execute_function_call).
+
+    A caller holds a thread's run slot for the whole run (including waiting on it, submitting tool
+    outputs or cancelling it), and for writing messages, which the API also rejects while a run is
+    active. Overlapping callers queue on the slot in arrival order, so nothing has to list the thread's
+    runs or retry on "thread already has an active run". Slots are keyed by thread name, so a thread
+    swapped for a new one (GPTThreadContextManager rotation) keeps the same queue.
+
+    Wait times are kept per thread (the last wait_samples of them) for get_wait_metrics().
+    """
+    def __init__(self, wait_samples=200, slow_wait_seconds=1.0):
+        self.logger = create_logger(
+            dirname='log',
+            logger_name='logger_GPTRunArbiter',
+            debug_level=runtime_logger_level,
+            mode='w',
+            stream_logs=True
+            )
+        self.slow_wait_seconds = slow_wait_seconds
+
+        self.thread_slots = defaultdict(asyncio.Lock)
+        self.slot_holders = {}
+        self.queued_callers = defaultdict(int)
+        self.wait_times = defaultdict(lambda: deque(maxlen=wait_samples))
+        self.acquisitions = defaultdict(int)
+        self.contended_acquisitions = defaultdict(int)
+
+    @asynccontextmanager
+    async def run_slot(self, thread_name: str, caller: str = ''):
+        """Holds the thread's run slot for the duration of the block, waiting for the current holder first."""
+        slot = self.thread_slots[thread_name]
+        contended = slot.locked()
+        if contended:
+            self.logger.info(f"'{caller}' queued for thread '{thread_name}' behind '{self.slot_holders.get(thread_name)}' ({self.queued_callers[thread_name] + 1} waiting)")
+
+        start = time.monotonic()
+        self.queued_callers[thread_name] += 1
+        try:
+            await slot.acquire()
+        finally:
+            self.queued_callers[thread_name] -= 1
+        wait_seconds = time.monotonic() - start
+
+        self.wait_times[thread_name].append(wait_seconds)
+        self.acquisitions[thread_name] += 1
+        if contended:
+            self.contended_acquisitions[thread_name] += 1
+        if wait_seconds >= self.slow_wait_seconds:
+            self.logger.warning(f"'{caller}' waited {wait_seconds:.2f}s for the run slot of thread '{thread_name}'")
+
+        self.slot_holders[thread_name] = caller
+        try:
+            yield
+        finally:
+            self.slot_holders.pop(thread_name, None)
+            slot.release()
+
+    def get_wait_metrics(self, thread_name: str = None) -> dict:
+        """
+        Returns:
+            dict: thread_name -> acquisitions, contended (had to queue), queued (waiting now), holder, and
+                p50/p95/max wait seconds over the recent acquisitions. Only thread_name if given.
+        """
+        thread_names = [thread_name] if thread_name else list(self.acquisitions)
+        metrics = {}
+        for name in thread_names:
+            wait_times = sorted(self.wait_times[name])
+            metrics[name] = {
+                'acquisitions': self.acquisitions[name],
+                'contended': self.contended_acquisitions[name],
+                'queued': self.queued_callers[name],
+                'holder': self.slot_holders.get(name),
+                'wait_p50_seconds': wait_times[len(wait_times) // 2] if wait_times else 0.0,
+                'wait_p95_seconds': wait_times[max(0, int(len(wait_times) * 0.95) - 1)] if wait_times else 0.0,
+                'wait_max_seconds': wait_times[-1] if wait_times else 0.0
+                }
+        return metrics
@@ -0,0 +1,173 @@
+import asyncio
+import time
+
+from my_modules.my_logging import create_logger
+
+runtime_logger_level = 'INFO'
+
+class WatchedRun:
+    __slots__ = ('thread_id', 'run_id', 'wait_statuses', 'future', 'started_at', 'deadline', 'poll_interval', 'next_poll_at', 'polls', 'waiters')
+
+    def __init__(self, thread_id, run_id, wait_statuses, future, started_at, deadline, poll_interval):
+        self.thread_id = thread_id
+        self.run_id = run_id
+        self.wait_statuses = wait_statuses
+        self.future = future
+        self.started_at = started_at
+        self.deadline = deadline
+        self.poll_interval = poll_interval
+        self.next_poll_at = started_at + poll_interval
+        self.polls = 0
+        self.waiters = 0
+
+class GPTRunWatcher:
+    """
+    Tracks every active OpenAI run (across all threads) from a single polling task.
+
+    Each run is polled with its own adaptive backoff: initial_poll_seconds at first, growing by
+    backoff_factor after every poll up to max_poll_seconds, so short runs resolve quickly and long
+    runs don't flood runs.retrieve. Waiters get a future per run that resolves with the run object
+    once its status leaves wait_statuses, or fails with TimeoutError after max_waittime_for_gpt_response.
+    Waiting on a run that's already being watched shares the same future (one retrieve per poll).
+    """
+    default_wait_statuses = ('queued', 'in_progress', 'cancelling')
+
+    def __init__(
+            self,
+            gpt_client,
+            max_waittime_for_gpt_response=120,
+            initial_poll_seconds=0.5,
+            max_poll_seconds=5,
+            backoff_factor=1.5
+            ):
+        self.logger = create_logger(
+            dirname='log',
+            logger_name='logger_GPTRunWatcher',
+            debug_level=runtime_logger_level,
+            mode='w',
+            stream_logs=True
+            )
+        self.gpt_client = gpt_client
+        self.max_waittime_for_gpt_response = max_waittime_for_gpt_response
+        self.initial_poll_seconds = initial_poll_seconds
+        self.max_poll_seconds = max_poll_seconds
+        self.backoff_factor = backoff_factor
+
+        self.watched_runs = {}
+        self.watch_loop_task = None
+        self.runs_changed = None
+        self.retrieve_count = 0
+
+    def watch(self, thread_id: str, run_id: str, wait_statuses: tuple = None, timeout: float = None) -> asyncio.Future:
+        """
+        Starts watching a run and returns the future that resolves with the run once it reaches a status outside wait_statuses.
+        """
+        watched_run = self.watched_runs.get(run_id)
+        if watched_run is not None and not watched_run.future.done():
+            return watched_run.future
+
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        watched_run = WatchedRun(
+            thread_id=thread_id,
+            run_id=run_id,
+            wait_statuses=tuple(wait_statuses or self.default_wait_statuses),
+            future=loop.create_future(),
+            started_at=now,
+            deadline=now + (timeout if timeout is not None else self.max_waittime_for_gpt_response),
+            poll_interval=self.initial_poll_seconds
+            )
+        self.watched_runs[run_id] = watched_run
+        self.logger.debug(f"Watching run {run_id} on thread {thread_id} ({len(self.watched_runs)} active)")
+
+        if self.runs_changed is None:
+            self.runs_changed = asyncio.Event()
+        if self.watch_loop_task is None or self.watch_loop_task.done():
+            self.watch_loop_task = asyncio.create_task(self._watch_loop())
+        self.runs_changed.set()
+        return watched_run.future
+
+    async def wait_for_run(self, thread_id: str, run_id: str, wait_statuses: tuple = None, timeout: float = None):
+        """
+        Waits until a run reaches a status outside wait_statuses and returns the run object.
+
+        Raises:
+            TimeoutError: If the run is still in one of wait_statuses after the timeout (default max_waittime_for_gpt_response).
+        """
+        future = self.watch(thread_id, run_id, wait_statuses=wait_statuses, timeout=timeout)
+        watched_run = self.watched_runs[run_id]
+        watched_run.waiters += 1
+        try:
+            # shield() so one cancelled waiter doesn't cancel a future other waiters share
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if watched_run.waiters == 1 and self.watched_runs.get(run_id) is watched_run:
+                self.unwatch(run_id)
+            raise
+        finally:
+            watched_run.waiters -= 1
+
+    def unwatch(self, run_id: str):
+        """Stops watching a run, cancelling its future if it hasn't resolved yet."""
+        watched_run = self.watched_runs.pop(run_id, None)
+        if watched_run is not None and not watched_run.future.done():
+            watched_run.future.cancel()
+
+    def _resolve(self, watched_run, run=None, exception=None):
+        self.watched_runs.pop(watched_run.run_id, None)
+        if watched_run.future.done():
+            return
+        if exception is not None:
+            watched_run.future.set_exception(exception)
+        else:
+            watched_run.future.set_result(run)
+
+    async def _poll_run(self, watched_run):
+        try:
+            run = await self.gpt_client.beta.threads.runs.retrieve(
+                thread_id=watched_run.thread_id,
+                run_id=watched_run.run_id
+                )
+        except Exception as e:
+            self.logger.error(f"Error retrieving run {watched_run.run_id}: {e}")
+            self._resolve(watched_run, exception=e)
+            return
+        self.retrieve_count += 1
+        watched_run.polls += 1
+
+        if run.status not in watched_run.wait_statuses:
+            elapsed = time.monotonic() - watched_run.started_at
+            self.logger.info(f"Run {watched_run.run_id} reached status '{run.status}' after {elapsed:.1f}s ({watched_run.polls} polls)")
+            self._resolve(watched_run, run=run)
+            return
+
+        watched_run.poll_interval = min(watched_run.poll_interval * self.backoff_factor, self.max_poll_seconds)
+        watched_run.next_poll_at = time.monotonic() + watched_run.poll_interval
+
+    async def _watch_loop(self):
+        while self.watched_runs:
+            now = time.monotonic()
+
+            for watched_run in list(self.watched_runs.values()):
+                if watched_run.future.done():
+                    self.watched_runs.pop(watched_run.run_id, None)
+                elif now >= watched_run.deadline:
+                    self.logger.warning(f"Run {watched_run.run_id} not finished after {now - watched_run.started_at:.0f}s, giving up")
+                    self._resolve(watched_run, exception=TimeoutError(
+                        f"Run {watched_run.run_id} not finished after {watched_run.deadline - watched_run.started_at:.0f} seconds"
+                        ))
+
+            due_runs = [watched_run for watched_run in self.watched_runs.values() if watched_run.next_poll_at <= now]
+            if due_runs:
+                await asyncio.gather(*(self._poll_run(watched_run) for watched_run in due_runs))
+                continue
+            if not self.watched_runs:
+                break
+
+            # Sleep until the next poll or deadline is due, or a new run is added
+            next_wakeup = min(min(watched_run.next_poll_at, watched_run.deadline) for watched_run in self.watched_runs.values())
+            self.runs_changed.clear()
+            try:
+                await asyncio.wait_for(self.runs_changed.wait(), timeout=max(next_wakeup - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,191 @@
+import asyncio
+from collections import defaultdict, deque
+
+import tiktoken
+
+from my_modules.my_logging import create_logger
+
+runtime_logger_level = 'INFO'
+
+class GPTThreadContextManager:
+    """
+    Keeps each thread's context under a token budget, so run latency doesn't grow over a long stream.
+
+    Every message written to a thread (and every reply) is counted with a local tokenizer. Messages that
+    fall out of the last seed_last_n_messages are folded into a rolling per-thread summary in the background
+    (one small chat completions call per summary_chunk_tokens). When a thread goes over token_budget, it's
+    swapped for a fresh thread seeded with that summary and the last seed_last_n_messages. The old thread
+    is deleted after delete_grace_seconds, so a run still finishing on it isn't cut off.
+    """
+    def __init__(
+            self,
+            gpt_client,
+            gpt_thread_manager,
+            token_budget=8000,
+            seed_last_n_messages=10,
+            summary_max_tokens=300,
+            summary_chunk_tokens=1500,
+            summary_model='gpt-4o-mini',
+            delete_grace_seconds=120
+            ):
+        self.logger = create_logger(
+            dirname='log',
+            logger_name='logger_GPTThreadContextManager',
+            debug_level=runtime_logger_level,
+            mode='w',
+            stream_logs=True
+            )
+        self.gpt_client = gpt_client
+        self.gpt_thread_manager = gpt_thread_manager
+        self.token_budget = token_budget
+        self.seed_last_n_messages = seed_last_n_messages
+        self.summary_max_tokens = summary_max_tokens
+        self.summary_chunk_tokens = summary_chunk_tokens
+        self.summary_model = summary_model
+        self.delete_grace_seconds = delete_grace_seconds
+
+        try:
+            self.encoding = tiktoken.get_encoding('cl100k_base')
+        except Exception as e:
+            # Token counts fall back to ~4 characters per token
+            self.logger.warning(f"Could not load the tiktoken encoding, estimating token counts: {e}")
+            self.encoding = None
+
+        self.thread_tokens = defaultdict(int)
+        self.recent_messages = defaultdict(lambda: deque(maxlen=self.seed_last_n_messages))
+        # (role, content, tokens) entries. Messages that can't be summarized (e.g. the summary calls keep
+        # failing) are dropped oldest first past unsummarized_max_tokens, so the backlog stays bounded.
+        self.unsummarized_messages = defaultdict(deque)
+        self.unsummarized_tokens = defaultdict(int)
+        self.unsummarized_max_tokens = 4 * summary_chunk_tokens
+        self.summaries = {}
+        self.summary_tasks = {}
+        # Referenced until done, so pending deletes aren't garbage collected
+        self.delete_thread_tasks = set()
+        self.rotation_counts = defaultdict(int)
+
+    def count_tokens(self, text: str) -> int:
+        if self.encoding is None:
+            return len(text) // 4 + 1
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def record_message(self, thread_name: str, role: str, content: str):
+        """Counts a message written to a thread and keeps it for the next seed/summary."""
+        if not content:
+            return
+        tokens = self.count_tokens(content)
+        self.thread_tokens[thread_name] += tokens
+
+        recent_messages = self.recent_messages[thread_name]
+        if len(recent_messages) == recent_messages.maxlen:
+            self._add_unsummarized_messages(thread_name, [recent_messages[0]])
+        recent_messages.append((role, content, tokens))
+
+        summary_task = self.summary_tasks.get(thread_name)
+        if self.unsummarized_tokens[thread_name] >= self.summary_chunk_tokens and (summary_task is None or summary_task.done()):
+            self.summary_tasks[thread_name] = asyncio.create_task(self._update_summary(thread_name))
+
+    def _add_unsummarized_messages(self, thread_name: str, messages: list, prepend=False):
+        unsummarized_messages = self.unsummarized_messages[thread_name]
+        if prepend:
+            unsummarized_messages.extendleft(reversed(messages))
+        else:
+            unsummarized_messages.extend(messages)
+        self.unsummarized_tokens[thread_name] += sum(tokens for _, _, tokens in messages)
+
+        dropped_messages = 0
+        while self.unsummarized_tokens[thread_name] > self.unsummarized_max_tokens and len(unsummarized_messages) > 1:
+            _, _, tokens = unsummarized_messages.popleft()
+            self.unsummarized_tokens[thread_name] -= tokens
+            dropped_messages += 1
+        if dropped_messages:
+            self.logger.warning(f"Dropped {dropped_messages} unsummarized messages from thread '{thread_name}' (over {self.unsummarized_max_tokens} tokens)")
+
+    async def _update_summary(self, thread_name: str):
+        """Folds the messages that left the recent window into the thread's rolling summary."""
+        messages_to_fold = list(self.unsummarized_messages.pop(thread_name, ()))
+        self.unsummarized_tokens.pop(thread_name, None)
+        transcript = '\n'.join(f"{role}: {content}" for role, content, _ in messages_to_fold)
+        previous_summary = self.summaries.get(thread_name, '')
+
+        try:
+            completion = await self.gpt_client.chat.completions.create(
+                model=self.summary_model,
+                messages=[
+                    {'role': 'system', 'content': (
+                        f"Update the running summary of a Twitch chat conversation with the new messages. "
+                        f"Keep names, ongoing topics, story/plot points and anything the bot promised. "
+                        f"Reply with the summary only, under {self.summary_max_tokens} tokens."
+                    )},
+                    {'role': 'user', 'content': f"Current summary:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}"}
+                ],
+                max_completion_tokens=self.summary_max_tokens
+                )
+            self.summaries[thread_name] = completion.choices[0].message.content.strip()
+            self.logger.info(f"Updated summary for thread '{thread_name}' with {len(messages_to_fold)} messages")
+        except Exception as e:
+            # Put the messages back, they're folded in on the next attempt (or seeded raw)
+            self.logger.warning(f"Could not update summary for thread '{thread_name}': {e}")
+            self._add_unsummarized_messages(thread_name, messages_to_fold, prepend=True)
+
+    def _build_seed_message(self, thread_name: str) -> str:
+        seed_sections = []
+        summary = self.summaries.get(thread_name)
+        if summary:
+            seed_sections.append(f"Summary of the conversation so far:\n{summary}")
+
+        # Messages not summarized yet are carried over as-is, newest first, up to the summary size
+        carried_over_lines = []
+        carried_over_tokens = 0
+        for role, content, tokens in reversed(self.unsummarized_messages[thread_name]):
+            carried_over_tokens += tokens
+            if carried_over_tokens > self.summary_max_tokens:
+                break
+            carried_over_lines.insert(0, f"{role}: {content}")
+        if carried_over_lines:
+            seed_sections.append("Earlier messages:\n" + '\n'.join(carried_over_lines))
+
+        if self.recent_messages[thread_name]:
+            seed_sections.append("Most recent messages:\n" + '\n'.join(
+                f"{role}: {content}" for role, content, _ in self.recent_messages[thread_name]
+            ))
+        return '\n\n'.join(seed_sections)
+
+    async def _delete_thread_later(self, thread_name: str, thread_id: str):
+        await asyncio.sleep(self.delete_grace_seconds)
+        try:
+            await self.gpt_client.beta.threads.delete(thread_id)
+            self.logger.info(f"Deleted rotated-out thread '{thread_name}' ({thread_id})")
+        except Exception as e:
+            self.logger.warning(f"Could not delete rotated-out thread '{thread_name}' ({thread_id}): {e}")
+
+    async def rotate_if_over_budget(self, thread_name: str) -> bool:
+        """
+        Swaps the thread for a fresh, seeded one if it's over the token budget.
+        Call it only when no run is active on the thread (e.g. from its TaskManager lane).
+
+        Returns:
+            bool: True if the thread was rotated.
+        """
+        if self.thread_tokens[thread_name] <= self.token_budget or thread_name not in self.gpt_thread_manager.threads:
+            return False
+
+        old_thread_id = self.gpt_thread_manager.threads[thread_name]['id']
+        seed_message = self._build_seed_message(thread_name)
+
+        new_thread = await self.gpt_client.beta.threads.create(
+            messages=[{'role': 'user', 'content': seed_message}] if seed_message else []
+            )
+        self.gpt_thread_manager.replace_thread(thread_name, new_thread.id)
+
+        self.rotation_counts[thread_name] += 1
+        self.logger.info(
+            f"Rotated thread '{thread_name}' at {self.thread_tokens[thread_name]} tokens (budget: {self.token_budget}): "
+            f"{old_thread_id} -> {new_thread.id}, seeded with {self.count_tokens(seed_message)} tokens "
+            f"(rotation #{self.rotation_counts[thread_name]})"
+            )
+        self.thread_tokens[thread_name] = self.count_tokens(seed_message)
+        delete_thread_task = asyncio.create_task(self._delete_thread_later(thread_name, old_thread_id))
+        self.delete_thread_tasks.add(delete_thread_task)
+        delete_thread_task.add_done_callback(self.delete_thread_tasks.discard)
+        return True
@@ -1,13 +1,23 @@
 from classes.ConfigManagerClass import ConfigManager
 from models.task import AddMessageTask
 from my_modules import my_logging
+from collections import defaultdict, deque
+import asyncio
 import hashlib
 import re
+import time
 
 runtime_logger_level = 'INFO'
 
 class MessageHandler:
-    def __init__(self, task_manager, msg_history_limit):
+    def __init__(
+            self,
+            task_manager,
+            msg_history_limit,
+            thread_message_buffer_max_messages=20,
+            thread_message_buffer_max_age_seconds=60,
+            recent_chat_messages_max=200
+            ):
         self.logger = my_logging.create_logger(
             dirname='log', 
             logger_name='MessageHandlerClass',
@@ -32,6 +42,22 @@ class MessageHandler:
         self.message_history_raw = []
         self.all_msg_history_gptdict = []
 
+        # Recent chat (users and the bot) with arrival times, read by the conversation intent classifier
+        self.recent_chat_messages = deque(maxlen=recent_chat_messages_max)
+
+        # Chat messages waiting to be written to each GPT thread. They're written as one message
+        # right before the thread's next run (see dump_message_queue_into_thread_history()), or
+        # once a buffer reaches max_messages or its oldest message is max_age_seconds old (a timer per
+        # buffer, so a quiet chat still gets flushed). Messages whose write fails are put back in front,
+        # up to thread_message_buffer_max_restored_messages per thread (the oldest are dropped past that).
+        self.pending_thread_messages = defaultdict(list)
+        self.pending_thread_messages_since = {}
+        self.pending_thread_flush_timers = {}
+        self.pending_thread_flush_tasks = set()
+        self.thread_message_buffer_max_messages = thread_message_buffer_max_messages
+        self.thread_message_buffer_max_age_seconds = thread_message_buffer_max_age_seconds
+        self.thread_message_buffer_max_restored_messages = 5 * thread_message_buffer_max_messages
+
     def _generate_message_id(self, channel: str, user_id: str, timestamp: str, content: str) -> str:
         unique_string = f"{channel}_{user_id}_{timestamp}_{content}"
         return hashlib.md5(unique_string.encode()).hexdigest()
@@ -185,17 +211,105 @@ class MessageHandler:
     
          # Add user to users list if its not the bot (NOTE: GPT DOES THIS ALREADY FOR BOT RESPONSES, so we don't add bot messages to the message history)
         if message_metadata['message_author'] is not None and message_username != self.config.twitch_bot_username and message_metadata['name'] != "_unknown":
-            task = AddMessageTask(thread_name, message_content_w_username, message_role)
-            await self.task_manager.add_task_to_queue(thread_name, task)
-            self.logger.info(f"Message author not the bot '{message_username}', message task added to queue (thread: {thread_name})")
-
-            # # Wait for the task to complete before continuing
-            # Doesn't work because of some async issue
-            # await task.future 
+            self.logger.info(f"Message author not the bot '{message_username}', buffering message for thread: {thread_name}")
+            await self._buffer_thread_message(thread_name, message_content_w_username, message_role)
 
         else:
             self.logger.info(f"Message author is the bot '{message_username}', messager not added to queue (already handled by GPT thread)")
 
+    async def add_bot_message_to_thread_history(self, thread_name, content) -> None:
+        """
+        Buffers a reply the bot produced outside the thread (fast path), so the thread still sees what the bot said.
+        """
+        await self._buffer_thread_message(thread_name, f"{self.config.twitch_bot_display_name}: {content}")
+
+    async def add_request_to_thread_history(self, thread_name, requester_name, request_text) -> None:
+        """
+        Buffers a command's request (commands aren't added by add_to_thread_history()), e.g. ahead of a cached reply.
+        """
+        await self._buffer_thread_message(thread_name, f"{requester_name}: {request_text}")
+
+    async def _buffer_thread_message(self, thread_name, line, message_role='user') -> None:
+        pending_messages = self.pending_thread_messages[thread_name]
+        pending_messages.append(line)
+        self._start_buffer_timer(thread_name, message_role)
+        self.logger.info(f"Message buffered for thread: {thread_name} ({len(pending_messages)} pending)")
+
+        oldest_message_age = time.monotonic() - self.pending_thread_messages_since[thread_name]
+        if len(pending_messages) >= self.thread_message_buffer_max_messages or oldest_message_age >= self.thread_message_buffer_max_age_seconds:
+            await self.flush_thread_history(thread_name, message_role)
+
+    def _start_buffer_timer(self, thread_name, message_role) -> None:
+        """Starts a buffer's age timer, unless it's already running."""
+        if thread_name in self.pending_thread_messages_since:
+            return
+        self.pending_thread_messages_since[thread_name] = time.monotonic()
+        self.pending_thread_flush_timers[thread_name] = asyncio.get_running_loop().call_later(
+            self.thread_message_buffer_max_age_seconds,
+            self._flush_aged_thread_messages,
+            thread_name,
+            message_role
+            )
+
+    def _flush_aged_thread_messages(self, thread_name, message_role) -> None:
+        # Timer callback: the buffer's oldest message has reached max_age_seconds
+        self.pending_thread_flush_timers.pop(thread_name, None)
+        self.logger.info(f"Oldest pending message is {self.thread_message_buffer_max_age_seconds}s old, flushing thread: {thread_name}")
+        task = asyncio.create_task(self.flush_thread_history(thread_name, message_role))
+        self.pending_thread_flush_tasks.add(task)
+        task.add_done_callback(self.pending_thread_flush_tasks.discard)
+
+    def dump_message_queue_into_thread_history(self, thread_name) -> str:
+        """
+        Empties a thread's pending message buffer.
+
+        Returns:
+            str: The pending messages consolidated into one message (one line each), or None if there were none.
+        """
+        pending_messages = self.pending_thread_messages.pop(thread_name, None)
+        self.pending_thread_messages_since.pop(thread_name, None)
+        flush_timer = self.pending_thread_flush_timers.pop(thread_name, None)
+        if flush_timer is not None:
+            flush_timer.cancel()
+        if not pending_messages:
+            return None
+        self.logger.debug(f"Dumping {len(pending_messages)} pending message(s) for thread: {thread_name}")
+        return "\n".join(pending_messages)
+
+    def restore_pending_thread_messages(self, thread_name, consolidated_content, message_role='user') -> None:
+        """
+        Puts dumped messages whose thread write failed back at the front of the thread's buffer, so they're
+        written with the next flush (the age timer restarts, which spaces out retries).
+        """
+        pending_messages = self.pending_thread_messages[thread_name]
+        pending_messages[:0] = consolidated_content.split("\n")
+        excess_messages = len(pending_messages) - self.thread_message_buffer_max_restored_messages
+        if excess_messages > 0:
+            del pending_messages[:excess_messages]
+            self.logger.warning(f"Dropped the {excess_messages} oldest pending message(s) for thread: {thread_name} (buffer full)")
+        self._start_buffer_timer(thread_name, message_role)
+        self.logger.warning(f"Thread write failed, pending messages put back in the buffer for thread: {thread_name} ({len(pending_messages)} pending)")
+
+    def _on_flush_task_done(self, thread_name, consolidated_content, message_role, future) -> None:
+        # The AddMessageTask was dropped (shed, rejected) or its write failed
+        if future.cancelled() or future.exception() is not None:
+            self.restore_pending_thread_messages(thread_name, consolidated_content, message_role)
+
+    async def flush_thread_history(self, thread_name, message_role='user') -> None:
+        """
+        Queues a thread's pending messages as a single AddMessageTask (they're put back in the buffer
+        if the task fails or is dropped).
+        """
+        consolidated_content = self.dump_message_queue_into_thread_history(thread_name)
+        if consolidated_content is None:
+            return
+        task = AddMessageTask(thread_name, consolidated_content, message_role)
+        task.future.add_done_callback(
+            lambda future: self._on_flush_task_done(thread_name, consolidated_content, message_role, future)
+            )
+        await self.task_manager.add_task_to_queue(thread_name, task)
+        self.logger.info(f"Pending messages flushed, message task added to queue (thread: {thread_name})")
+
     # TODO: This is almost ready for deprecation.  Need to decide if its possible
     # to use the GPT response manager to handle all message history or optionally
     # use the faiss service to handle message history.
@@ -219,11 +333,21 @@ class MessageHandler:
         #Apply message dict to msg histories
         self.message_history_raw.append(message_metadata)
         self.all_msg_history_gptdict.append(gpt_ready_msg_dict)
+        self.recent_chat_messages.append({
+            'at': time.monotonic(),
+            'role': message_metadata['role'],
+            'name': message_metadata['name'],
+            'content': message_metadata['content']
+            })
 
         #cleanup msg histories for GPT
         self._cleanup_message_history()
         self.logger.info("Message added to message histories")
         self.logger.info(f"Preview of latest 2 messages in message histories ({len(self.all_msg_history_gptdict)} total):")
 
+    def get_recent_chat_messages(self) -> list:
+        """Returns the recent chat messages (dicts with at, role, name and content), oldest first."""
+        return list(self.recent_chat_messages)
+
 if __name__ == '__main__':
     print("loaded MessageHandlerClass.py")
\ No newline at end of file
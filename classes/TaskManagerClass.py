@@ -1,124 +1,376 @@
 from typing import Dict, List, Callable
 import asyncio
-from collections import defaultdict 
+import time
+from collections import defaultdict
 
 from my_modules import my_logging
+from models.task import TaskPriority, TaskOverflowPolicy
+from classes.CustomExceptions import TaskDroppedException, TaskExpiredException, TaskSupersededException, TaskCancelledException
+from classes.CustomExceptions import TaskShedException, TaskRejectedException
 
 runtime_logger_level = 'INFO'
+
+class PriorityTaskQueue(asyncio.Queue):
+    """
+    asyncio.Queue that hands out the task with the best (lowest) effective priority.
+    A task's effective priority improves by one class for every `aging_seconds` it waits,
+    so background tasks can't be starved forever. Ties are served in arrival order.
+    """
+    def __init__(self, aging_seconds=30, maxsize=0):
+        self.aging_seconds = aging_seconds
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self._queue = []
+
+    def _put(self, task):
+        self._queue.append(task)
+
+    def _effective_priority(self, task, now):
+        waited_seconds = now - task.enqueued_at if task.enqueued_at else 0
+        return task.priority - waited_seconds / self.aging_seconds
+
+    def _get(self):
+        now = time.monotonic()
+        best_index = min(
+            range(len(self._queue)),
+            key=lambda i: (self._effective_priority(self._queue[i], now), i)
+            )
+        return self._queue.pop(best_index)
+
+    def remove_where(self, predicate: Callable) -> list:
+        """Removes and returns every waiting task matching predicate, keeping the queue's counters consistent."""
+        removed_tasks = [task for task in self._queue if predicate(task)]
+        if removed_tasks:
+            self._queue = [task for task in self._queue if not predicate(task)]
+            for _ in removed_tasks:
+                self.task_done()
+        return removed_tasks
+
 class TaskManager:
-    def __init__(self):
+    def __init__(
+            self,
+            max_concurrent_tasks=3,
+            priority_aging_seconds=30,
+            task_ttl_seconds: dict = None,
+            max_queue_size=50
+            ):
 
         # Create a logger
         self.logger = my_logging.create_logger(
-            dirname='log', 
+            dirname='log',
             logger_name='TaskManagerClass',
             debug_level=runtime_logger_level,
             mode='w',
             stream_logs=True
             )
 
-        # Task queues
-        self.task_queues: Dict[str, asyncio.Queue] = defaultdict(asyncio.Queue) # Thread name to task queue mapping
+        # Task queues (priority-aware and bounded, see PriorityTaskQueue and _make_room())
+        self.priority_aging_seconds = priority_aging_seconds
+        self.max_queue_size = max_queue_size
+        self.task_queues: Dict[str, PriorityTaskQueue] = defaultdict(
+            lambda: PriorityTaskQueue(aging_seconds=self.priority_aging_seconds, maxsize=self.max_queue_size)
+            ) # Thread name to task queue mapping
         self.task_queue_lock = asyncio.Lock()
         self.on_task_ready: Callable[[Dict], None] = None
 
+        # Called with a task turned away because its queue was full (e.g. to tell the requester)
+        self.on_task_rejected: Callable[[object], None] = None
+
+        # One long-lived worker per thread_name (a 'lane'), started the first time a thread_name is seen.
+        # Each lane handles one task at a time (by priority, FIFO within a priority), lanes run concurrently.
+        self.task_workers: Dict[str, asyncio.Task] = {}
+
+        # Global cap on the number of tasks being handled at once across all lanes
+        self.max_concurrent_tasks = max_concurrent_tasks
+        self.concurrency_semaphore = asyncio.Semaphore(max_concurrent_tasks)
+
+        # Default time-to-live per priority class (by name, e.g. {'interactive': 60}). Tasks still
+        # queued past their deadline are dropped instead of being run late.
+        task_ttl_seconds = task_ttl_seconds or {}
+        self.task_ttl_seconds = {
+            priority: task_ttl_seconds.get(name)
+            for priority, name in TaskPriority.names.items()
+        }
+
+        # Lane stats
+        self.lane_in_flight: Dict[str, int] = defaultdict(int)
+        self.lane_in_flight_since: Dict[str, float] = {}
+        self.dropped_task_counts: Dict[str, int] = defaultdict(int)
+        self.shed_task_counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int)) # thread_name -> policy -> count
+
+        # The task each lane is currently handling and the asyncio.Task running its handler (for cancellation)
+        self.lane_current_task: Dict[str, tuple] = {}
+
     async def _wait_for_task_completion(self, task, description=""):
-        """Waits for a task's completion with logging."""
+        """Waits for a task's completion with logging. Returns None if the task was dropped."""
         if description:
             self.logger.info(f"...waiting for {description} task to complete...")
-        await task.future
+        try:
+            await task.future
+        except TaskDroppedException as e:
+            self.logger.info(f"...{description or 'queued'} task was dropped: {e}")
+            return None
+        except Exception as e:
+            self.logger.error(f"...{description or 'queued'} task failed: {e}")
+            return None
         if description:
             self.logger.info(f"...{description} task completed.")
 
+    def _drop_task(self, task, exception: TaskDroppedException):
+        """Resolves a task that won't be (fully) handled and counts it."""
+        self.dropped_task_counts[type(exception).__name__] += 1
+        self.logger.warning(f"...Dropping task (type: {task.task_type}, thread: {task.thread_name}): {exception}")
+        if not task.future.done():
+            task.future.set_exception(exception)
+            # Mark the exception as retrieved so fire-and-forget tasks don't log 'exception was never retrieved'
+            task.future.exception()
+
+    def _shed_task(self, task, policy: str, exception: TaskShedException):
+        """Drops a task to keep a full queue bounded and records it as a shed metric."""
+        self.shed_task_counts[task.thread_name][policy] += 1
+        self.logger.warning(
+            f"metric=task_shed thread={task.thread_name} policy={policy} type={task.task_type} "
+            f"priority={TaskPriority.names.get(task.priority)} total={self.shed_task_counts[task.thread_name][policy]}"
+            )
+        self._drop_task(task, exception)
+
+    def _remove_oldest(self, queue: PriorityTaskQueue, predicate: Callable):
+        """Removes and returns the oldest waiting task matching predicate, or None."""
+        oldest_task = next((queued_task for queued_task in queue._queue if predicate(queued_task)), None)
+        if oldest_task is not None:
+            queue.remove_where(lambda queued_task: queued_task is oldest_task)
+        return oldest_task
+
+    def _make_room(self, queue: PriorityTaskQueue, task):
+        """
+        Frees a slot in a full queue for task. Lower priority tasks are shed first; after that
+        the task's overflow policy decides. Returns task if it was rejected instead, else None.
+        """
+        if not queue.full():
+            return None
+
+        # Shed the oldest task of the lowest priority class below the new task's, if any
+        lowest_queued_priority = max(queued_task.priority for queued_task in queue._queue)
+        if lowest_queued_priority > task.priority:
+            shed_task = self._remove_oldest(queue, lambda queued_task: queued_task.priority == lowest_queued_priority)
+            self._shed_task(shed_task, 'lower_priority', TaskShedException("queue full, shed for a higher priority task"))
+            return None
+
+        if task.overflow_policy == TaskOverflowPolicy.DROP_OLDEST:
+            shed_task = self._remove_oldest(queue, lambda queued_task: queued_task.overflow_policy == TaskOverflowPolicy.DROP_OLDEST)
+        elif task.overflow_policy == TaskOverflowPolicy.COALESCE:
+            shed_task = self._remove_oldest(
+                queue,
+                lambda queued_task: queued_task.task_type == task.task_type and queued_task.priority == task.priority
+                )
+        else:
+            shed_task = None
+
+        if shed_task is not None:
+            self._shed_task(shed_task, task.overflow_policy, TaskShedException(f"queue full, shed by policy '{task.overflow_policy}'"))
+            return None
+
+        # Nothing could be shed, so turn the new task away
+        self._shed_task(task, TaskOverflowPolicy.REJECT, TaskRejectedException(f"queue for thread '{task.thread_name}' is full ({queue.maxsize} tasks)"))
+        return task
+
+    def _is_expired(self, task, now=None) -> bool:
+        return task.deadline is not None and (now or time.monotonic()) > task.deadline
+
+    def _ensure_worker(self, thread_name):
+        """Starts the worker for a thread_name if it isn't already running."""
+        worker = self.task_workers.get(thread_name)
+        if worker is None or worker.done():
+            self.task_workers[thread_name] = asyncio.get_running_loop().create_task(
+                self._task_worker(thread_name, self.task_queues[thread_name])
+                )
+            self.logger.debug(f"...started task worker for thread '{thread_name}'")
+
     async def add_task_to_queue(self, thread_name, task):
         """Adds a task to the queue with logging."""
         self.logger.debug(f"Task to add to queue: {task.task_dict}")
+        rejected_task = None
         async with self.task_queue_lock:
-            await self.task_queues[thread_name].put(task)
-            self.logger.debug(f"Queue size for thread '{thread_name}': {self.task_queues[thread_name].qsize()}")
+            self._ensure_worker(thread_name)
+            queue = self.task_queues[thread_name]
+
+            # Set the deadline
+            task.enqueued_at = time.monotonic()
+            ttl_seconds = task.ttl_seconds or self.task_ttl_seconds.get(task.priority)
+            if task.expires and ttl_seconds:
+                task.deadline = task.enqueued_at + ttl_seconds
+
+            # A newer task replaces any older pending task with the same supersede_key
+            if task.supersede_key is not None:
+                superseded_tasks = queue.remove_where(lambda queued_task: queued_task.supersede_key == task.supersede_key)
+                for superseded_task in superseded_tasks:
+                    self._drop_task(superseded_task, TaskSupersededException(f"superseded by a newer '{task.supersede_key}' task"))
+
+            rejected_task = self._make_room(queue, task)
+            if rejected_task is None:
+                queue.put_nowait(task)
+                self.logger.debug(f"Queue size for thread '{thread_name}': {self.task_queues[thread_name].qsize()}")
+
+        # Outside the lock, so the callback can't hold up (or re-enter) other enqueues
+        if rejected_task is not None and self.on_task_rejected:
+            try:
+                await self.on_task_rejected(rejected_task)
+            except Exception as e:
+                self.logger.error(f"...Error in on_task_rejected: {e}")
 
     async def add_task_to_queue_and_execute(self, thread_name, task, description=""):
         """Adds a task to the queue and waits for its completion."""
         await self.add_task_to_queue(thread_name, task)
         await self._wait_for_task_completion(task, description)
 
-    async def task_scheduler(self, sleep_time=3):
+    async def _task_worker(self, thread_name, queue: asyncio.Queue):
         """
-        Continuously checks task queues and processes tasks in a FIFO order.
-        Marks tasks as done after processing to keep the queue state consistent.
+        Waits on a single lane's queue and dispatches each task as soon as it is enqueued.
+        The next task in a lane is not taken until the current one is done, while other
+        lanes keep running. An idle lane just sits in queue.get() and costs nothing.
         """
-        iteration_count = 0
-
         while True:
-            iteration_count += 1
-
-            # Only log the queue status every 3rd iteration
-            if iteration_count % 3 == 0:
-                self.logger.info("Checking task queues...")
-
-                async with self.task_queue_lock:
-                    task_queues_snapshot = list(self.task_queues.items())
-
-                self.logger.info("...Task Queue Status:")
-                for thread_name, queue in task_queues_snapshot:
-                    self.logger.info(
-                        f"...Thread: {thread_name}, "
-                        f"Queue Size: {queue.qsize()}, "
-                        f"Pending Tasks: {queue._unfinished_tasks}"
-                    )
-            else:
-                # Still grab a snapshot so we can process tasks, just no logs
-                async with self.task_queue_lock:
-                    task_queues_snapshot = list(self.task_queues.items())
-
-            task_processed = False
-
-            # Process any tasks
-            for thread_name, queue in task_queues_snapshot:
-                if not queue.empty():
+            task = await queue.get()
+            try:
+                self.logger.info(
+                    f"...Task found in queue '{thread_name}' "
+                    f"(type: {task.task_type}, priority: {TaskPriority.names.get(task.priority)}, "
+                    f"waited: {time.monotonic() - task.enqueued_at:.2f}s)..."
+                )
+                if self._is_expired(task):
+                    self._drop_task(task, TaskExpiredException(f"deadline passed after {time.monotonic() - task.enqueued_at:.1f}s in queue"))
+                    continue
+
+                async with self.concurrency_semaphore:
+
+                    # Checked again after getting a slot, as waiting for one can take a while
+                    if self._is_expired(task):
+                        self._drop_task(task, TaskExpiredException(f"deadline passed after {time.monotonic() - task.enqueued_at:.1f}s in queue"))
+                        continue
+
+                    self.lane_in_flight[thread_name] += 1
+                    self.lane_in_flight_since[thread_name] = time.monotonic()
+                    handler = asyncio.ensure_future(self._process_task(task))
+                    self.lane_current_task[thread_name] = (task, handler)
                     try:
-                        task = await queue.get()
-                        # You could also log discovery of tasks every time
-                        self.logger.info(
-                            f"...Task found in queue '{thread_name}' "
-                            f"(type: {task.task_dict.get('type')})..."
-                        )
-
-                        await self._process_task(task)
-                        task_processed = True
-
-                    except Exception as e:
-                        self.logger.error(
-                            f"...Error processing task (type: {task.task_dict.get('type')}): {e}",
-                            exc_info=True
-                        )
+                        await handler
+                    except asyncio.CancelledError:
+                        # Only swallow cancellations requested through cancel_tasks(), not the worker's own
+                        if not task.cancel_requested:
+                            handler.cancel()
+                            raise
+                        self._drop_task(task, TaskCancelledException("cancelled while running"))
                     finally:
-                        queue.task_done()
+                        self.lane_current_task.pop(thread_name, None)
+                        self.lane_in_flight[thread_name] -= 1
+                        self.lane_in_flight_since.pop(thread_name, None)
 
-            if not task_processed:
-                # Optional: log something only every 3rd iteration, or always
-                if iteration_count % 3 == 0:
-                    self.logger.info("...No tasks found in queues. Waiting for new tasks...")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(
+                    f"...Error processing task (type: {task.task_type}): {e}",
+                    exc_info=True
+                )
+            finally:
+                queue.task_done()
+
+    async def cancel_tasks(self, thread_name: str, supersede_key: str = None, include_in_flight: bool = True) -> int:
+        """
+        Cancels the pending tasks of a lane (all of them, or only those with supersede_key) and,
+        if include_in_flight, the task that lane is currently running. Cancelling a running task
+        cancels its handler, which in turn cancels any active OpenAI run it is waiting on.
+
+        Returns:
+            int: The number of tasks cancelled.
+        """
+        def matches(task):
+            return supersede_key is None or task.supersede_key == supersede_key
+
+        async with self.task_queue_lock:
+            cancelled_tasks = self.task_queues[thread_name].remove_where(matches)
+        for task in cancelled_tasks:
+            self._drop_task(task, TaskCancelledException(f"cancelled before it ran (thread: {thread_name})"))
+
+        current_task, handler = self.lane_current_task.get(thread_name, (None, None))
+        if include_in_flight and current_task is not None and matches(current_task) and not handler.done():
+            current_task.cancel_requested = True
+            handler.cancel()
+            cancelled_tasks.append(current_task)
+
+        self.logger.info(f"Cancelled {len(cancelled_tasks)} task(s) for thread '{thread_name}' (supersede_key: {supersede_key})")
+        return len(cancelled_tasks)
+
+    def get_lane_stats(self) -> Dict[str, dict]:
+        """
+        Returns per-lane stats keyed by thread_name:
+            in_flight: number of tasks currently being handled
+            backlog: number of tasks waiting in the queue
+            backlog_by_priority: number of waiting tasks per priority class
+            oldest_task_age: seconds the oldest waiting task has been queued (0 if none)
+            in_flight_seconds: seconds the current task has been running (0 if none)
+            shed: number of tasks shed from the lane so far, per overflow policy
+        """
+        now = time.monotonic()
+        lane_stats = {}
+        for thread_name, queue in list(self.task_queues.items()):
+            waiting_tasks = list(queue._queue)
+            oldest_enqueued_at = min((task.enqueued_at for task in waiting_tasks if task.enqueued_at), default=None)
+            in_flight_since = self.lane_in_flight_since.get(thread_name)
+            lane_stats[thread_name] = {
+                'in_flight': self.lane_in_flight[thread_name],
+                'backlog': len(waiting_tasks),
+                'backlog_by_priority': {
+                    name: sum(1 for task in waiting_tasks if task.priority == priority)
+                    for priority, name in TaskPriority.names.items()
+                },
+                'oldest_task_age': round(now - oldest_enqueued_at, 3) if oldest_enqueued_at else 0,
+                'in_flight_seconds': round(now - in_flight_since, 3) if in_flight_since else 0,
+                'shed': dict(self.shed_task_counts.get(thread_name, {}))
+            }
+        return lane_stats
+
+    async def task_scheduler(self, status_interval=9):
+        """
+        Reports the lane status periodically. Dispatching itself is event driven and
+        happens in the per-lane workers started by add_task_to_queue().
+        """
+        while True:
+            await asyncio.sleep(status_interval)
+
+            lane_stats = self.get_lane_stats()
+            if not any(stats['in_flight'] or stats['backlog'] for stats in lane_stats.values()):
+                self.logger.debug("...No tasks found in queues. Waiting for new tasks...")
+                continue
+
+            self.logger.info(f"...Task Queue Status (max concurrent tasks: {self.max_concurrent_tasks}, dropped: {dict(self.dropped_task_counts)}):")
+            for thread_name, stats in lane_stats.items():
+                self.logger.info(
+                    f"...Thread: {thread_name}, "
+                    f"In Flight: {stats['in_flight']} ({stats['in_flight_seconds']}s), "
+                    f"Backlog: {stats['backlog']} {stats['backlog_by_priority']}, "
+                    f"Oldest Task Age: {stats['oldest_task_age']}s, "
+                    f"Shed: {stats['shed']}"
+                )
 
-            await asyncio.sleep(sleep_time)
-            
     async def _process_task(self, task: object):
         """
         Process the task before executing. This method includes logging, validation,
         and any other pre-processing steps needed before the task is handled.
         """
-        self.logger.info(f"...processing task type '{task.task_dict.get('type')}' with thread_name: '{task.task_dict.get('thread_name')}'")
+        self.logger.info(f"...processing task type '{task.task_type}' with thread_name: '{task.thread_name}'")
         self.logger.debug(f"...Task details: {task.task_dict}")
 
         # Basic validation to ensure necessary fields are present
-        if not task.task_dict.get('type') or not task.task_dict.get('thread_name'):
+        if not task.task_type or not task.thread_name:
             self.logger.error("...Task missing required fields. Task will be skipped.")
             self.logger.error(f"...Invalid task: {task.task_dict}")
             raise ValueError("...Task missing required fields. Task will be skipped.")
 
         # Check if the on_task_ready callback is set (probably handle_tasks()) and invoke it to handle the task execution
         if self.on_task_ready:
-            self.logger.debug(f"...Invoking task handler for task associated with thread name, execution: {task.task_dict.get('thread_name')}, {task.task_dict.get('type')}")
+            self.logger.debug(f"...Invoking task handler for task associated with thread name, execution: {task.thread_name}, {task.task_type}")
             await self.on_task_ready(task)
         else:
             self.logger.error("...No task handler has been set. Unable to execute task.")
@@ -127,4 +379,3 @@ class TaskManager:
 if __name__ == '__main__':
     task_manager = TaskManager()
     print("loaded TaskManager.py")
-
@@ -7,7 +7,7 @@ import inspect
 import time
 import numpy as np
 
-from models.task import AddMessageTask, CreateExecuteThreadTask, CreateSendChannelMessageTask
+from models.task import AddMessageTask, CreateExecuteThreadTask, CreateSendChannelMessageTask, TaskPriority
 
 from my_modules.my_logging import create_logger
 from my_modules import utils
@@ -26,6 +26,9 @@ from services.BotEarsService import BotEars
 from services.SpeechToTextService import SpeechToTextService
 from services.ExplanationService import ExplanationService
 from services.FaissService import FAISSService
+from services.DegradedModeService import DegradedModeService
+from services.ResponseCacheService import ResponseCacheService
+from services.ConversationIntentService import ConversationIntentService
 
 runtime_logger_level = 'INFO'
 
@@ -42,6 +45,7 @@ class Bot(twitch_commands.Bot):
             gpt_assistant_mgr,
             gpt_response_mgr,
             gpt_function_call_mgr,
+            gpt_fast_path_mgr,
             message_handler,
             twitch_auth
             ):
@@ -73,7 +77,33 @@ class Bot(twitch_commands.Bot):
         self.message_handler = message_handler
 
         # Initialize the FAISSService
-        self.faiss_service = FAISSService()
+        self.faiss_service = FAISSService(
+            embedding_store_dirpath=self.config.embedding_store_dirpath,
+            snapshot_dirpath=self.config.faiss_session_index_snapshot_dirpath,
+            checkpoint_interval_seconds=self.config.faiss_session_index_checkpoint_interval_seconds,
+            max_messages=self.config.faiss_session_index_initial_load_limit
+            )
+
+        # Semantic cache of replies to repeat questions (shares the FAISSService embedding model)
+        self.response_cache_service = None
+        if self.config.response_cache_enabled:
+            self.response_cache_service = ResponseCacheService(
+                transformer_model=self.faiss_service.transformer_model,
+                similarity_threshold=self.config.response_cache_similarity_threshold,
+                ttl_seconds=self.config.response_cache_ttl_seconds,
+                max_entries=self.config.response_cache_max_entries,
+                excluded_assistants=self.config.response_cache_excluded_assistants
+                )
+
+        # Local 'respond' vs 'fact' decision for randomfact (also shares the FAISSService embedding model)
+        self.conversation_intent_service = None
+        if self.config.conversation_intent_enabled:
+            self.conversation_intent_service = ConversationIntentService(
+                transformer_model=self.faiss_service.transformer_model,
+                bot_names=[self.config.twitch_bot_username, self.config.twitch_bot_display_name, 'chatzilla'],
+                window_seconds=self.config.conversation_intent_window_seconds,
+                max_messages=self.config.conversation_intent_max_messages
+                )
 
         # Initialize the GPTAssistantManager Classes
         self.gpt_assistant_manager = gpt_assistant_mgr
@@ -81,6 +111,16 @@ class Bot(twitch_commands.Bot):
         # Initialize the TaskManager
         self.task_manager = self.message_handler.task_manager
         self.task_manager.on_task_ready = self.handle_tasks
+        self.task_manager.on_task_rejected = self._on_task_rejected
+        self.busy_reply_cooldown_seconds = 15
+        self.last_busy_reply_at = 0
+
+        # Task type -> handler, used by handle_tasks()
+        self.task_handlers = {
+            AddMessageTask.task_type: self._handle_add_message_task,
+            CreateExecuteThreadTask.task_type: self._handle_execute_thread_task,
+            CreateSendChannelMessageTask.task_type: self._handle_send_channel_message_task,
+        }
         self.loop.create_task(self.task_manager.task_scheduler())
 
         # Create thread manager, Assigning handle_tasks to the on_task_ready event
@@ -92,6 +132,9 @@ class Bot(twitch_commands.Bot):
         # Create function call manager
         self.gpt_function_call_manager = gpt_function_call_mgr
 
+        # Create fast path manager (one-shot chat completions for opted-in assistants)
+        self.gpt_fast_path_manager = gpt_fast_path_mgr
+
         # TODO1: Could be a good idea to inject these dependencies into the services
         # instantiate the ChatForMeService
         self.chatforme_service = ChatForMeService(
@@ -125,6 +168,18 @@ class Bot(twitch_commands.Bot):
             message_handler=self.message_handler
             )
 
+        # Instantiate the degraded mode service (switches to a cheaper profile while the task queues fall behind)
+        self.degraded_mode_service = DegradedModeService(
+            config=self.config,
+            task_manager=self.task_manager,
+            enter_backlog=self.config.degraded_mode_enter_backlog,
+            enter_oldest_task_age_seconds=self.config.degraded_mode_enter_oldest_task_age_seconds,
+            exit_backlog=self.config.degraded_mode_exit_backlog,
+            exit_oldest_task_age_seconds=self.config.degraded_mode_exit_oldest_task_age_seconds,
+            exit_hold_seconds=self.config.degraded_mode_exit_hold_seconds,
+            check_interval_seconds=self.config.degraded_mode_check_interval_seconds
+            )
+
         #Taken from app authentication class() 
         # TODO9: Reudndant with twitchAPI? Maybe used for refreshing access token?
         self.twitch_auth = twitch_auth
@@ -166,7 +221,7 @@ class Bot(twitch_commands.Bot):
                 aliases=("m_stopexplain", 'stopexplanation'))(self.explanation_service.stop_explanation)
                 )
 
-    async def _add_message_to_specified_thread(self, message_content: str, role: str, thread_name: str) -> None:
+    async def _add_message_to_specified_thread(self, message_content: str, role: str, thread_name: str, raise_errors: bool = False) -> None:
         if thread_name in self.config.gpt_thread_names:
             try:
                 message_object = await self.gpt_response_manager.add_message_to_thread(
@@ -177,134 +232,200 @@ class Bot(twitch_commands.Bot):
                 self.logger.debug(f"Message object: {message_object}")
             except Exception as e:
                 self.logger.error(f"Error occurred in 'add_message_to_thread': {e}", exc_info=True)
+                if raise_errors:
+                    raise
         else:
             self.logger.error(f"Thread name '{thread_name}' is not in the list of thread names. Message content: {message_content[0:25]+'...'}")
 
+    def _fail_task(self, task, message: str) -> None:
+        """Logs a task failure and sets it on the task's future (marked as retrieved for fire-and-forget tasks)."""
+        self.logger.error(message)
+        if not task.future.done():
+            task.future.set_exception(RuntimeError(message))
+            task.future.exception()
+
+    async def _on_task_rejected(self, task: object) -> None:
+        """
+        Tells chat the bot is busy when a command is turned away by a full queue (at most once per cooldown).
+        """
+        if task.priority >= TaskPriority.BACKGROUND:
+            return
+        now = time.monotonic()
+        if now - self.last_busy_reply_at < self.busy_reply_cooldown_seconds:
+            return
+        self.last_busy_reply_at = now
+        await self._send_channel_message_wrapper("I'm a bit swamped right now, try again in a minute!")
+
     async def handle_tasks(self, task: object):
-        
+        """
+        Handles a task from the TaskManager by dispatching it to the handler registered for its type.
+        """
+        handler = self.task_handlers.get(task.task_type)
+        if handler is None:
+            self._fail_task(task, f"Unknown task type '{task.task_type}' found, this should not happen")
+            return
+
+        self.logger.info(f"Handling task type '{task.task_type}' for thread: {task.thread_name}")
+        await handler(task)
+
+    async def _flush_pending_thread_messages(self, thread_name: str) -> None:
+        """
+        Writes the chat messages buffered by the MessageHandler for a thread as one message.
+        Called from within the thread's task (not queued), as a queued task would only run after it.
+        If the write fails, the messages go back in the buffer for the next flush.
+        """
+        consolidated_content = self.message_handler.dump_message_queue_into_thread_history(thread_name)
+        if consolidated_content is None:
+            return
         try:
-            task_type = task.task_dict.get("type")
-            thread_name = task.task_dict.get("thread_name")
-            message_role = task.task_dict.get("message_role")
-            self.logger.info(f"Handling task type '{task_type}' for thread: {thread_name}")
+            await self._add_message_to_specified_thread(
+                message_content=consolidated_content,
+                role='user',
+                thread_name=thread_name,
+                raise_errors=True
+                )
+        except Exception:
+            self.message_handler.restore_pending_thread_messages(thread_name, consolidated_content)
 
-        except Exception as e:
-            self.logger.info(f"Error occurred in 'handle_tasks': {e}")
+    async def _handle_add_message_task(self, task: AddMessageTask):
+        # Add the message to the 'chatformemsgs' thread if not already handled by the GPT assistant
+        # Note: Used for buffered chat messages and when a command needs to be sent to the thread
+        try:
+            # Any older buffered chat goes first to keep the thread in order
+            await self._flush_pending_thread_messages(task.thread_name)
+            # Raises, so a failed write fails the task (buffered chat is then put back in the buffer)
+            await self._add_message_to_specified_thread(
+                message_content=task.content,
+                role=task.message_role,
+                thread_name=task.thread_name,
+                raise_errors=True
+                )
+            task.future.set_result(f"...'{task.task_type}' Completed")
+            self.logger.info(f"...'{task.task_type}' task handled for thread: {task.thread_name}")
 
-        if task_type == "add_message":
-            # Add the message to the 'chatformemsgs' thread if not already handled by the GPT assistant
-            # Note: Only situation where this is used is when a command needs to be sent to the thread
-            content = task.task_dict.get("content")
+        except Exception as e:
+            self.logger.error(f"...Error occurred in '_add_message_to_specified_thread': {e}", exc_info=True)
+            self._fail_task(task, f"...Error occurred in '{task.task_type}': {e}")
 
-            try:
-                await self._add_message_to_specified_thread(
-                    message_content=content, 
-                    role=message_role,
-                    thread_name=thread_name
-                    )
-                task.future.set_result(f"...'{task_type}' Completed")
-                self.logger.info(f"...'{task_type}' task handled for thread: {thread_name}")
+    async def _execute_fast_path_thread_task(self, task: CreateExecuteThreadTask) -> str:
+        """
+        Gets the reply with a single chat completions call instead of a thread run.
+        Returns None if the fast path failed, so the caller falls back to the thread.
+        """
+        try:
+            gpt_response = await self.gpt_fast_path_manager.execute_fast_path(
+                assistant_name=task.assistant_name,
+                thread_instructions=task.thread_instructions,
+                replacements_dict=task.replacements_dict,
+                context_messages=self.message_handler.all_msg_history_gptdict
+            )
+        except Exception as e:
+            self.logger.warning(f"...Fast path failed for '{task.assistant_name}', falling back to the thread: {e}")
+            return None
 
-            except Exception as e: 
-                self.logger.error(f"...Error occurred in '_add_message_to_specified_thread': {e}", exc_info=True)
-                task.future.set_exception(e)
+        # The reply didn't go through the thread, so buffer it there for later runs' context
+        await self.message_handler.add_bot_message_to_thread_history(task.thread_name, gpt_response)
+        return gpt_response
 
-        elif task_type == "execute_thread":
+    async def _handle_execute_thread_task(self, task: CreateExecuteThreadTask):
 
-            # # NOTE: if we decide to bulk add (to reduce api calls and speedup the app), 
-            # #  this is where we should dump message queue into thread history
-            # await self.message_handler.dump_message_queue_into_thread_history(
-            #     thread_name=thread_name
-            #     message_history=message_history
-            #     )
- 
-            assistant_name = task.task_dict.get("assistant_name")
-            thread_instructions = task.task_dict.get("thread_instructions")
-            replacements_dict = task.task_dict.get("replacements_dict")
-            tts_voice = task.task_dict.get("tts_voice")
-            bool_send_channel_message = task.task_dict.get("send_channel_message")          
-            
-            # Execute the thread
+        # Answer repeat questions from the response cache
+        cache_embedding = None
+        cache_context_key = None
+        if task.cache_query and self.response_cache_service and self.response_cache_service.is_enabled_for(task.assistant_name):
             try:
-                gpt_response = await self.gpt_response_manager.execute_thread( 
-                    thread_name=thread_name, 
-                    assistant_name=assistant_name, 
-                    thread_instructions=thread_instructions,
-                    replacements_dict=replacements_dict
+                cache_context_key = self.response_cache_service.get_context_key(task.replacements_dict, task.cache_query)
+                cache_embedding = await self.response_cache_service.embed(task.cache_query)
+                gpt_response = self.response_cache_service.get(task.assistant_name, cache_embedding, cache_context_key)
+                if gpt_response is not None:
+                    # Keep the thread aware of what was asked and what the bot said, in order
+                    if task.requester_name:
+                        await self.message_handler.add_request_to_thread_history(task.thread_name, task.requester_name, task.cache_query)
+                    await self.message_handler.add_bot_message_to_thread_history(task.thread_name, gpt_response)
+                    await self._send_execute_thread_task_response(task, gpt_response)
+                    return
+            except Exception as e:
+                self.logger.warning(f"...Response cache lookup failed, running the assistant: {e}")
+                cache_embedding = None
+
+        # Execute the thread
+        try:
+            gpt_response = None
+            if self.gpt_fast_path_manager.is_enabled_for(task.assistant_name):
+                gpt_response = await self._execute_fast_path_thread_task(task)
+
+            if gpt_response is None:
+                # Bring the thread up to date with buffered chat (one API call instead of one per message)
+                await self._flush_pending_thread_messages(task.thread_name)
+
+                gpt_response = await self.gpt_response_manager.execute_thread(
+                    thread_name=task.thread_name,
+                    assistant_name=task.assistant_name,
+                    thread_instructions=task.thread_instructions,
+                    replacements_dict=task.replacements_dict
                 )
-                self.logger.info(f"...GPT Response successfully generated for thread: {thread_name}")
-                self.logger.debug(f"...GPT response: {gpt_response}")
+            self.logger.info(f"...GPT Response successfully generated for thread: {task.thread_name}")
+            self.logger.debug(f"...GPT response: {gpt_response}")
 
-            except Exception as e:
-                gpt_response = None
-                message = f"...Error occurred in '{task_type}': {e}"
-                task.future.set_exception(message)
-                self.logger.error(message)
+        except Exception as e:
+            self._fail_task(task, f"...Error occurred in '{task.task_type}': {e}")
+            return
 
-            # Send the GPT response to the channel
-            if gpt_response is not None and bool_send_channel_message is True:
-                try:
-                    # Send the GPT response to the channel
-                    await self.chatforme_service.send_output_message_and_voice(
-                        text=gpt_response,
-                        incl_voice=self.config.tts_include_voice,
-                        voice_name=tts_voice
-                    )
-                    message = f"...'{task_type}' task handled for thread: {thread_name}. Send channel message is True"
-                    task.future.set_result(message)
-                    self.logger.info(message) 
+        if gpt_response is None:
+            self._fail_task(task, f"...Gpt response is None, this should not happen.  Task: {task.task_dict}")
+            return
 
-                except Exception as e:
-                    message = f"...Error occurred in 'send_output_message_and_voice': {e}"
-                    self.logger.error(message)
-                    task.future.set_exception(message)
+        if cache_embedding is not None:
+            self.response_cache_service.put(task.assistant_name, cache_embedding, gpt_response, cache_context_key)
 
-            if gpt_response is None:
-                message = f"...Gpt response is None, this should not happen.  Task: {task.task_dict}"
-                self.logger.error(message)
-                task.future.set_exception(message)
-            
-            if bool_send_channel_message is False:
-                message = f"...'{task_type}' task handled for thread: {thread_name}. Send channel message is False"
-                task.future.set_result(message)
-                self.logger.info(message)
-            
-        elif task_type == "send_channel_message":
-            content = task.task_dict.get("content")
-            tts_voice = task.task_dict.get("tts_voice")
+        await self._send_execute_thread_task_response(task, gpt_response)
 
-            try:
-                # Add the message to the 'chatformemsgs' thread if not already handled by the GPT assistant
-                await self._add_message_to_specified_thread(
-                    message_content=content, 
-                    role=message_role, 
-                    thread_name=thread_name
-                    )
+    async def _send_execute_thread_task_response(self, task: CreateExecuteThreadTask, gpt_response: str):
+        if task.send_channel_message is False:
+            message = f"...'{task.task_type}' task handled for thread: {task.thread_name}. Send channel message is False"
+            task.future.set_result(message)
+            self.logger.info(message)
+            return
 
-            except Exception as e:
-                message = f"...Error occurred in 'add_message_to_thread': {e}"
-                self.logger.error(message)
-                task.future.set_exception(message)
+        # Send the GPT response to the channel
+        try:
+            await self.chatforme_service.send_output_message_and_voice(
+                text=gpt_response,
+                incl_voice=self.config.tts_include_voice,
+                voice_name=task.tts_voice
+            )
+            message = f"...'{task.task_type}' task handled for thread: {task.thread_name}. Send channel message is True"
+            task.future.set_result(message)
+            self.logger.info(message)
 
-            try:
-                await self.chatforme_service.send_output_message_and_voice(
-                    text=content,
-                    incl_voice=self.config.tts_include_voice,
-                    voice_name=tts_voice
+        except Exception as e:
+            self._fail_task(task, f"...Error occurred in 'send_output_message_and_voice': {e}")
+
+    async def _handle_send_channel_message_task(self, task: CreateSendChannelMessageTask):
+        try:
+            # Add the message to the 'chatformemsgs' thread if not already handled by the GPT assistant
+            await self._add_message_to_specified_thread(
+                message_content=task.content,
+                role=task.message_role,
+                thread_name=task.thread_name
                 )
-                message = f"...'{task_type}' task handled for thread: {thread_name}"
-                task.future.set_result(message)
-                self.logger.info(message)
 
-            except Exception as e:
-                message = f"...Error occurred in 'send_channel_message': {e}"
-                self.logger.error(message)
-                task.future.set_exception(message)
-        
-        else:
-            message = f"Unknown task type 'task_type' found, this should not happen"
-            self.logger.info(message)  
-            self.future.set_exception(message)
+        except Exception as e:
+            # The message is still sent to the channel
+            self.logger.error(f"...Error occurred in 'add_message_to_thread': {e}")
+
+        try:
+            await self.chatforme_service.send_output_message_and_voice(
+                text=task.content,
+                incl_voice=self.config.tts_include_voice,
+                voice_name=task.tts_voice
+            )
+            message = f"...'{task.task_type}' task handled for thread: {task.thread_name}"
+            task.future.set_result(message)
+            self.logger.info(message)
+
+        except Exception as e:
+            self._fail_task(task, f"...Error occurred in 'send_channel_message': {e}")
 
     async def event_ready(self):
         self.channel = self.get_channel(self.config.twitch_bot_channel_name)
@@ -338,32 +459,43 @@ class Bot(twitch_commands.Bot):
         # start explanation loop
         self.logger.debug('Starting the explanation service')
         self.loop.create_task(self.explanation_service.explanation_task())
+
+        # start degraded mode loop
+        if self.config.degraded_mode_enabled:
+            self.logger.debug('Starting the degraded mode service')
+            self.loop.create_task(self.degraded_mode_service.degraded_mode_task())
  
         # Create Assistants and Threads
-        self.assistants = self.gpt_assistant_manager.create_assistants(
+        self.assistants = await self.gpt_assistant_manager.create_assistants(
             assistants_config=self.config.gpt_assistants_config
             )
-        self.assistants_with_functions = self.gpt_assistant_manager.create_assistants_with_functions(
+        self.assistants_with_functions = await self.gpt_assistant_manager.create_assistants_with_functions(
             assistants_with_functions=self.config.gpt_assistants_with_functions_config
             )
-        self.threads = self.gpt_thread_mgr.create_threads(
+        self.threads = await self.gpt_thread_mgr.create_threads(
             thread_names=self.config.gpt_thread_names
             )
         
         if self.config.twitch_bot_faiss_general_index_service is True:
             # start newusers service, get general index and load initial messages
+            # (from the saved snapshot, so only messages newer than its watermark are fetched and encoded)
+            start_time_snapshot_load = time.time()
+            self.faiss_service.load_session_snapshot()
             start_time_bq_query = time.time() 
             historic_bq_msgs = self.bq_uploader.fetch_user_chat_history_from_bq(
                 user_login=None,
                 interactions_table_id=self.config.talkzillaai_usertransactions_table_id,
                 users_table_id=self.config.bq_fullqual_table_id,
-                limit=30000
+                limit=self.config.faiss_session_index_initial_load_limit,
+                since_timestamp=self.faiss_service.session_watermark
             ) or []
             end_time_bq_query = time.time()
             self.faiss_service.load_initial_msgs_to_session_index(messages=historic_bq_msgs)        
             end_time_inital_msg_load = time.time()
-            self.logger.info(f"Session index preloaded in {end_time_inital_msg_load-end_time_bq_query} seconds (BigQuery msg query took {end_time_bq_query-start_time_bq_query} seconds) with {len(historic_bq_msgs)} messages.")
+            self.logger.info(f"Session index preloaded in {end_time_inital_msg_load-end_time_bq_query} seconds (snapshot load took {start_time_bq_query-start_time_snapshot_load} seconds, BigQuery msg query took {end_time_bq_query-start_time_bq_query} seconds) with {len(historic_bq_msgs)} messages.")
             self.logger.info(f"FAISS index size: {self.faiss_service.session_index.ntotal}")
+            await self.faiss_service.save_session_snapshot()
+            self.loop.create_task(self.faiss_service.session_checkpoint_task())
         else:
             self.logger.debug(f"General index service is disabled.")
 
@@ -533,6 +665,9 @@ class Bot(twitch_commands.Bot):
 
         while True:
             await adjustable_sleep_task.adjustable_sleep_task(self.config, 'newusers_sleep_time')
+            if self.config.degraded_mode_active:
+                self.logger.info("Degraded mode is active, skipping new users check")
+                continue
             self.logger.debug("Checking for new users...")
 
             # Get the current users in the channel
@@ -677,7 +812,8 @@ class Bot(twitch_commands.Bot):
                     assistant_name=assistant_name,
                     thread_instructions=prompt,
                     replacements_dict=replacements_dict,
-                    tts_voice=tts_voice_selected
+                    tts_voice=tts_voice_selected,
+                    priority=TaskPriority.BACKGROUND
                 )
 
                 await self.task_manager.add_task_to_queue_and_execute(thread_name, task, description="ExecuteThreadTask 'new/returning users service'")
@@ -773,7 +909,8 @@ class Bot(twitch_commands.Bot):
             assistant_name=assistant_name,
             thread_instructions=gpt_prompt_text,
             replacements_dict=replacements_dict,
-            tts_voice=tts_voice
+            tts_voice=tts_voice,
+            priority=TaskPriority.MODERATOR
         )
         await self.task_manager.add_task_to_queue_and_execute(thread_name, task, description="ExecuteThreadTask 'what'")
 
@@ -837,7 +974,7 @@ class Bot(twitch_commands.Bot):
     async def github(self, ctx):
         await self._send_channel_message_wrapper("This is the github/repo if you like what you see: https://github.com/hitch-co/chatzilla_ai")
 
-    async def _chatforme_main(self, text_input_from_user=None):
+    async def _chatforme_main(self, text_input_from_user=None, requester_name=None):
         assistant_name = 'chatforme'
         thread_name = 'chatformemsgs'
         tts_voice = self.config.tts_voice_chatforme
@@ -864,7 +1001,10 @@ class Bot(twitch_commands.Bot):
             assistant_name=assistant_name,
             thread_instructions=chatforme_prompt,
             replacements_dict=replacements_dict,
-            tts_voice=tts_voice
+            tts_voice=tts_voice,
+            priority=TaskPriority.INTERACTIVE,
+            cache_query=text_input_from_user if text_input_from_user != 'none' else None,
+            requester_name=requester_name
         )
         self.logger.debug(f"Task to add to queue: {task.task_dict}")
 
@@ -880,7 +1020,8 @@ class Bot(twitch_commands.Bot):
         else:
             text_input_from_user = ' '.join(args)
 
-        self.loop.create_task(self._chatforme_main(text_input_from_user))
+        requester_name = getattr(getattr(ctx, 'author', None), 'name', None)
+        self.loop.create_task(self._chatforme_main(text_input_from_user, requester_name))
 
     @twitch_commands.command(name='last_message', aliases=("m_last_message",))
     async def last_message(self, ctx, *args):
@@ -1152,7 +1293,9 @@ class Bot(twitch_commands.Bot):
                 thread_instructions=gpt_prompt_text,
                 replacements_dict=replacements_dict,
                 tts_voice=self.current_story_voice,
-                send_channel_message=True
+                send_channel_message=True,
+                priority=TaskPriority.INTERACTIVE,
+                supersede_key='ouat_step'
                 )
             await self.task_manager.add_task_to_queue_and_execute(thread_name, task, description="ExecuteThreadTask 'startstory'")
             self.is_ouat_loop_active = True
@@ -1225,7 +1368,9 @@ class Bot(twitch_commands.Bot):
                     assistant_name=assistant_name,
                     thread_instructions=gpt_prompt_final,
                     replacements_dict=replacements_dict,
-                    tts_voice=self.current_story_voice
+                    tts_voice=self.current_story_voice,
+                    priority=TaskPriority.BACKGROUND,
+                    supersede_key='ouat_step'
                 )
                 await self.task_manager.add_task_to_queue_and_execute(thread_name, task, description="ExecuteThreadTask 'ouat_storyteller'")
 
@@ -1270,13 +1415,17 @@ class Bot(twitch_commands.Bot):
         thread_name='ouatmsgs'
         if self.ouat_counter >= 1:
             self.logger.info(f"Story is being forced to end by {ctx.message.author.name} ({ctx.message.author.id}), counter is at {self.ouat_counter}")
-        
+
+            # Drop queued story steps and cancel the one being generated (and its run) so nothing lands after the ending
+            await self.task_manager.cancel_tasks(thread_name)
+
             content = "to be continued..."
             try:
                 task = CreateSendChannelMessageTask(
                     thread_name=thread_name,
                     content=content,
                     tts_voice=self.current_story_voice,
+                    priority=TaskPriority.MODERATOR
                 )
                 await self.task_manager.add_task_to_queue_and_execute(thread_name, task, description="SendChannelMessageTask 'stop_story'")
             
@@ -1296,7 +1445,7 @@ class Bot(twitch_commands.Bot):
         self.ouat_counter = 0
         self.logger.info(f"OUAT loop has been stopped, self.ouat_counter has been reset to {self.ouat_counter}")
 
-    async def _factcheck_main(self, text_input_from_user=None):
+    async def _factcheck_main(self, text_input_from_user=None, requester_name=None):
 
         assistant_name = 'factchecker'
         thread_name = 'chatformemsgs'
@@ -1325,7 +1474,10 @@ class Bot(twitch_commands.Bot):
                 assistant_name=assistant_name,
                 thread_instructions=chatforme_factcheck_prompt,
                 replacements_dict=replacements_dict,
-                tts_voice=tts_voice
+                tts_voice=tts_voice,
+                priority=TaskPriority.INTERACTIVE,
+                cache_query=text_input_from_user if text_input_from_user != 'none' else None,
+                requester_name=requester_name
             )
             await self.task_manager.add_task_to_queue_and_execute(thread_name, task, description="ExecuteThreadTask 'factcheck'")
 
@@ -1338,14 +1490,15 @@ class Bot(twitch_commands.Bot):
             text_input_from_user = ' '.join(args)
         else:
             text_input_from_user = 'none'
-        self.loop.create_task(self._factcheck_main(text_input_from_user))
+        self.loop.create_task(self._factcheck_main(text_input_from_user, ctx.author.name))
 
     @twitch_commands.command(name='update_arch', aliases=("p_update_arch",))
     async def update_arch(self, ctx, *args):
         self.config.gpt_bot_archetype_prompt = self.config.gpt_bot_archetypes[np.random.choice(list(self.config.gpt_bot_archetypes.keys()))]
 
-        self.assistants = self.gpt_assistant_manager.create_assistants(
-            assistants_config=self.config.gpt_assistants_config
+        self.assistants = await self.gpt_assistant_manager.update_assistants_with_placeholder(
+            assistants_config=self.config.gpt_assistants_config,
+            placeholder='bot_archetype'
             )
 
     @twitch_commands.command(name='update_config', aliases=("m_update_config",))
@@ -1422,10 +1575,51 @@ class Bot(twitch_commands.Bot):
             formatted_messages.append(f"Role: {role}, Content: {content}")
         return "\n".join(formatted_messages)
             
-    async def randomfact_task(self):
+    async def _get_conversation_director_response_type(self, thread_name: str) -> str:
+        """
+        Decides whether randomfact_task should 'respond' to the chat or share a 'fact'. The local classifier
+        decides when it's confident enough, otherwise (or when it's disabled) the conversationdirector
+        function call does.
+        """
+        if self.conversation_intent_service:
+            try:
+                intent = await self.conversation_intent_service.classify(self.message_handler.get_recent_chat_messages())
+                if intent['confidence'] >= self.config.conversation_intent_min_confidence or not self.config.conversation_intent_fallback_to_function_call:
+                    return intent['response_type']
+                self.logger.info(f"Conversation intent not confident enough ({intent['confidence']:.2f}), asking the conversation director")
+            except Exception as e:
+                self.logger.warning(f"Error classifying conversation intent, asking the conversation director: {e}")
+
         conversation_director_function_schema = self.config.function_schemas['conversationdirector']
+        try:
+            if self.gpt_fast_path_manager.is_enabled_for('conversationdirector'):
+                response_data = await self.gpt_fast_path_manager.execute_fast_path_function_call(
+                    assistant_name='conversationdirector',
+                    function_schema=conversation_director_function_schema,
+                    context_messages=self.message_handler.all_msg_history_gptdict
+                    )
+            else:
+                response_data, response = await self.gpt_function_call_manager.execute_function_call(
+                    thread_name=thread_name, 
+                    assistant_name='conversationdirector',
+                    function_schema=conversation_director_function_schema
+                    )
+            self.logger.info(f"Conversation Director function response data: {response_data}")               
+            if 'response_type' in response_data:
+                return response_data['response_type']
+            self.logger.warning("No 'response_type' attribute found in response_data. Defaulting to 'fact'")
+            return 'fact'
+
+        except Exception as e:
+            self.logger.warning(f"Error occurred in 'randomfact_task'. Defaulting to 'fact': {e}")
+            return 'fact'
+
+    async def randomfact_task(self):
         while True:
             await adjustable_sleep_task.adjustable_sleep_task(self.config, 'randomfact_sleeptime')
+            if self.config.degraded_mode_active:
+                self.logger.info("Degraded mode is active, skipping randomfact")
+                continue
 
             # Prompt set in os.env on .bat file run
             selected_prompt = self.config.randomfact_prompt
@@ -1443,27 +1637,15 @@ class Bot(twitch_commands.Bot):
             self.logger.debug(f"Selected random_character_a_to_z: {random_character_a_to_z}")
             self.logger.debug(f"Selected random voice: {tts_voice}")
 
-            # Execute the function call and handle exceptions gracefully
-            try:
-                response_data, response = await self.gpt_function_call_manager.execute_function_call(
-                    thread_name=thread_name, 
-                    assistant_name='conversationdirector',
-                    function_schema=conversation_director_function_schema
-                    )
-                self.logger.info(f"Conversation Director function response data: {response_data}")               
-                if 'response_type' in response_data:
-                    response_type_result = response_data['response_type']
-                else:
-                    self.logger.warning("No 'response_type' attribute found in response_data. Defaulting to 'fact'")
-                    response_type_result = 'fact'
-
-            except Exception as e:
-                self.logger.warning(f"Error occurred in 'randomfact_task'. Defaulting to 'fact': {e}")
-                response_type_result = 'fact'
+            # Decide between responding to the chat and sharing a fact
+            response_type_result = await self._get_conversation_director_response_type(thread_name)
 
             # Set the prompt based on the response type
             if response_type_result == 'respond':
                 selected_prompt = self.config.randomfact_response
+            elif self.gpt_fast_path_manager.is_enabled_for(assistant_name):
+                # The fast path doesn't read the thread, the prompt alone asks for a fact
+                selected_prompt = self.config.randomfact_prompt
             else:
                 selected_prompt = self.config.randomfact_prompt
                 task = AddMessageTask(
@@ -1495,6 +1677,7 @@ class Bot(twitch_commands.Bot):
                 assistant_name=assistant_name,
                 thread_instructions=selected_prompt,
                 replacements_dict=replacements_dict,
-                tts_voice=tts_voice
+                tts_voice=tts_voice,
+                priority=TaskPriority.BACKGROUND
             )
             await self.task_manager.add_task_to_queue_and_execute(thread_name, task, description="ExecuteThreadTask 'randomfact_task'")
\ No newline at end of file
@@ -37,6 +37,7 @@ class TwitchBotManager:
             gpt_assistant_mgr=self.dependencies.gpt_assistant_mgr,
             gpt_response_mgr=self.dependencies.gpt_response_mgr,
             gpt_function_call_mgr=self.dependencies.gpt_function_call_mgr,
+            gpt_fast_path_mgr=self.dependencies.gpt_fast_path_mgr,
             message_handler=self.dependencies.message_handler,
             twitch_auth=twitch_auth
         ).run()
\ No newline at end of file
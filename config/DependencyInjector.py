@@ -1,12 +1,19 @@
 # dependency_injector.py
 from google.cloud import bigquery
+import httpx
 import openai
 
 from classes.MessageHandlerClass import MessageHandler
 from classes.BQUploaderClass import BQUploader
 from services.GPTTextToSpeechService import GPTTextToSpeech
 from classes.GPTAssistantManagerClass import GPTBaseClass, GPTThreadManager, GPTResponseManager, GPTAssistantManager
-from classes.GPTAssistantManagerClass import GPTFunctionCallManager
+from classes.GPTAssistantManagerClass import GPTFunctionCallManager, GPTFastPathManager
+from classes.GPTRunWatcherClass import GPTRunWatcher
+from classes.GPTRunArbiterClass import GPTRunArbiter
+from classes.GPTCallGovernorClass import GPTCallGovernor
+from classes.GPTBackendRouterClass import GPTBackendRouter
+from classes.GPTRegistryClass import GPTRegistry
+from classes.GPTThreadContextManagerClass import GPTThreadContextManager
 from classes.TaskManagerClass import TaskManager
 
 class DependencyInjector:
@@ -14,9 +21,43 @@ class DependencyInjector:
         self.config = config
         self.create_dependencies()
 
+    def create_http_client(self):
+        # One pooled keep-alive transport, shared by the GPT managers and TTS (through gpt_client)
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=self.config.openai_http_max_connections,
+                max_keepalive_connections=self.config.openai_http_max_keepalive_connections,
+                keepalive_expiry=self.config.openai_http_keepalive_expiry_seconds
+                )
+            )
+        # Rate limit buckets, retries with backoff and the circuit breaker, for every GPT and TTS call
+        if self.config.openai_governor_enabled:
+            transport = GPTCallGovernor(
+                transport=transport,
+                requests_per_minute=self.config.openai_governor_requests_per_minute,
+                tokens_per_minute=self.config.openai_governor_tokens_per_minute,
+                max_attempts=self.config.openai_governor_max_attempts,
+                backoff_base_seconds=self.config.openai_governor_backoff_base_seconds,
+                backoff_max_seconds=self.config.openai_governor_backoff_max_seconds,
+                retry_budget_ratio=self.config.openai_governor_retry_budget_ratio,
+                retry_budget_max=self.config.openai_governor_retry_budget_max,
+                circuit_failure_threshold=self.config.openai_governor_circuit_failure_threshold,
+                circuit_open_seconds=self.config.openai_governor_circuit_open_seconds
+                )
+        http_client = httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(self.config.openai_http_timeout_seconds, connect=10.0)
+            )
+        return http_client
+
     def create_gpt_client(self):
-        gpt_client = openai.OpenAI(
-            api_key=self.config.openai_api_key
+        # Non-blocking client, every GPT/TTS call is awaited on the bot's event loop
+        gpt_client = openai.AsyncOpenAI(
+            api_key=self.config.openai_api_key,
+            base_url=self.config.openai_base_url,
+            http_client=self.http_client,
+            # The governor retries (with its budget), the client mustn't retry on top of it
+            max_retries=0 if self.config.openai_governor_enabled else openai.DEFAULT_MAX_RETRIES
             )
         return gpt_client
 
@@ -34,27 +75,112 @@ class DependencyInjector:
         return tts_client
 
     def create_task_manager(self):
-        task_manager = TaskManager()
+        task_manager = TaskManager(
+            max_concurrent_tasks=self.config.task_manager_max_concurrent_tasks,
+            priority_aging_seconds=self.config.task_manager_priority_aging_seconds,
+            task_ttl_seconds=self.config.task_manager_task_ttl_seconds,
+            max_queue_size=self.config.task_manager_max_queue_size
+            )
         return task_manager
     
+    def create_gpt_registry(self):
+        if not self.config.gpt_registry_enabled:
+            return None
+        gpt_registry = GPTRegistry(
+            registry_file_path=self.config.gpt_registry_file_path
+        )
+        return gpt_registry
+
     def create_gpt_thread_mgr(self):
         gpt_thread_mgr = GPTThreadManager(
-            gpt_client=self.gpt_client
+            gpt_client=self.gpt_client,
+            registry=self.gpt_registry,
+            reuse_threads=self.config.gpt_registry_reuse_threads
         )
         return gpt_thread_mgr
 
     def create_gpt_assistant_mgr(self):
         gpt_assistant_mgr = GPTAssistantManager(
-            gpt_client=self.gpt_client
+            gpt_client=self.gpt_client,
+            registry=self.gpt_registry
         )
         return gpt_assistant_mgr    
     
+    def create_run_watcher(self):
+        # One polling loop for every active run, shared by the response and function call managers
+        run_watcher = GPTRunWatcher(
+            gpt_client=self.gpt_client,
+            max_waittime_for_gpt_response=self.config.magic_max_waittime_for_gpt_response,
+            initial_poll_seconds=self.config.openai_run_watcher_initial_poll_seconds,
+            max_poll_seconds=self.config.openai_run_watcher_max_poll_seconds,
+            backoff_factor=self.config.openai_run_watcher_backoff_factor
+        )
+        return run_watcher
+
+    def create_run_arbiter(self):
+        # One active run per thread, shared by the response and function call managers
+        run_arbiter = GPTRunArbiter()
+        return run_arbiter
+
+    def create_gpt_thread_context_mgr(self, gpt_thread_manager):
+        if not self.config.thread_context_enabled:
+            return None
+        gpt_thread_context_mgr = GPTThreadContextManager(
+            gpt_client=self.gpt_client,
+            gpt_thread_manager=gpt_thread_manager,
+            token_budget=self.config.thread_context_token_budget,
+            seed_last_n_messages=self.config.thread_context_seed_last_n_messages,
+            summary_max_tokens=self.config.thread_context_summary_max_tokens,
+            summary_chunk_tokens=self.config.thread_context_summary_chunk_tokens,
+            summary_model=self.config.thread_context_summary_model,
+            delete_grace_seconds=self.config.thread_context_delete_grace_seconds
+        )
+        return gpt_thread_context_mgr
+
+    def create_gpt_backend_router(self):
+        if not self.config.openai_backend_router_enabled or not self.config.openai_backend_router_secondary_backends:
+            return None
+        # Secondaries get their own pool, outside the governor: they're what's used when OpenAI is struggling
+        secondary_http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.config.openai_http_max_connections,
+                max_keepalive_connections=self.config.openai_http_max_keepalive_connections,
+                keepalive_expiry=self.config.openai_http_keepalive_expiry_seconds
+                ),
+            timeout=httpx.Timeout(self.config.openai_http_timeout_seconds, connect=10.0)
+            )
+        secondary_backends = [
+            {
+                'name': backend['name'],
+                # No retries, a failed hedge just leaves the primary to answer
+                'client': openai.AsyncOpenAI(api_key=backend['api_key'], base_url=backend['base_url'], http_client=secondary_http_client, max_retries=0),
+                'model': backend['model']
+            }
+            for backend in self.config.openai_backend_router_secondary_backends
+        ]
+        gpt_backend_router = GPTBackendRouter(
+            secondary_backends=secondary_backends,
+            hedge_percentile=self.config.openai_backend_router_hedge_percentile,
+            initial_hedge_seconds=self.config.openai_backend_router_initial_hedge_seconds,
+            min_hedge_seconds=self.config.openai_backend_router_min_hedge_seconds,
+            max_hedge_seconds=self.config.openai_backend_router_max_hedge_seconds,
+            min_samples=self.config.openai_backend_router_min_samples,
+            context_message_limit=self.config.openai_backend_router_context_message_limit,
+            response_max_completion_tokens=self.config.assistant_response_max_completion_tokens
+        )
+        return gpt_backend_router
+
     def create_gpt_response_mgr(self, gpt_thread_manager, gpt_assistant_manager):
         gpt_response_mgr = GPTResponseManager(
             gpt_client=self.gpt_client,
             gpt_thread_manager=gpt_thread_manager,
             gpt_assistant_manager=gpt_assistant_manager,
-            max_waittime_for_gpt_response=self.config.magic_max_waittime_for_gpt_response
+            run_watcher=self.run_watcher,
+            run_arbiter=self.run_arbiter,
+            max_waittime_for_gpt_response=self.config.magic_max_waittime_for_gpt_response,
+            response_max_completion_tokens=self.config.assistant_response_max_completion_tokens,
+            context_manager=self.gpt_thread_context_mgr,
+            backend_router=self.gpt_backend_router
         )
         return gpt_response_mgr
     
@@ -63,27 +189,48 @@ class DependencyInjector:
             gpt_client=self.gpt_client,
             gpt_thread_manager=gpt_thread_manager,
             gpt_response_manager=gpt_response_manager,
-            gpt_assistant_manager=gpt_assistant_manager
+            gpt_assistant_manager=gpt_assistant_manager,
+            run_watcher=self.run_watcher,
+            run_arbiter=self.run_arbiter
         )
         return gpt_function_call_mgr
 
+    def create_gpt_fast_path_mgr(self, gpt_assistant_manager):
+        gpt_fast_path_mgr = GPTFastPathManager(
+            gpt_client=self.gpt_client,
+            gpt_assistant_manager=gpt_assistant_manager,
+            fast_path_assistants=self.config.gpt_fast_path_assistants,
+            context_message_limit=self.config.gpt_fast_path_context_message_limit,
+            response_max_completion_tokens=self.config.assistant_response_max_completion_tokens
+        )
+        return gpt_fast_path_mgr
+
     def create_message_handler(self, task_manager):
         message_handler = MessageHandler(
             task_manager=task_manager,
-            msg_history_limit=self.config.msg_history_limit
+            msg_history_limit=self.config.msg_history_limit,
+            thread_message_buffer_max_messages=self.config.thread_message_buffer_max_messages,
+            thread_message_buffer_max_age_seconds=self.config.thread_message_buffer_max_age_seconds
         )
         return message_handler
     
     def create_dependencies(self):
+        self.http_client = self.create_http_client()
         self.gpt_client = self.create_gpt_client()
         self.bq_client = self.create_bq_client()
         self.bq_uploader = self.create_bq_uploader(bq_client=self.bq_client)
         self.tts_client = self.create_tts_client()
         self.task_manager = self.create_task_manager()
+        self.gpt_registry = self.create_gpt_registry()
         self.gpt_thread_mgr = self.create_gpt_thread_mgr()
         self.gpt_assistant_mgr = self.create_gpt_assistant_mgr()
+        self.run_watcher = self.create_run_watcher()
+        self.run_arbiter = self.create_run_arbiter()
+        self.gpt_thread_context_mgr = self.create_gpt_thread_context_mgr(gpt_thread_manager=self.gpt_thread_mgr)
+        self.gpt_backend_router = self.create_gpt_backend_router()
         self.gpt_response_mgr = self.create_gpt_response_mgr(gpt_thread_manager=self.gpt_thread_mgr, gpt_assistant_manager = self.gpt_assistant_mgr)
         self.message_handler = self.create_message_handler(task_manager=self.task_manager)
+        self.gpt_fast_path_mgr = self.create_gpt_fast_path_mgr(gpt_assistant_manager=self.gpt_assistant_mgr)
         self.gpt_function_call_mgr = self.create_gpt_function_call_mgr(gpt_thread_manager=self.gpt_thread_mgr, gpt_response_manager=self.gpt_response_mgr, gpt_assistant_manager=self.gpt_assistant_mgr)
 
 def main(yaml_filepath):
@@ -2,110 +2,201 @@ import asyncio
 from my_modules.my_logging import create_logger
 
 runtime_logger_level = 'INFO'
+
+# One logger shared by every task. Tasks are created for every chat message, so their
+# constructors must stay free of I/O (create_logger() reopens the log file each call).
+logger = create_logger(
+    dirname='log',
+    logger_name='TaskLogger',
+    debug_level=runtime_logger_level,
+    mode='w',
+    stream_logs=True,
+    encoding='UTF-8'
+    )
+
+class TaskPriority:
+    """Priority classes for queued tasks. Lower values are served first."""
+    INTERACTIVE = 0 # viewer commands and mentions waiting on a reply
+    MODERATOR = 1   # moderator commands and sessions they start
+    BACKGROUND = 2  # recurring/filler output (random facts, shoutouts, story/explanation loops)
+
+    names = {INTERACTIVE: 'interactive', MODERATOR: 'moderator', BACKGROUND: 'background'}
+
+class TaskOverflowPolicy:
+    """What the TaskManager does with a new task when its queue is full."""
+    DROP_OLDEST = 'drop_oldest' # shed the oldest queued task with this policy to make room (chat context)
+    REJECT = 'reject'           # turn the new task away (commands, the requester gets a 'busy' reply)
+    COALESCE = 'coalesce'       # the new task replaces the oldest queued task of the same type (background)
+
 class BaseTask:
-    def __init__(self, thread_name: str):
+    """
+    Base record for queued tasks. Subclasses declare their own __slots__ and a
+    task_type, which TwitchBot.handle_tasks() uses to look up the task's handler.
+    """
+    __slots__ = (
+        'thread_name',
+        'priority',
+        'ttl_seconds',
+        'supersede_key',
+        'future',
+        'enqueued_at',
+        'deadline',
+        'cancel_requested',
+        'overflow_policy'
+        )
+
+    task_type = None
+
+    # Whether the TaskManager's default time-to-live applies to this type of task
+    expires = True
+
+    def __init__(
+            self,
+            thread_name: str,
+            priority: int = TaskPriority.BACKGROUND,
+            ttl_seconds: float = None,
+            supersede_key: str = None,
+            overflow_policy: str = None
+            ):
         self.thread_name = thread_name
+        self.priority = priority
+        self.ttl_seconds = ttl_seconds # None uses the TaskManager default for the priority
+        self.supersede_key = supersede_key # a newer queued task with the same key replaces this one
         self.future = asyncio.Future()
 
-        self.logger = create_logger(
-            dirname='log', 
-            logger_name='TaskLogger', 
-            debug_level=runtime_logger_level,
-            mode='w',
-            stream_logs=True,
-            encoding='UTF-8'
-            )
+        # Background tasks are interchangeable, anything else was asked for by someone
+        if overflow_policy is None:
+            overflow_policy = TaskOverflowPolicy.COALESCE if priority >= TaskPriority.BACKGROUND else TaskOverflowPolicy.REJECT
+        self.overflow_policy = overflow_policy
+
+        # Set by the TaskManager
+        self.enqueued_at = None
+        self.deadline = None
+        self.cancel_requested = False
+
+    @property
+    def task_dict(self) -> dict:
+        """The task as a dict, built on demand (for logging)."""
+        return self.to_dict()
 
     def to_dict(self):
         # Ensure the thread_name is always included in the dictionary
         return {
-            "thread_name": self.thread_name
+            "type": self.task_type,
+            "thread_name": self.thread_name,
+            "priority": self.priority,
+            "supersede_key": self.supersede_key
         }
 
 class AddMessageTask(BaseTask):
+    __slots__ = ('content', 'message_role')
+
+    task_type = "add_message"
+
+    # Dropping thread context would leave a gap in the thread, so it never expires
+    expires = False
+
     def __init__(
-            self, 
-            thread_name: str, 
-            content: str, 
-            message_role: str = 'user'
+            self,
+            thread_name: str,
+            content: str,
+            message_role: str = 'user',
+            priority: int = TaskPriority.INTERACTIVE
             ):
-        super().__init__(thread_name)
+        # Thread context is cheap to add and should land before any queued run reads the thread.
+        # Under load the oldest context is shed first.
+        super().__init__(thread_name, priority, overflow_policy=TaskOverflowPolicy.DROP_OLDEST)
         self.content = content
         self.message_role = message_role
 
-        # Create task_dict during initialization
-        self.task_dict = self.to_dict()
-
     def to_dict(self) -> dict:
         task_dict = super().to_dict()
         task_dict.update({
-            "type": "add_message",
             "content": self.content,
             "message_role": self.message_role
         })
-        self.logger.debug(f"AddMessageTask Dict created: {task_dict}")
         return task_dict
 
 class CreateExecuteThreadTask(BaseTask):
+    __slots__ = (
+        'assistant_name',
+        'thread_instructions',
+        'replacements_dict',
+        'tts_voice',
+        'send_channel_message',
+        'message_role',
+        'cache_query',
+        'requester_name'
+        )
+
+    task_type = "execute_thread"
+
     def __init__(
-            self, 
+            self,
             thread_name: str,
             assistant_name: str,
             thread_instructions: str,
             replacements_dict: dict,
             tts_voice: str,
             send_channel_message: bool = True,
-            message_role: str = 'assistant'
+            message_role: str = 'assistant',
+            priority: int = TaskPriority.BACKGROUND,
+            ttl_seconds: float = None,
+            supersede_key: str = None,
+            cache_query: str = None,
+            requester_name: str = None
             ):
-        super().__init__(thread_name)
+        super().__init__(thread_name, priority, ttl_seconds, supersede_key)
         self.assistant_name = assistant_name
         self.thread_instructions = thread_instructions
         self.replacements_dict = replacements_dict
         self.tts_voice = tts_voice
         self.send_channel_message = send_channel_message
         self.message_role = message_role
-
-        # Create task_dict during initialization
-        self.task_dict = self.to_dict()
+        # The user's request, used as the response cache key (None: the reply isn't cached)
+        self.cache_query = cache_query
+        # Who sent the request, if it's a command (commands aren't buffered into the thread, so a cached
+        # reply writes the request there first). None when the request is already in the thread (mentions).
+        self.requester_name = requester_name
 
     def to_dict(self) -> dict:
         task_dict = super().to_dict()
         task_dict.update({
-            "type": "execute_thread",
             "assistant_name": self.assistant_name,
             "thread_instructions": self.thread_instructions,
             "replacements_dict": self.replacements_dict,
             "tts_voice": self.tts_voice,
             "send_channel_message": self.send_channel_message,
-            "message_role": self.message_role
+            "message_role": self.message_role,
+            "cache_query": self.cache_query,
+            "requester_name": self.requester_name
         })
-        self.logger.debug(f"CreateExecuteThreadTask Dict created: {task_dict}")
         return task_dict
-    
-class CreateSendChannelMessageTask(BaseTask): 
+
+class CreateSendChannelMessageTask(BaseTask):
+    __slots__ = ('content', 'tts_voice', 'message_role')
+
+    task_type = "send_channel_message"
+
     def __init__(
-            self, 
+            self,
             thread_name: str,
-            content: str, 
-            tts_voice: str, 
-            message_role: str = 'assistant'
+            content: str,
+            tts_voice: str,
+            message_role: str = 'assistant',
+            priority: int = TaskPriority.MODERATOR,
+            ttl_seconds: float = None
             ):
-        super().__init__(thread_name)
+        super().__init__(thread_name, priority, ttl_seconds)
         self.content = content
         self.tts_voice = tts_voice
         self.message_role = message_role
 
-        # Create task_dict during initialization
-        self.task_dict = self.to_dict()
-
     def to_dict(self) -> dict:
-        task_dict = super().to_dict()  
+        task_dict = super().to_dict()
         task_dict.update({
-            "type": "send_channel_message",
-            "thread_name": self.thread_name,
             "content": self.content,
             "tts_voice": self.tts_voice,
             "message_role": self.message_role
         })
-        self.logger.debug(f"CreateSendChannelMessageTask Dict created: {task_dict}")
-        return task_dict
\ No newline at end of file
+        return task_dict
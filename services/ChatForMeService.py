@@ -1,3 +1,5 @@
+import asyncio
+
 from my_modules.my_logging import create_logger
 from my_modules import utils
 
@@ -30,6 +32,9 @@ class ChatForMeService:
         # tts client
         self.tts_client = tts_client
 
+        # Lanes run concurrently, so only one message is spoken at a time
+        self.voice_lock = asyncio.Lock()
+
     async def send_output_message_and_voice(
             self,
             text,
@@ -46,11 +51,15 @@ class ChatForMeService:
         - incl_voice (str): Specifies whether to include voice output (True or False).
         - voice_name (str): The name of the voice to be used in the text-to-speech service.
         """
+        # No TTS while the bot is catching up (even if tts_include_voice was switched back on meanwhile)
+        if self.config.degraded_mode_active:
+            incl_voice = False
+
         datetime_string = utils.get_datetime_formats()['filename_format']
         if incl_voice == True:
             # Generate speech object and generate speech object/mp3
             output_filename = "chatforme_"+"_"+datetime_string+"_"+self.tts_client.tts_file_name
-            self.tts_client.workflow_t2s(
+            await self.tts_client.workflow_t2s(
                 text_input=text,
                 voice_name=voice_name,
                 output_dirpath=self.tts_client.tts_data_folder,
@@ -61,10 +70,11 @@ class ChatForMeService:
         await self.send_channel_message(text)
 
         if incl_voice == True:
-            self.tts_client.play_local_mp3(
-                dirpath=self.tts_client.tts_data_folder, 
-                filename=output_filename
-                )
+            async with self.voice_lock:
+                await self.tts_client.play_local_mp3(
+                    dirpath=self.tts_client.tts_data_folder, 
+                    filename=output_filename
+                    )
             
 if __name__ == "__main__":
     yaml_filepath = r'C:\_repos\chatzilla_ai\config\config.yaml'
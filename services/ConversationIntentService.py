@@ -0,0 +1,152 @@
+import asyncio
+import math
+import time
+
+import numpy as np
+
+from my_modules.my_logging import create_logger
+
+runtime_logger_level = 'INFO'
+
+class ConversationIntentService:
+    """
+    Local version of the conversationdirector function call: decides whether randomfact_task should
+    'respond' to the chat or share a 'fact', from the recent chat kept by MessageHandler.
+
+    Follows the director's own rules: respond if a user addresses the bot, asks a question or replies
+    to the bot's last message; share a fact if nobody is chatting. Otherwise the recent messages are
+    embedded (with the FAISSService model) and compared to example 'respond' and 'fact' messages, and
+    the similarity margin is combined with the chat volume and number of chatters into a respond
+    probability. classify() returns the decision with a confidence, so the caller can fall back to the
+    function call when it's unsure.
+    """
+    respond_examples = [
+        "what do you think about this?",
+        "does anyone know how this works",
+        "wait what just happened",
+        "I disagree, that was the wrong call",
+        "who is winning right now",
+        "that was hilarious, did you see that",
+        "any tips for this part of the game?",
+        "I've been playing this for years and it's still great",
+    ]
+    fact_examples = [
+        "lol",
+        "gg",
+        "brb",
+        "hi",
+        "PogChamp",
+        "LUL LUL",
+        "o7",
+        "nice",
+    ]
+
+    # Respond probability = sigmoid(bias + similarity margin + chat volume + chatters)
+    bias = -0.5
+    similarity_margin_weight = 8.0
+    message_volume_weight = 0.4
+    chatter_weight = 0.3
+
+    def __init__(
+            self,
+            transformer_model,
+            bot_names: list,
+            window_seconds=180,
+            max_messages=10
+            ):
+        self.logger = create_logger(
+            dirname='log',
+            logger_name='logger_ConversationIntentService',
+            debug_level=runtime_logger_level,
+            mode='w',
+            stream_logs=True
+            )
+        self.transformer_model = transformer_model
+        self.bot_names = [bot_name.lower() for bot_name in bot_names if bot_name]
+        self.window_seconds = window_seconds
+        self.max_messages = max_messages
+
+        self.respond_example_embeddings = None
+        self.fact_example_embeddings = None
+
+    async def _embed(self, texts: list) -> np.ndarray:
+        """Embeds the texts off the event loop (the model runs on the CPU)."""
+        embeddings = await asyncio.to_thread(
+            self.transformer_model.encode,
+            texts,
+            convert_to_tensor=False,
+            normalize_embeddings=True
+            )
+        return np.asarray(embeddings, dtype='float32')
+
+    def _is_question(self, content: str) -> bool:
+        first_word = content.split(' ', 1)[0].lower() if content else ''
+        return content.rstrip().endswith('?') or first_word in ('who', 'what', 'why', 'how', 'when', 'where', 'which', 'does', 'is', 'are', 'can')
+
+    def _mentions_bot(self, content: str) -> bool:
+        content = content.lower()
+        return any(bot_name in content for bot_name in self.bot_names)
+
+    async def classify(self, recent_messages: list) -> dict:
+        """
+        Args:
+            recent_messages (list): MessageHandler.get_recent_chat_messages(), oldest first.
+
+        Returns:
+            dict: 'response_type' ('respond' or 'fact') and 'reasoning', like the function call's output,
+                plus 'confidence' (0.5 to 1).
+        """
+        start = time.perf_counter()
+        cutoff = time.monotonic() - self.window_seconds
+        window_messages = [message for message in recent_messages if message['at'] >= cutoff]
+        user_messages = [
+            message for message in window_messages
+            if message['role'] == 'user' and message['content'] and not message['content'].startswith('!')
+        ][-self.max_messages:]
+        bot_messages = [message for message in window_messages if message['role'] == 'assistant']
+
+        if not user_messages:
+            decision = self._decision('fact', 0.95, f"No chat messages in the last {self.window_seconds}s")
+        elif any(self._mentions_bot(message['content']) for message in user_messages):
+            decision = self._decision('respond', 0.95, "A user addressed the bot")
+        elif bot_messages and user_messages[-1]['at'] > bot_messages[-1]['at']:
+            decision = self._decision('respond', 0.8, "Users are chatting after the bot's last message")
+        elif any(self._is_question(message['content']) for message in user_messages):
+            decision = self._decision('respond', 0.75, "A user asked a question")
+        else:
+            decision = await self._classify_by_similarity(user_messages)
+
+        self.logger.info(
+            f"Conversation intent: {decision['response_type']} (confidence: {decision['confidence']:.2f}, "
+            f"{len(user_messages)} messages, {(time.perf_counter() - start) * 1000:.1f}ms): {decision['reasoning']}"
+            )
+        return decision
+
+    async def _classify_by_similarity(self, user_messages: list) -> dict:
+        if self.respond_example_embeddings is None:
+            self.respond_example_embeddings = await self._embed(self.respond_examples)
+            self.fact_example_embeddings = await self._embed(self.fact_examples)
+
+        message_embeddings = await self._embed([message['content'] for message in user_messages])
+        respond_similarity = float((message_embeddings @ self.respond_example_embeddings.T).max(axis=1).mean())
+        fact_similarity = float((message_embeddings @ self.fact_example_embeddings.T).max(axis=1).mean())
+        similarity_margin = respond_similarity - fact_similarity
+        chatters = len({message['name'] for message in user_messages})
+
+        logit = (
+            self.bias
+            + self.similarity_margin_weight * similarity_margin
+            + self.message_volume_weight * math.log1p(len(user_messages))
+            + self.chatter_weight * (chatters - 1)
+            )
+        respond_probability = 1 / (1 + math.exp(-logit))
+        response_type = 'respond' if respond_probability >= 0.5 else 'fact'
+        return self._decision(
+            response_type,
+            max(respond_probability, 1 - respond_probability),
+            f"Similarity margin {similarity_margin:+.2f}, {len(user_messages)} messages from {chatters} chatters"
+            )
+
+    @staticmethod
+    def _decision(response_type: str, confidence: float, reasoning: str) -> dict:
+        return {'response_type': response_type, 'reasoning': reasoning, 'confidence': confidence}
@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+from my_modules.my_logging import create_logger
+
+runtime_logger_level = 'INFO'
+class DegradedModeService:
+    """
+    Switches the bot to a cheaper profile while the TaskManager is falling behind, and back once it catches up.
+
+    Degraded mode is entered when the total backlog or the age of the oldest queued task reaches
+    the enter thresholds, and left once both have stayed at or below the exit thresholds for
+    exit_hold_seconds (hysteresis, so the bot doesn't flap between profiles). While degraded:
+        - TTS is skipped (config.tts_include_voice is False)
+        - every wordcount setting is shifted down one step (long -> medium, medium -> short, ...)
+        - config.degraded_mode_active is True, which pauses the randomfact, new users and explanation loops
+    The configured values of the swapped settings are kept in config.degraded_mode_saved_settings until
+    degraded mode is left.
+    """
+    def __init__(
+            self,
+            config,
+            task_manager,
+            enter_backlog=15,
+            enter_oldest_task_age_seconds=30,
+            exit_backlog=3,
+            exit_oldest_task_age_seconds=5,
+            exit_hold_seconds=30,
+            check_interval_seconds=5
+            ):
+        self.logger = create_logger(
+            dirname='log',
+            logger_name='logger_DegradedModeService',
+            debug_level=runtime_logger_level,
+            mode='w',
+            stream_logs=True
+            )
+        self.config = config
+        self.task_manager = task_manager
+
+        self.enter_backlog = enter_backlog
+        self.enter_oldest_task_age_seconds = enter_oldest_task_age_seconds
+        self.exit_backlog = exit_backlog
+        self.exit_oldest_task_age_seconds = exit_oldest_task_age_seconds
+        self.exit_hold_seconds = exit_hold_seconds
+        self.check_interval_seconds = check_interval_seconds
+
+        self.config.degraded_mode_active = False
+        self.config.degraded_mode_saved_settings = {}
+        self.calm_since = None
+
+    def _get_load(self) -> tuple:
+        """Returns the total backlog and the age of the oldest queued task across all lanes."""
+        lane_stats = self.task_manager.get_lane_stats()
+        backlog = sum(stats['backlog'] for stats in lane_stats.values())
+        oldest_task_age = max((stats['oldest_task_age'] for stats in lane_stats.values()), default=0)
+        return backlog, oldest_task_age
+
+    def enter_degraded_mode(self, backlog, oldest_task_age):
+        if self.config.degraded_mode_active:
+            return
+        saved_settings = {
+            'tts_include_voice': self.config.tts_include_voice,
+            'wordcount_short': self.config.wordcount_short,
+            'wordcount_medium': self.config.wordcount_medium,
+            'wordcount_long': self.config.wordcount_long,
+        }
+        self.config.tts_include_voice = False
+        self.config.wordcount_short = self.config.wordcount_veryshort
+        self.config.wordcount_medium = saved_settings['wordcount_short']
+        self.config.wordcount_long = saved_settings['wordcount_medium']
+        self.config.degraded_mode_saved_settings = saved_settings
+        self.config.degraded_mode_active = True
+        self.logger.warning(f"Entering degraded mode (backlog: {backlog}, oldest task age: {oldest_task_age}s)")
+
+    def exit_degraded_mode(self, backlog, oldest_task_age):
+        if not self.config.degraded_mode_active:
+            return
+        for attribute_name, value in self.config.degraded_mode_saved_settings.items():
+            setattr(self.config, attribute_name, value)
+        self.config.degraded_mode_saved_settings = {}
+        self.config.degraded_mode_active = False
+        self.logger.warning(f"Leaving degraded mode (backlog: {backlog}, oldest task age: {oldest_task_age}s)")
+
+    def check_load(self):
+        """Compares the current load with the thresholds and switches profile if needed."""
+        backlog, oldest_task_age = self._get_load()
+        self.logger.debug(f"Load check: backlog: {backlog}, oldest task age: {oldest_task_age}s, degraded: {self.config.degraded_mode_active}")
+
+        if not self.config.degraded_mode_active:
+            if backlog >= self.enter_backlog or oldest_task_age >= self.enter_oldest_task_age_seconds:
+                self.enter_degraded_mode(backlog, oldest_task_age)
+                self.calm_since = None
+            return
+
+        if backlog <= self.exit_backlog and oldest_task_age <= self.exit_oldest_task_age_seconds:
+            if self.calm_since is None:
+                self.calm_since = time.monotonic()
+            if time.monotonic() - self.calm_since >= self.exit_hold_seconds:
+                self.exit_degraded_mode(backlog, oldest_task_age)
+                self.calm_since = None
+        else:
+            self.calm_since = None
+
+    async def degraded_mode_task(self):
+        while True:
+            await asyncio.sleep(self.check_interval_seconds)
+            try:
+                self.check_load()
+            except Exception as e:
+                self.logger.error(f"Error occurred in 'degraded_mode_task': {e}")
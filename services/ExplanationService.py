@@ -5,7 +5,7 @@ from my_modules.my_logging import create_logger
 from classes.ConfigManagerClass import ConfigManager
 from classes.TaskManagerClass import TaskManager
 
-from models.task import CreateExecuteThreadTask
+from models.task import CreateExecuteThreadTask, TaskPriority
 
 runtime_logger_level = 'INFO'
 class ExplanationService:
@@ -103,7 +103,8 @@ class ExplanationService:
                 assistant_name=assistant_name,
                 thread_instructions=gpt_prompt_text,
                 replacements_dict=replacements_dict,
-                tts_voice=self.current_story_voice
+                tts_voice=self.current_story_voice,
+                priority=TaskPriority.INTERACTIVE
                 )
             self.logger.debug(f"...task to add to queue: {task.task_dict}")
             await self.task_manager.add_task_to_queue_and_execute(thread_name, task, description="ExecuteThreadTask 'explanation_start'")
@@ -113,7 +114,8 @@ class ExplanationService:
         
         #This is the while loop that generates the occurring GPT response
         while True:
-            if not self.is_explanation_loop_active:
+            # Paused (not stopped) while the bot is in degraded mode
+            if not self.is_explanation_loop_active or self.config.degraded_mode_active:
                 await asyncio.sleep(self.loop_sleep_time)
                 continue
 
@@ -154,7 +156,9 @@ class ExplanationService:
                     assistant_name=assistant_name,
                     thread_instructions=gpt_prompt_final,
                     replacements_dict=replacements_dict,
-                    tts_voice=tts_voice
+                    tts_voice=tts_voice,
+                    priority=TaskPriority.BACKGROUND,
+                    supersede_key='explanation_step'
                 )
                 await self.task_manager.add_task_to_queue_and_execute(thread_name, task, description="ExecuteThreadTask 'explanation_task'")
 
@@ -167,6 +171,7 @@ class ExplanationService:
     async def stop_explanation(self, ctx):
         # await self._send_channel_message_wrapper("That's it for now...")
         self.logger.info(f"Stopping the explanation at cycle {self.explanation_counter}.  Note that messages are not sent to twitch because of _send_channel_message_wrapper() being commented out.")
+        await self.task_manager.cancel_tasks(self.thread_name)
         await self.stop_explanation_loop()
 
     async def stop_explanation_loop(self) -> None:
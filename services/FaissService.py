@@ -1,12 +1,41 @@
+import asyncio
+import json
+import os
+
 import faiss
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from classes.EmbeddingStoreClass import EmbeddingStore
 from my_modules.my_logging import create_logger
 runtime_logger_level = 'INFO'
 
 class FAISSService:
-    def __init__(self, embedding_model='all-MiniLM-L6-v2', top_k=50):
+    """
+    Semantic search over chat messages with SentenceTransformer embeddings.
+
+    Message vectors come from the EmbeddingStore (by message_id), so a message is only encoded the first
+    time any index needs it. Queries and !forget phrases aren't messages and are encoded as they come.
+
+    The session index (every message seen this session, plus the preloaded BigQuery history) can be
+    snapshotted to snapshot_dirpath, so a restart only fetches and encodes the messages newer than it:
+        session_index.json:  {"count", "watermark", "message_ids"}, the index's messages in order
+    Its vectors are read back from the embedding store. 'watermark' is the newest BigQuery timestamp
+    loaded (to the second); messages at or after it are fetched again and skipped by message_id.
+    With max_messages, the index is rebuilt with only its newest max_messages messages at each checkpoint
+    (and only those are loaded from the snapshot), so it doesn't grow across restarts.
+    """
+    snapshot_metadata_filename = 'session_index.json'
+
+    def __init__(
+            self,
+            embedding_model='all-MiniLM-L6-v2',
+            top_k=50,
+            embedding_store_dirpath=None,
+            snapshot_dirpath=None,
+            checkpoint_interval_seconds=600,
+            max_messages=None
+            ):
 
         self.logger = create_logger(
             dirname='log',
@@ -23,29 +52,152 @@ class FAISSService:
         self.session_index = faiss.IndexFlatL2(self.embedding_dim)
         self.top_k = top_k
         self.session_msg_id_map = {}
+        self.session_msg_ids = set()
 
-    def load_initial_msgs_to_session_index(self, messages: list[dict]):
-        """ Loads a batch of messages into the general FAISS index. """
-        contents = [f"{msg['user_login']} ({msg['timestamp']}): {msg['content']}" for msg in messages]
-        ids = [msg['message_id'] for msg in messages]
-        
-        embeddings = self.transformer_model.encode(contents, convert_to_tensor=False)
-        embeddings_np = np.array(embeddings).astype('float32')
-        
+        # Every message's embedding, encoded once (None: kept in memory for the session)
+        self.embedding_store = EmbeddingStore(
+            transformer_model=self.transformer_model,
+            embedding_model=embedding_model,
+            store_dirpath=embedding_store_dirpath
+            )
+
+        # Session index snapshot (None: the index only lives in memory)
+        self.snapshot_dirpath = snapshot_dirpath
+        self.checkpoint_interval_seconds = checkpoint_interval_seconds
+        self.max_messages = max_messages
+        self.session_watermark = None
+        self.checkpointed_count = 0
+
+    def _add_to_session_index(self, message_ids: list, embeddings_np: np.ndarray):
         self.session_index.add(embeddings_np)
-        for i, message_id in enumerate(ids):
+        for message_id in message_ids:
             self.session_msg_id_map[len(self.session_msg_id_map)] = message_id
+            self.session_msg_ids.add(message_id)
+
+    def load_initial_msgs_to_session_index(self, messages: list[dict]):
+        """ Loads a batch of messages into the general FAISS index (messages already in it are skipped). """
+        new_messages = {}
+        for msg in messages:
+            if msg['message_id'] not in self.session_msg_ids:
+                new_messages.setdefault(msg['message_id'], msg)
+        timestamps = [str(msg['timestamp'])[:19] for msg in messages if msg.get('timestamp')]
+        if timestamps:
+            self.session_watermark = max([self.session_watermark or '', *timestamps])
+        if not new_messages:
+            return
+
+        # Oldest first, so the index stays in chronological order and trimming keeps the newest messages
+        new_messages = sorted(new_messages.values(), key=lambda msg: str(msg.get('timestamp') or ''))
+        ids = [msg['message_id'] for msg in new_messages]
+        contents = [msg['content'] for msg in new_messages]
+        encoded_before = self.embedding_store.encoded
+        embeddings_np = self.embedding_store.get_vectors(ids, contents)
+        self._add_to_session_index(ids, embeddings_np)
+        self.logger.info(f"Added {len(ids)} of {len(messages)} messages to the session index ({self.embedding_store.encoded - encoded_before} encoded, the rest from the embedding store)")
+
+    def load_session_snapshot(self) -> bool:
+        """
+        Loads the session index snapshot. Its vectors are read from the (memory-mapped) embedding
+        store, nothing is re-encoded.
+
+        Returns:
+            bool: True if a snapshot was loaded (session_watermark is then set).
+        """
+        if not self.snapshot_dirpath:
+            return False
+        metadata_file_path = os.path.join(self.snapshot_dirpath, self.snapshot_metadata_filename)
+        if not os.path.exists(metadata_file_path):
+            self.logger.info(f"No session index snapshot in {self.snapshot_dirpath}, starting empty")
+            return False
+        try:
+            with open(metadata_file_path, 'r', encoding='utf-8') as file:
+                metadata = json.load(file)
+            snapshot_message_ids = metadata['message_ids']
+            if self.max_messages:
+                snapshot_message_ids = snapshot_message_ids[-self.max_messages:]
+            message_ids, embeddings_np = self.embedding_store.lookup(snapshot_message_ids)
+            if len(message_ids) != len(snapshot_message_ids):
+                # e.g. the store was cleared for another embedding model, so the history has to be fetched again
+                self.logger.warning(f"{len(snapshot_message_ids) - len(message_ids)} of the session index snapshot's messages aren't in the embedding store, starting empty")
+                return False
+        except Exception as e:
+            # A bad snapshot only costs a slower startup, never a failed one
+            self.logger.error(f"Error loading session index snapshot from {self.snapshot_dirpath}, starting empty: {e}")
+            return False
+
+        self._add_to_session_index(message_ids, embeddings_np)
+        self.session_watermark = metadata.get('watermark')
+        # A trimmed snapshot is rewritten at the next checkpoint
+        self.checkpointed_count = len(message_ids) if len(message_ids) == len(metadata['message_ids']) else None
+        self.logger.info(f"Loaded session index snapshot: {len(message_ids)} of {len(metadata['message_ids'])} messages, watermark {self.session_watermark}")
+        return True
+
+    def _trim_session_index(self) -> int:
+        """
+        Rebuilds the session index with only its newest max_messages messages (vectors from the embedding store).
+
+        Returns:
+            int: The number of messages dropped.
+        """
+        count = self.session_index.ntotal
+        if not self.max_messages or count <= self.max_messages:
+            return 0
+        kept_message_ids = [self.session_msg_id_map[i] for i in range(count - self.max_messages, count)]
+        message_ids, embeddings_np = self.embedding_store.lookup(kept_message_ids)
+        self.session_index = faiss.IndexFlatL2(self.embedding_dim)
+        self.session_msg_id_map = {}
+        self.session_msg_ids = set()
+        self._add_to_session_index(message_ids, embeddings_np)
+        self.logger.info(f"Trimmed session index to its newest {len(message_ids)} messages ({count - len(message_ids)} dropped)")
+        return count - len(message_ids)
+
+    def _write_session_snapshot(self, metadata: dict):
+        """Syncs the embedding store, then swaps in the snapshot (runs off the event loop)."""
+        self.embedding_store.flush()
+        os.makedirs(self.snapshot_dirpath, exist_ok=True)
+        metadata_file_path = os.path.join(self.snapshot_dirpath, self.snapshot_metadata_filename)
+        temp_file_path = f"{metadata_file_path}.tmp"
+        with open(temp_file_path, 'w', encoding='utf-8') as file:
+            json.dump(metadata, file)
+        os.replace(temp_file_path, metadata_file_path)
+
+    async def save_session_snapshot(self):
+        """Checkpoints the session index (trimmed to max_messages), if it has changed since the last checkpoint."""
+        if not self.snapshot_dirpath:
+            return
+        dropped_count = self._trim_session_index()
+        count = self.session_index.ntotal
+        if not dropped_count and count == self.checkpointed_count and os.path.exists(os.path.join(self.snapshot_dirpath, self.snapshot_metadata_filename)):
+            return
+
+        metadata = {
+            'count': count,
+            'watermark': self.session_watermark,
+            'message_ids': [self.session_msg_id_map[i] for i in range(count)]
+        }
+        try:
+            await asyncio.to_thread(self._write_session_snapshot, metadata)
+        except Exception as e:
+            self.logger.error(f"Error saving session index snapshot to {self.snapshot_dirpath}: {e}")
+            return
+        self.logger.info(f"Checkpointed session index: {count} messages")
+        self.checkpointed_count = count
+
+    async def session_checkpoint_task(self):
+        """Checkpoints the session index every checkpoint_interval_seconds."""
+        while True:
+            await asyncio.sleep(self.checkpoint_interval_seconds)
+            await self.save_session_snapshot()
 
     async def add_message_to_index(self, message_metadata: dict):
         """ Adds a single message to the general FAISS index. """
         content = message_metadata['content']
         message_id = message_metadata['message_id']
+        if message_id in self.session_msg_ids:
+            return
         
-        embedding = self.transformer_model.encode([content], convert_to_tensor=False)
-        embedding_np = np.array(embedding).astype('float32')
-        
-        self.session_index.add(embedding_np)
-        self.session_msg_id_map[len(self.session_msg_id_map)] = message_id
+        embedding_np = self.embedding_store.get_vectors([message_id], [content])
+        self._add_to_session_index([message_id], embedding_np)
 
         self.logger.debug(f"...Added message to FAISS index: {message_id}")
         self.logger.debug(f"...Current index size: {self.session_index.ntotal}")
@@ -112,8 +264,8 @@ class FAISSService:
                 self.logger.warning("No valid message content found. Skipping FAISS operations.")
                 return []
             else:
-                embeddings = self.transformer_model.encode(contents, convert_to_tensor=False)
-                embeddings_np = np.array(embeddings).astype('float32')
+                # Returning users' history was mostly encoded before (as it arrived, or for an earlier shoutout)
+                embeddings_np = self.embedding_store.get_vectors(ids, contents)
 
             if embeddings_np.ndim != 2 or embeddings_np.shape[0] == 0:
                 self.logger.warning("Generated embeddings are empty or malformed. Skipping FAISS operations.")
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import pygame
 import re
@@ -32,34 +33,27 @@ class GPTTextToSpeech:
         pattern = r'\(\d+ of \d+\)'
         return re.sub(pattern, '', text_input).strip()
 
-    def _get_speech_response(
+    async def _write_speech_to_file(
             self, 
             text_input:str,
-            voice_name
-            ) -> object:
+            voice_name,
+            speech_file_path:str
+            ) -> None:
         self.logger.debug(f"Starting speech create with params: input={text_input}, model={self.tts_model}, voice={voice_name}")
         
         text_input = self._strip_story_number(text_input)
         
-        response = self.tts_client.audio.speech.create(
+        # Streams the audio to the file as it arrives
+        async with self.tts_client.audio.speech.with_streaming_response.create(
             model=self.tts_model,
             voice=voice_name,
             input=text_input
-            )
-        self.logger.debug("Got response:")
-        self.logger.debug(response)
-        return response
-    
-    def _write_speech_to_file(
-            self,
-            response:object,
-            speech_file_path:str
-            ) -> None:
-        self.logger.debug("starting stream to speech file")
-        response.stream_to_file(speech_file_path)
+            ) as response:
+            self.logger.debug("starting stream to speech file")
+            await response.stream_to_file(speech_file_path)
         self.logger.debug(f"finished stream to speech file: {speech_file_path}")
 
-    def workflow_t2s(
+    async def workflow_t2s(
             self,
             text_input,
             voice_name,
@@ -74,18 +68,14 @@ class GPTTextToSpeech:
             self.logger.debug(f"output_dirpath is None, setting to {output_dirpath}")
             
         speech_file_path = os.path.join(os.getcwd(),output_dirpath, output_filename)
-        
-        response = self._get_speech_response(
-            text_input=text_input,
-            voice_name=voice_name
-            )
 
-        self._write_speech_to_file(
-            response=response, 
+        await self._write_speech_to_file(
+            text_input=text_input,
+            voice_name=voice_name,
             speech_file_path=speech_file_path
             )
 
-    def play_local_mp3(
+    async def play_local_mp3(
             self,
             filename,
             dirpath
@@ -97,8 +87,9 @@ class GPTTextToSpeech:
         pygame.mixer.music.set_volume(self.tts_volume)
         pygame.mixer.music.play()
 
+        # Yield to the event loop while the audio plays
         while pygame.mixer.music.get_busy():
-            continue
+            await asyncio.sleep(0.1)
         
         pygame.mixer.music.stop()
         pygame.mixer.quit()
@@ -0,0 +1,109 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from my_modules.my_logging import create_logger
+
+runtime_logger_level = 'INFO'
+
+class ResponseCacheService:
+    """
+    Semantic cache of assistant replies, so repeat questions ("what game is this?", specs, schedule)
+    are answered without an assistant run.
+
+    Entries are keyed by the assistant name, a context key (see get_context_key()) and the (normalized)
+    embedding of the user's request. A lookup hits when an entry for the same assistant and context has a
+    cosine similarity of at least similarity_threshold and is younger than ttl_seconds. The cache holds at most max_entries,
+    evicting the least recently used entry first.
+    """
+    def __init__(
+            self,
+            transformer_model,
+            similarity_threshold=0.92,
+            ttl_seconds=600,
+            max_entries=200,
+            excluded_assistants: list = None
+            ):
+        self.logger = create_logger(
+            dirname='log',
+            logger_name='logger_ResponseCacheService',
+            debug_level=runtime_logger_level,
+            mode='w',
+            stream_logs=True
+            )
+        self.transformer_model = transformer_model
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.excluded_assistants = set(excluded_assistants or [])
+
+        # entry_id -> (assistant_name, context_key, embedding, response, created_at), least recently used first
+        self.entries = OrderedDict()
+        self.next_entry_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    def is_enabled_for(self, assistant_name: str) -> bool:
+        return assistant_name not in self.excluded_assistants
+
+    @staticmethod
+    def get_context_key(replacements_dict: dict, request_text: str) -> str:
+        """
+        Fingerprint of what a reply depends on besides the request: the prompt replacements (chatters,
+        wordcounts, archetype, ...) other than the request itself. A reply is only reused in the same context.
+        """
+        context_items = sorted((key, str(value)) for key, value in (replacements_dict or {}).items() if value != request_text)
+        return hashlib.md5(repr(context_items).encode()).hexdigest()
+
+    async def embed(self, request_text: str) -> np.ndarray:
+        """Embeds the request off the event loop (the model runs on the CPU)."""
+        embedding = await asyncio.to_thread(
+            self.transformer_model.encode,
+            [request_text.strip().lower()],
+            convert_to_tensor=False,
+            normalize_embeddings=True
+            )
+        return np.asarray(embedding[0], dtype='float32')
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        expired_entry_ids = [
+            entry_id for entry_id, (_, _, _, _, created_at) in self.entries.items()
+            if now - created_at > self.ttl_seconds
+        ]
+        for entry_id in expired_entry_ids:
+            del self.entries[entry_id]
+
+    def get(self, assistant_name: str, embedding: np.ndarray, context_key: str = None) -> str:
+        """Returns the cached reply for the most similar request to this assistant in this context, or None."""
+        self._evict_expired()
+        candidate_entry_ids = [
+            entry_id for entry_id, entry in self.entries.items()
+            if entry[0] == assistant_name and entry[1] == context_key
+        ]
+        if not candidate_entry_ids:
+            self.misses += 1
+            return None
+
+        candidate_embeddings = np.stack([self.entries[entry_id][2] for entry_id in candidate_entry_ids])
+        similarities = candidate_embeddings @ embedding
+        best_index = int(np.argmax(similarities))
+        if similarities[best_index] < self.similarity_threshold:
+            self.misses += 1
+            return None
+
+        best_entry_id = candidate_entry_ids[best_index]
+        self.entries.move_to_end(best_entry_id)
+        self.hits += 1
+        self.logger.info(f"Response cache hit for '{assistant_name}' (similarity: {similarities[best_index]:.3f}, hits: {self.hits}, misses: {self.misses})")
+        return self.entries[best_entry_id][3]
+
+    def put(self, assistant_name: str, embedding: np.ndarray, response: str, context_key: str = None):
+        self.entries[self.next_entry_id] = (assistant_name, context_key, embedding, response, time.monotonic())
+        self.next_entry_id += 1
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.logger.debug(f"Cached response for '{assistant_name}' ({len(self.entries)} entries)")
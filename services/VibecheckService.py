@@ -4,7 +4,7 @@ import random
 from classes.ConfigManagerClass import ConfigManager
 
 from my_modules.my_logging import create_logger
-from models.task import AddMessageTask, CreateExecuteThreadTask
+from models.task import AddMessageTask, CreateExecuteThreadTask, TaskPriority
 
 runtime_logger_level = 'DEBUG'
 
@@ -88,6 +88,7 @@ class VibeCheckService:
     async def stop_vibecheck_session(self):
         if self.vibechecker_task:
             await self._vibecheck_cleanup()
+            await self.task_manager.cancel_tasks(self.vibecheck_thread_name)
             self.vibechecker_task.cancel()
             try:
                 await self.vibechecker_task
@@ -149,7 +150,9 @@ class VibeCheckService:
                     assistant_name=assistant_name,
                     thread_instructions=vibechecker_prompt,
                     replacements_dict=replacements_dict,
-                    tts_voice=tts_voice
+                    tts_voice=tts_voice,
+                    priority=TaskPriority.MODERATOR,
+                    supersede_key='vibecheck_step'
                 )
                 await self.task_manager.add_task_to_queue(self.vibecheck_thread_name, task)
 
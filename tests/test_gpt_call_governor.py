@@ -0,0 +1,145 @@
+import asyncio
+import unittest
+
+import httpx
+
+from classes.GPTCallGovernorClass import CircuitOpenError, GPTCallGovernor
+
+class FakeTransport(httpx.AsyncBaseTransport):
+    """Answers with the given status, or blocks until cancelled while hang is set."""
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.hang = False
+        self.requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.hang:
+            await asyncio.Event().wait()
+        return httpx.Response(self.status_code, request=request)
+
+class TestGPTCallGovernorCircuit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.transport = FakeTransport(status_code=503)
+        self.governor = GPTCallGovernor(
+            self.transport,
+            max_attempts=1,
+            circuit_failure_threshold=1,
+            circuit_open_seconds=0.05
+            )
+        self.request = httpx.Request('POST', 'https://api.openai.com/v1/chat/completions', content=b'{}')
+
+    async def _open_circuit(self):
+        await self.governor.handle_async_request(self.request)
+        self.assertEqual(self.governor.circuit_state, 'open')
+
+    async def test_circuit_rejects_requests_while_open(self):
+        await self._open_circuit()
+        with self.assertRaises(CircuitOpenError):
+            await self.governor.handle_async_request(self.request)
+        self.assertEqual(self.transport.requests, 1)
+
+    async def test_successful_probe_closes_circuit(self):
+        await self._open_circuit()
+        await asyncio.sleep(0.06)
+        self.transport.status_code = 200
+        response = await self.governor.handle_async_request(self.request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.governor.circuit_state, 'closed')
+        self.assertFalse(self.governor.probe_in_flight)
+
+    async def test_cancelled_probe_lets_a_later_probe_through(self):
+        await self._open_circuit()
+        await asyncio.sleep(0.06)
+
+        self.transport.hang = True
+        probe = asyncio.create_task(self.governor.handle_async_request(self.request))
+        await asyncio.sleep(0.01)
+        self.assertTrue(self.governor.probe_in_flight)
+        probe.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await probe
+
+        self.assertFalse(self.governor.probe_in_flight)
+        self.assertEqual(self.governor.circuit_state, 'open')
+
+        # The circuit waits out circuit_open_seconds again, then the next probe goes through
+        await asyncio.sleep(0.06)
+        self.transport.hang = False
+        self.transport.status_code = 200
+        response = await self.governor.handle_async_request(self.request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.governor.circuit_state, 'closed')
+
+    async def test_probe_raising_unexpected_error_reopens_circuit(self):
+        await self._open_circuit()
+        await asyncio.sleep(0.06)
+
+        async def raise_error(request):
+            raise ValueError("unexpected")
+        self.transport.handle_async_request = raise_error
+        with self.assertRaises(ValueError):
+            await self.governor.handle_async_request(self.request)
+
+        self.assertFalse(self.governor.probe_in_flight)
+        self.assertEqual(self.governor.circuit_state, 'open')
+
+class ScriptedTransport(httpx.AsyncBaseTransport):
+    """Plays back a list of outcomes (a status code or an exception to raise), one per request."""
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, request=request)
+
+class TestGPTCallGovernorRetries(unittest.IsolatedAsyncioTestCase):
+    def _governor(self, outcomes):
+        transport = ScriptedTransport(outcomes)
+        governor = GPTCallGovernor(transport, max_attempts=3, backoff_base_seconds=0.001, circuit_failure_threshold=10)
+        return governor, transport
+
+    def _request(self, method='POST', path='/v1/threads/thread_1/runs', headers=None):
+        return httpx.Request(method, f"https://api.openai.com{path}", headers=headers, content=b'{}' if method == 'POST' else None)
+
+    async def test_post_is_not_retried_on_server_errors(self):
+        for status_code in (409, 500, 503):
+            governor, transport = self._governor([status_code, 200])
+            response = await governor.handle_async_request(self._request())
+            self.assertEqual(response.status_code, status_code)
+            self.assertEqual(transport.requests, 1)
+
+    async def test_post_is_not_retried_after_it_was_sent(self):
+        governor, transport = self._governor([httpx.ReadTimeout("timed out"), 200])
+        with self.assertRaises(httpx.ReadTimeout):
+            await governor.handle_async_request(self._request(path='/v1/threads/thread_1/messages'))
+        self.assertEqual(transport.requests, 1)
+
+    async def test_post_is_retried_on_rate_limit_and_connect_errors(self):
+        governor, transport = self._governor([429, httpx.ConnectError("refused"), 200])
+        response = await governor.handle_async_request(self._request())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(transport.requests, 3)
+
+    async def test_safe_requests_are_retried_on_server_errors(self):
+        for request in (
+                self._request(method='GET', path='/v1/threads/thread_1/runs/run_1'),
+                self._request(headers={'Idempotency-Key': 'key_1'})
+                ):
+            governor, transport = self._governor([503, httpx.ReadTimeout("timed out"), 200])
+            response = await governor.handle_async_request(request)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(transport.requests, 3)
+
+    async def test_get_is_not_retried_on_conflict(self):
+        governor, transport = self._governor([409, 200])
+        response = await governor.handle_async_request(self._request(method='GET', path='/v1/threads/thread_1'))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(transport.requests, 1)
+
+if __name__ == '__main__':
+    unittest.main()
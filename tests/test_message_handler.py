@@ -0,0 +1,97 @@
+import asyncio
+import types
+import unittest
+from unittest import mock
+
+from classes.MessageHandlerClass import MessageHandler
+from classes.TaskManagerClass import TaskShedException
+
+class FakeTaskManager:
+    """Keeps queued tasks; fail_writes makes each one fail as soon as it's queued."""
+    def __init__(self):
+        self.tasks = []
+        self.fail_writes = False
+
+    async def add_task_to_queue(self, thread_name, task):
+        self.tasks.append(task)
+        if self.fail_writes:
+            task.future.set_exception(RuntimeError("thread write failed"))
+            task.future.exception()
+
+class TestMessageHandlerThreadBuffer(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        config = types.SimpleNamespace(twitch_bot_display_name='chatzilla_ai', twitch_bot_username='chatzilla_ai')
+        patcher = mock.patch('classes.MessageHandlerClass.ConfigManager.get_instance', return_value=config)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.task_manager = FakeTaskManager()
+        self.message_handler = MessageHandler(
+            self.task_manager,
+            msg_history_limit=10,
+            thread_message_buffer_max_messages=3,
+            thread_message_buffer_max_age_seconds=0.05
+            )
+
+    async def _buffer(self, *lines):
+        for line in lines:
+            await self.message_handler.add_bot_message_to_thread_history('chatformemsgs', line)
+
+    async def test_full_buffer_is_flushed_as_one_message(self):
+        await self._buffer('one', 'two', 'three')
+        self.assertEqual(len(self.task_manager.tasks), 1)
+        self.assertEqual(self.task_manager.tasks[0].content, 'chatzilla_ai: one\nchatzilla_ai: two\nchatzilla_ai: three')
+        self.assertNotIn('chatformemsgs', self.message_handler.pending_thread_messages)
+
+    async def test_aged_buffer_is_flushed_by_timer(self):
+        await self._buffer('one')
+        await asyncio.sleep(0.1)
+        self.assertEqual(len(self.task_manager.tasks), 1)
+        self.assertFalse(self.message_handler.pending_thread_flush_timers)
+
+    async def test_failed_write_puts_messages_back_in_order(self):
+        self.task_manager.fail_writes = True
+        await self._buffer('one', 'two', 'three')
+        await asyncio.sleep(0)
+        # The put back messages come first, and go out again with the next flush
+        await self._buffer('four')
+        await asyncio.sleep(0)
+
+        expected_lines = ['chatzilla_ai: one', 'chatzilla_ai: two', 'chatzilla_ai: three', 'chatzilla_ai: four']
+        self.assertEqual(self.task_manager.tasks[-1].content, '\n'.join(expected_lines))
+        self.assertEqual(self.message_handler.pending_thread_messages['chatformemsgs'], expected_lines)
+
+    async def test_failed_write_is_retried_by_timer(self):
+        self.task_manager.fail_writes = True
+        await self._buffer('one', 'two', 'three')
+        await asyncio.sleep(0)
+        self.assertEqual(
+            self.message_handler.pending_thread_messages['chatformemsgs'],
+            ['chatzilla_ai: one', 'chatzilla_ai: two', 'chatzilla_ai: three']
+            )
+        self.assertIn('chatformemsgs', self.message_handler.pending_thread_flush_timers)
+
+        self.task_manager.fail_writes = False
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.task_manager.tasks[-1].content, 'chatzilla_ai: one\nchatzilla_ai: two\nchatzilla_ai: three')
+        self.assertNotIn('chatformemsgs', self.message_handler.pending_thread_messages)
+
+    async def test_shed_task_puts_messages_back(self):
+        await self._buffer('one', 'two', 'three')
+        shed_task = self.task_manager.tasks[0]
+        await self._buffer('four')
+        shed_task.future.set_exception(TaskShedException("queue full"))
+        shed_task.future.exception()
+        await asyncio.sleep(0)
+        self.assertEqual(
+            self.message_handler.pending_thread_messages['chatformemsgs'],
+            ['chatzilla_ai: one', 'chatzilla_ai: two', 'chatzilla_ai: three', 'chatzilla_ai: four']
+            )
+
+    async def test_restored_buffer_is_bounded(self):
+        self.message_handler.restore_pending_thread_messages('chatformemsgs', '\n'.join(f"line {i}" for i in range(40)))
+        pending_messages = self.message_handler.pending_thread_messages['chatformemsgs']
+        self.assertEqual(len(pending_messages), self.message_handler.thread_message_buffer_max_restored_messages)
+        self.assertEqual(pending_messages[-1], 'line 39')
+
+if __name__ == '__main__':
+    unittest.main()